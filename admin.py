@@ -0,0 +1,270 @@
+"""Admin-Panel: Einstellungen, Spielerliste, Punkte und CSV-Austausch
+
+Die Spielerliste wird seitenweise geladen und nach Namen sortiert. Die Suche
+nach einem Namensanfang ist eine Bereichsabfrage auf dem Index von
+`user.username` (kein LIKE, das SQLite ohne NOCASE-Index nicht nutzen kann).
+Punkte werden gesammelt geändert: ein einziges `UPDATE ... CASE` pro Batch,
+alles in einer Transaktion. Export und Import laufen gestreamt über CSV.
+
+Ein Admin verwaltet nur den eigenen Raum: Einstellungen, Spielerliste, Punkte
+und CSV beziehen sich auf `current_user.room_id`.
+"""
+import csv
+from functools import wraps
+import io
+import itertools
+import logging
+import math
+
+from flask import Response, flash, redirect, render_template, request, stream_with_context, url_for
+from flask_login import login_required, current_user
+
+from cli import VALID_ROLES
+from identity import identity_cache
+from leaderboard import leaderboard_cache
+from models import db, User, Setting
+from settings_service import settings_cache
+
+logger = logging.getLogger(__name__)
+
+PAGE_SIZE = 50
+BATCH_SIZE = 500
+# Größtes Zeichen: alles mit dem Präfix liegt zwischen prefix und prefix + MAX_CHAR
+MAX_CHAR = '\U0010ffff'
+
+
+def admin_required(view):
+    """Wie login_required, zusätzlich nur für die Rolle admin"""
+    @wraps(view)
+    @login_required
+    def wrapper(*args, **kwargs):
+        if current_user.role != 'admin':
+            logger.warning("Unbefugter Zugriff auf %s von %s", request.path, current_user.username)
+            return "Zugriff verweigert", 403
+        return view(*args, **kwargs)
+    return wrapper
+
+
+def search_users(room_id, prefix='', page=1, per_page=PAGE_SIZE):
+    """Liefert (Benutzer der Seite, Seite, Seitenzahl, Treffer) eines Raums sortiert nach Namen"""
+    query = User.query.filter(User.room_id == room_id)
+    if prefix:
+        query = query.filter(User.username >= prefix, User.username < prefix + MAX_CHAR)
+    total = query.count()
+    pages = max(math.ceil(total / per_page), 1)
+    page = min(max(page, 1), pages)
+    users = query.order_by(User.username).offset((page - 1) * per_page).limit(per_page).all()
+    return users, page, pages, total
+
+
+def bulk_update_users(points, roles=None, room_id=None):
+    """Setzt Punkte (und Rollen) vieler Benutzer mit einem UPDATE ... CASE pro Batch
+
+    `points` und `roles` bilden user_id auf den neuen Wert ab; mit `room_id`
+    bleiben Benutzer anderer Räume unverändert. Committet wird nicht, damit
+    Aufrufer mehrere Batches in einer Transaktion bündeln können. Liefert die
+    Anzahl geänderter Zeilen.
+    """
+    roles = roles or {}
+    user_ids = sorted(set(points) | set(roles))
+    changed = 0
+    # SQLite begrenzt die Zahl der Parameter pro Anweisung
+    for start in range(0, len(user_ids), BATCH_SIZE):
+        batch = user_ids[start:start + BATCH_SIZE]
+        values = {}
+        batch_points = {user_id: points[user_id] for user_id in batch if user_id in points}
+        batch_roles = {user_id: roles[user_id] for user_id in batch if user_id in roles}
+        if batch_points:
+            values['points'] = db.case(batch_points, value=User.id, else_=User.points)
+        if batch_roles:
+            values['role'] = db.case(batch_roles, value=User.id, else_=User.role)
+        condition = User.id.in_(batch)
+        if room_id is not None:
+            condition = db.and_(condition, User.room_id == room_id)
+        result = db.session.execute(
+            db.update(User).where(condition).values(values),
+            execution_options={'synchronize_session': False})
+        changed += result.rowcount
+    return changed
+
+
+def export_users_csv(room_id, batch_size=BATCH_SIZE):
+    """Erzeugt die CSV eines Raums zeilenweise (username, role, points)"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    def flush():
+        data = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+        return data
+
+    writer.writerow(['username', 'role', 'points'])
+    yield flush()
+    rows = iter(db.session.query(User.username, User.role, User.points).filter(
+        User.room_id == room_id).order_by(User.username).execution_options(yield_per=batch_size))
+    for chunk in iter(lambda: list(itertools.islice(rows, batch_size)), []):
+        writer.writerows(chunk)
+        yield flush()
+
+
+def _read_point_rows(text):
+    """Liest (Zeile, username, role, points, Fehler) aus der CSV; Kopfzeile optional"""
+    for line_no, row in enumerate(csv.reader(text), start=1):
+        if not row or not row[0].strip() or row[0].startswith('#'):
+            continue
+        if line_no == 1 and row[0].strip().lower() == 'username':
+            continue
+        if len(row) < 3:
+            yield line_no, None, None, None, 'Spalten username,role,points erwartet'
+            continue
+        username, role = row[0].strip(), row[1].strip() or None
+        if role and role not in VALID_ROLES:
+            yield line_no, None, None, None, f"ungültige Rolle '{role}'"
+            continue
+        try:
+            points = int(row[2])
+        except ValueError:
+            yield line_no, None, None, None, f"ungültige Punkte '{row[2]}'"
+            continue
+        yield line_no, username, role, points, None
+
+
+def import_users_csv(text, room_id, batch_size=BATCH_SIZE):
+    """Übernimmt Punkte und Rollen bestehender Benutzer eines Raums aus einer CSV
+
+    Unbekannte Benutzer (auch die anderer Räume) werden übersprungen (angelegt
+    wird über `flask users import`, dort gibt es Passwörter). Alles läuft in
+    einer Transaktion.
+    Liefert (aktualisiert, übersprungen, Fehlermeldungen).
+    """
+    updated = skipped = 0
+    errors = []
+    rows = _read_point_rows(text)
+    try:
+        for batch in iter(lambda: list(itertools.islice(rows, batch_size)), []):
+            valid = []
+            for line_no, username, role, points, error in batch:
+                if error:
+                    errors.append(f"Zeile {line_no}: {error}")
+                else:
+                    valid.append((username, role, points))
+            ids = dict(db.session.query(User.username, User.id).filter(
+                User.room_id == room_id, User.username.in_([username for username, _, _ in valid])))
+            points = {ids[username]: value for username, _, value in valid if username in ids}
+            roles = {ids[username]: role for username, role, _ in valid if username in ids and role}
+            skipped += sum(1 for username, _, _ in valid if username not in ids)
+            updated += bulk_update_users(points, roles, room_id)
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    if updated:
+        leaderboard_cache.invalidate(room_id)
+        identity_cache.invalidate_all()
+    return updated, skipped, errors
+
+
+def register_admin_routes(app):
+    """Registriert das Admin-Panel"""
+
+    def _panel_url():
+        # Suche und Seite nach einem POST beibehalten
+        return url_for('admin_panel', q=request.args.get('q') or None,
+                       page=request.args.get('page', type=int))
+
+    @app.route('/admin')
+    @admin_required
+    def admin_panel():
+        prefix = request.args.get('q', '').strip()
+        page = request.args.get('page', 1, type=int)
+        room_id = current_user.room_id
+        users, page, pages, total = search_users(room_id, prefix, page)
+        return render_template('admin.html', users=users, settings=settings_cache.get(room_id).raw,
+                               q=prefix, page=page, pages=pages, total=total)
+
+    @app.route('/admin/settings', methods=['POST'])
+    @admin_required
+    def admin_settings():
+        try:
+            room_id = current_user.room_id
+            keys = ['notify_time', 'dinner_time', 'cooldown_days', 'max_changes']
+            for setting in Setting.query.filter(Setting.room_id == room_id, Setting.key.in_(keys)).all():
+                setting.value = request.form.get(setting.key)
+            db.session.commit()
+            settings_cache.invalidate(room_id)
+            logger.info("Einstellungen von Raum %s aktualisiert", room_id)
+            flash('Einstellungen aktualisiert')
+        except Exception as e:
+            db.session.rollback()
+            logger.error("Fehler beim Speichern der Einstellungen: %s", e)
+            flash('Ein Fehler ist aufgetreten.')
+        return redirect(_panel_url())
+
+    @app.route('/admin/points', methods=['POST'])
+    @admin_required
+    def admin_points():
+        """Übernimmt alle geänderten Punkte der Seite in einer Transaktion"""
+        points = {}
+        for key, value in request.form.items():
+            if not key.startswith('points-') or not value.strip():
+                continue
+            user_id = key[len('points-'):]
+            if value.strip() == request.form.get(f'original-{user_id}', '').strip():
+                continue  # unverändert: Punkte aus Abstimmungen nicht überschreiben
+            try:
+                points[int(user_id)] = int(value)
+            except ValueError:
+                flash(f'Ungültiger Punktewert: {value}')
+                return redirect(_panel_url())
+
+        if not points:
+            flash('Keine Änderungen.')
+            return redirect(_panel_url())
+        room_id = current_user.room_id
+        try:
+            changed = bulk_update_users(points, room_id=room_id)
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            logger.error("Fehler beim Ändern der Punkte: %s", e)
+            flash('Ein Fehler ist aufgetreten.')
+            return redirect(_panel_url())
+
+        leaderboard_cache.invalidate(room_id)
+        identity_cache.invalidate(*points)
+        logger.info("Punkte von %s Benutzer(n) geändert durch %s", changed, current_user.username)
+        flash(f'Punkte von {changed} Spieler(n) gespeichert.')
+        return redirect(_panel_url())
+
+    @app.route('/admin/users.csv')
+    @admin_required
+    def admin_export_users():
+        response = Response(stream_with_context(export_users_csv(current_user.room_id)), mimetype='text/csv')
+        response.headers['Content-Disposition'] = 'attachment; filename=benutzer.csv'
+        return response
+
+    @app.route('/admin/users/import', methods=['POST'])
+    @admin_required
+    def admin_import_users():
+        upload = request.files.get('file')
+        if upload is None or not upload.filename:
+            flash('Bitte eine CSV-Datei auswählen.')
+            return redirect(_panel_url())
+        try:
+            text = io.TextIOWrapper(upload.stream, encoding='utf-8-sig', newline='')
+            updated, skipped, errors = import_users_csv(text, current_user.room_id)
+        except (UnicodeDecodeError, csv.Error) as e:
+            flash(f'CSV konnte nicht gelesen werden: {e}')
+            return redirect(_panel_url())
+        except Exception as e:
+            logger.error("Fehler beim CSV-Import: %s", e)
+            flash('Ein Fehler ist aufgetreten.')
+            return redirect(_panel_url())
+
+        logger.info("CSV-Import von %s: %s aktualisiert, %s unbekannt, %s fehlerhaft",
+                    current_user.username, updated, skipped, len(errors))
+        flash(f'Import: {updated} aktualisiert, {skipped} unbekannt übersprungen.')
+        for error in errors[:5]:
+            flash(error)
+        return redirect(_panel_url())
@@ -0,0 +1,151 @@
+"""Versionierte JSON-API (/api/v1/...) mit ETag / bedingtem GET
+
+Jede Ressource bekommt ein starkes ETag aus den Versionsstempeln der Daten,
+von denen sie abhängt (jeweils die des Raums des Benutzers). Ein
+unveränderter Poll (If-None-Match) wird mit 304 beantwortet, ohne die Daten
+neu zu laden oder zu serialisieren.
+"""
+import hashlib
+
+from flask import Response, jsonify, request
+from flask_login import login_required, current_user
+
+from cache import get_stamp
+from clock import clock
+from cooldown_index import cooldown_index
+from leaderboard import leaderboard_cache
+from round_cache import round_cache, round_stamp
+from settings_service import settings_cache
+from suggest import suggest_index
+import stats
+
+
+def _etag(*parts):
+    return hashlib.sha1(':'.join(str(part) for part in parts).encode()).hexdigest()
+
+
+def conditional_json(etag, build):
+    """Liefert 304 bei passendem If-None-Match, sonst das JSON von build()"""
+    if request.if_none_match.contains(etag):
+        response = Response(status=304)
+    else:
+        response = jsonify(build())
+    response.set_etag(etag)
+    # Immer revalidieren: der Client darf cachen, muss aber nachfragen
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response
+
+
+def _time(value):
+    return value.strftime('%H:%M')
+
+
+def register_api_routes(app):
+    """Registriert die JSON-API"""
+
+    @app.route('/api/v1/round')
+    @login_required
+    def api_round():
+        room_id = current_user.room_id
+        state = clock.state(room_id)
+        today, phase = state.day, state.phase
+        game_settings = settings_cache.get(room_id)
+        etag = _etag('round', today, phase, current_user.id, room_id,
+                     round_stamp(room_id, today).read(),
+                     settings_cache.room_stamp(room_id).read())
+
+        def build():
+            if phase == 'voting':
+                snapshot = round_cache.voting_snapshot(room_id, today)
+            else:
+                snapshot = round_cache.get(room_id, today)
+            my_word = snapshot.get(current_user.id)
+            # Gleiche Regel wie im Dashboard: andere Wörter erst nach eigener
+            # Einreichung oder in der Abstimmungsphase
+            show_words = snapshot.visible_to(current_user.id, phase)
+            return {
+                'date': today.isoformat(),
+                'phase': phase,
+                'notify_time': _time(game_settings.notify_time),
+                'dinner_time': _time(game_settings.dinner_time),
+                'my_word': None if my_word is None else {
+                    'word': my_word.word,
+                    'changes_count': my_word.changes_count,
+                    'changes_left': max(game_settings.max_changes - my_word.changes_count, 0),
+                },
+                'participants': len(snapshot),
+                'words': [
+                    {'user_id': e.user_id, 'username': e.username, 'word': e.word}
+                    for e in snapshot
+                ] if show_words else [],
+            }
+
+        return conditional_json(etag, build)
+
+    @app.route('/api/v1/leaderboard')
+    @login_required
+    def api_leaderboard():
+        page = request.args.get('page', 1, type=int)
+        per_page = request.args.get('per_page', app.config['LEADERBOARD_PAGE_SIZE'], type=int)
+        per_page = min(max(per_page, 1), 200)
+        room_id = current_user.room_id
+        etag = _etag('leaderboard', page, per_page, current_user.id, room_id,
+                     leaderboard_cache.version(room_id))
+
+        def build():
+            snapshot = leaderboard_cache.get(room_id)
+            board = snapshot.page(page, per_page)
+            me = snapshot.rank_of(current_user.id)
+            return {
+                'page': board.page,
+                'pages': board.pages,
+                'total': board.total,
+                'me': me._asdict() if me else None,
+                'users': [standing._asdict() for standing in board.standings],
+            }
+
+        return conditional_json(etag, build)
+
+    @app.route('/api/v1/settings')
+    @login_required
+    def api_settings():
+        room_id = current_user.room_id
+        etag = _etag('settings', room_id, settings_cache.room_stamp(room_id).read())
+
+        def build():
+            game_settings = settings_cache.get(room_id)
+            return {
+                'notify_time': _time(game_settings.notify_time),
+                'dinner_time': _time(game_settings.dinner_time),
+                'cooldown_days': game_settings.cooldown_days,
+                'max_changes': game_settings.max_changes,
+            }
+
+        return conditional_json(etag, build)
+
+    @app.route('/api/v1/stats')
+    @login_required
+    def api_stats():
+        room_id = current_user.room_id
+        etag = _etag('stats', current_user.id, room_id, get_stamp(stats.STAMP_NAME).read())
+        return conditional_json(etag, lambda: stats.stats_overview(room_id, current_user.id))
+
+    @app.route('/api/v1/suggest')
+    @login_required
+    def api_suggest():
+        prefix = request.args.get('prefix', '')
+        limit = request.args.get('limit', suggest_index.limit, type=int)
+        limit = min(max(limit, 1), suggest_index.limit)
+        room_id = current_user.room_id
+        state = clock.state(room_id)
+        today = state.day
+        version = suggest_index.refresh(room_id, today)
+        # Heutige Wörter nur für Spieler, die sie auch im Dashboard sehen
+        show_today = round_cache.get(room_id, today).visible_to(current_user.id, state.phase)
+        etag = _etag('suggest', prefix.lower(), limit, current_user.id, room_id, version,
+                     show_today, cooldown_index.room_stamp(room_id).read())
+        return conditional_json(etag, lambda: {
+            'prefix': prefix,
+            'suggestions': suggest_index.suggest(room_id, prefix, today, current_user.id, limit,
+                                                 show_today=show_today),
+        })
@@ -1,16 +1,46 @@
-from flask import Flask, render_template, request, redirect, url_for, flash, jsonify
+from flask import Flask, Response, render_template, request, redirect, url_for, flash, jsonify
 from flask_login import LoginManager, login_user, logout_user, login_required, current_user
-from werkzeug.security import generate_password_hash, check_password_hash
-from models import db, User, WordLog, CooldownLog, Setting, Subscription
-from datetime import datetime, timedelta
+from werkzeug.middleware.proxy_fix import ProxyFix
+from werkzeug.security import check_password_hash
+from models import (db, DEFAULT_ROOM_ID, User, WordLog, Setting, Subscription,
+                    create_missing_indexes, migrate_schema)
+from settings_service import settings_cache
+from round_cache import round_cache, prune_round_stamps
+from rooms import (ensure_default_room, ensure_room_settings, create_room, find_room,
+                   room_schedule, run_room_transitions)
+from clock import clock
+from leaderboard import leaderboard_cache
+from identity import identity_cache
+from stats import rollup_pending, stats_overview
+from archive import archive_old_rows
+from backup import create_backup
+import passwords
+from passwords import hash_password, hash_passwords, verify_passwords, needs_rehash
+from ratelimit import login_limiter
+from votes import record_vote, upsert_cooldown
+from cooldown_index import cooldown_index, prune_expired_cooldowns
+from similarity import similarity_index
+from suggest import suggest_index
+from scheduler import scheduler, every, daily
+from events import event_hub, publish, prune_round_events
+from push import vapid_public_key, find_subscriptions
+from cli import register_commands
+from api import register_api_routes
+from admin import register_admin_routes
+from assets import asset_pipeline
+from metrics import metrics
+from logs import log_pipeline
+from sqlalchemy import event
+from sqlalchemy.exc import IntegrityError
+from datetime import time as dtime, timedelta
+import hashlib
+import json
 import logging
 import os
+import queue
+import time
 
-# Logging konfigurieren
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
+# Logging wird in create_app() eingerichtet (siehe logs.py)
 logger = logging.getLogger(__name__)
 
 def create_app():
@@ -31,10 +61,134 @@ def create_app():
     
     app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
     
-    logger.info(f"Nutze Datenbank: {app.config['SQLALCHEMY_DATABASE_URI']}")
+    # Connection-Pool passend zu den Threads pro Gunicorn-Worker
+    # (In-Memory-SQLite nutzt einen StaticPool ohne diese Optionen)
+    if ':memory:' not in app.config['SQLALCHEMY_DATABASE_URI'] and \
+            app.config['SQLALCHEMY_DATABASE_URI'] != 'sqlite://':
+        pool_size = int(os.environ.get('DB_POOL_SIZE', os.environ.get('GUNICORN_THREADS', '8')))
+        app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {
+            'pool_size': pool_size,
+            'max_overflow': int(os.environ.get('DB_MAX_OVERFLOW', '2')),
+            'pool_timeout': int(os.environ.get('DB_POOL_TIMEOUT', '10')),
+            'pool_pre_ping': True
+        }
+    
+    # SQLite-Tuning (WAL, damit Leser Schreiber nicht blockieren)
+    app.config['SQLITE_JOURNAL_MODE'] = os.environ.get('SQLITE_JOURNAL_MODE', 'WAL')
+    app.config['SQLITE_SYNCHRONOUS'] = os.environ.get('SQLITE_SYNCHRONOUS', 'NORMAL')
+    app.config['SQLITE_BUSY_TIMEOUT_MS'] = int(os.environ.get('SQLITE_BUSY_TIMEOUT_MS', '5000'))
+    app.config['SQLITE_CACHE_SIZE_KB'] = int(os.environ.get('SQLITE_CACHE_SIZE_KB', '16384'))
+    
+    # Passwort-Hashing (Werkzeug-Format, z.B. scrypt:32768:8:1 oder pbkdf2:sha256:600000)
+    app.config['PASSWORD_HASH_METHOD'] = os.environ.get('PASSWORD_HASH_METHOD', passwords.DEFAULT_METHOD)
+    
+    # Login-Ratenbegrenzung (Token-Bucket pro Benutzername und pro IP)
+    app.config['RATELIMIT_ENABLED'] = os.environ.get('RATELIMIT_ENABLED', '1') == '1'
+    app.config['RATELIMIT_DB'] = os.environ.get(
+        'RATELIMIT_DB', os.path.join(app.instance_path, 'ratelimit.db'))
+    app.config['LOGIN_RATE_USER_CAPACITY'] = int(os.environ.get('LOGIN_RATE_USER_CAPACITY', '5'))
+    app.config['LOGIN_RATE_USER_PER_MINUTE'] = float(os.environ.get('LOGIN_RATE_USER_PER_MINUTE', '5'))
+    # 0 schaltet den IP-Bucket ab (dann gilt nur der pro Benutzername)
+    app.config['LOGIN_RATE_IP_CAPACITY'] = int(os.environ.get('LOGIN_RATE_IP_CAPACITY', '30'))
+    app.config['LOGIN_RATE_IP_PER_MINUTE'] = float(os.environ.get('LOGIN_RATE_IP_PER_MINUTE', '30'))
+    
+    # Vertrauenswürdige Reverse-Proxys: Anzahl der Proxys, deren X-Forwarded-For
+    # bzw. X-Forwarded-Proto übernommen wird (0 = Header ignorieren)
+    app.config['PROXY_FIX_X_FOR'] = int(os.environ.get('PROXY_FIX_X_FOR', '0'))
+    app.config['PROXY_FIX_X_PROTO'] = int(os.environ.get('PROXY_FIX_X_PROTO', '0'))
+    
+    # Live-Feed (/events): jeder Stream belegt einen Worker-Thread. gunicorn.conf.py
+    # legt dafür SSE_MAX_CLIENTS Threads zusätzlich zu GUNICORN_THREADS an
+    app.config['SSE_MAX_CLIENTS'] = int(os.environ.get('SSE_MAX_CLIENTS', '50'))
+    app.config['SSE_STREAM_SECONDS'] = int(os.environ.get('SSE_STREAM_SECONDS', '300'))
+    
+    # Web Push (ohne VAPID_PRIVATE_KEY werden keine Benachrichtigungen verschickt)
+    app.config['VAPID_PRIVATE_KEY'] = os.environ.get('VAPID_PRIVATE_KEY', '')
+    app.config['VAPID_PUBLIC_KEY'] = os.environ.get('VAPID_PUBLIC_KEY', '')
+    app.config['VAPID_CLAIMS_EMAIL'] = os.environ.get('VAPID_CLAIMS_EMAIL', 'admin@example.com')
+    app.config['PUSH_MAX_WORKERS'] = int(os.environ.get('PUSH_MAX_WORKERS', '8'))
+    app.config['PUSH_PAGE_SIZE'] = int(os.environ.get('PUSH_PAGE_SIZE', '200'))
+    app.config['PUSH_MAX_RETRIES'] = int(os.environ.get('PUSH_MAX_RETRIES', '3'))
+    app.config['PUSH_TTL'] = int(os.environ.get('PUSH_TTL', '3600'))
+    
+    # Gehashte, vorkomprimierte Kopien von static/ (siehe assets.py)
+    app.config['ASSET_BUILD_DIR'] = os.environ.get(
+        'ASSET_BUILD_DIR', os.path.join(app.instance_path, 'assets'))
+    
+    # Bestenliste: Einträge pro Seite
+    app.config['LEADERBOARD_PAGE_SIZE'] = int(os.environ.get('LEADERBOARD_PAGE_SIZE', '50'))
+    
+    # Metriken (/metrics) und Query-Zählung pro Request
+    app.config['METRICS_ENABLED'] = os.environ.get('METRICS_ENABLED', '1') == '1'
+    app.config['METRICS_DB'] = os.environ.get(
+        'METRICS_DB', os.path.join(app.instance_path, 'metrics.db'))
+    app.config['METRICS_FLUSH_SECONDS'] = float(os.environ.get('METRICS_FLUSH_SECONDS', '5'))
+    app.config['METRICS_TOKEN'] = os.environ.get('METRICS_TOKEN', '')
+    app.config['METRICS_DEBUG_HEADERS'] = os.environ.get('METRICS_DEBUG_HEADERS', '0') == '1'
+    app.config['SLOW_QUERY_MS'] = float(os.environ.get('SLOW_QUERY_MS', '200'))
+    
+    # Archivierung alter Runden (siehe archive.py)
+    app.config['ARCHIVE_DIR'] = os.environ.get(
+        'ARCHIVE_DIR', os.path.join(app.instance_path, 'archive'))
+    app.config['ARCHIVE_RETENTION_DAYS'] = int(os.environ.get('ARCHIVE_RETENTION_DAYS', '90'))
+    app.config['ARCHIVE_BATCH_SIZE'] = int(os.environ.get('ARCHIVE_BATCH_SIZE', '1000'))
+    app.config['VACUUM_STEP_PAGES'] = int(os.environ.get('VACUUM_STEP_PAGES', '1000'))
+    
+    # Online-Backups der SQLite-Datenbank (siehe backup.py)
+    app.config['BACKUP_DIR'] = os.environ.get(
+        'BACKUP_DIR', os.path.join(app.instance_path, 'backups'))
+    app.config['BACKUP_KEEP'] = int(os.environ.get('BACKUP_KEEP', '7'))
+    app.config['BACKUP_STEP_PAGES'] = int(os.environ.get('BACKUP_STEP_PAGES', '256'))
+    app.config['BACKUP_PAUSE_MS'] = int(os.environ.get('BACKUP_PAUSE_MS', '10'))
+    
+    # Unscharfer Wortabgleich (siehe similarity.py)
+    app.config['SIMILARITY_ENABLED'] = os.environ.get('SIMILARITY_ENABLED', '1') == '1'
+    app.config['SIMILARITY_MAX_DISTANCE'] = int(os.environ.get('SIMILARITY_MAX_DISTANCE', '1'))
+    app.config['SIMILARITY_MIN_LENGTH'] = int(os.environ.get('SIMILARITY_MIN_LENGTH', '5'))
+    app.config['SIMILARITY_STEMMING'] = os.environ.get('SIMILARITY_STEMMING', '1') == '1'
+    
+    # Wortvorschläge für das Eingabefeld (siehe suggest.py)
+    app.config['SUGGEST_LIMIT'] = int(os.environ.get('SUGGEST_LIMIT', '8'))
+    app.config['SUGGEST_MIN_PREFIX'] = int(os.environ.get('SUGGEST_MIN_PREFIX', '2'))
+    
+    # Gecachte Identität für den user_loader (siehe identity.py)
+    app.config['IDENTITY_CACHE_SIZE'] = int(os.environ.get('IDENTITY_CACHE_SIZE', '1024'))
+    app.config['IDENTITY_CACHE_TTL'] = int(os.environ.get('IDENTITY_CACHE_TTL', '300'))
+    
+    # Logging über eine Queue, als JSON, mit Sampling (siehe logs.py)
+    app.config['LOG_LEVEL'] = os.environ.get('LOG_LEVEL', 'INFO').upper()
+    app.config['LOG_FORMAT'] = os.environ.get('LOG_FORMAT', 'json')
+    app.config['LOG_QUEUE_SIZE'] = int(os.environ.get('LOG_QUEUE_SIZE', '10000'))
+    app.config['LOG_SAMPLE_RATES'] = os.environ.get('LOG_SAMPLE_RATES', 'request=0.05')
+    app.config['LOG_RATE_LIMITS'] = os.environ.get(
+        'LOG_RATE_LIMITS', 'login_failed=30,login_rate_limited=10,sse_rejected=10')
+    app.config['LOG_SLOW_REQUEST_MS'] = int(os.environ.get('LOG_SLOW_REQUEST_MS', '1000'))
+    
+    # Versionsstempel für die prozessübergreifende Cache-Invalidierung
+    app.config['CACHE_STAMP_DIR'] = os.environ.get(
+        'CACHE_STAMP_DIR', os.path.join(app.instance_path, 'stamps'))
+    
+    if app.config['PROXY_FIX_X_FOR'] or app.config['PROXY_FIX_X_PROTO']:
+        # Sonst sehen Ratenlimit und Logs nur die IP des Proxys
+        app.wsgi_app = ProxyFix(app.wsgi_app, x_for=app.config['PROXY_FIX_X_FOR'],
+                                x_proto=app.config['PROXY_FIX_X_PROTO'])
+    
+    log_pipeline.init_app(app)
+    logger.info("Nutze Datenbank: %s", app.config['SQLALCHEMY_DATABASE_URI'])
     
     # Extensions initialisieren
     db.init_app(app)
+    settings_cache.init_app(app)
+    identity_cache.init_app(app)
+    similarity_index.init_app(app)
+    suggest_index.init_app(app)
+    passwords.configure(app.config['PASSWORD_HASH_METHOD'])
+    login_limiter.init_app(app)
+    scheduler.init_app(app)
+    event_hub.init_app(app)
+    asset_pipeline.init_app(app)
+    configure_sqlite(app)
+    metrics.init_app(app)
     
     login_manager = LoginManager()
     login_manager.login_view = 'login'
@@ -43,23 +197,34 @@ def create_app():
     @login_manager.user_loader
     def load_user(user_id):
         try:
-            return User.query.get(int(user_id))
+            return identity_cache.get(int(user_id))
         except Exception as e:
-            logger.error(f"Fehler beim Laden des Users {user_id}: {e}")
+            logger.error("Fehler beim Laden des Users %s: %s", user_id, e)
             return None
     
     # Datenbankinitialisierung
     with app.app_context():
         try:
+            started = time.perf_counter()
             db.create_all()
+            migrated = migrate_schema()
+            if migrated:
+                logger.info("Schema auf Räume migriert: %s", ', '.join(migrated))
+            create_missing_indexes()
             init_default_data()
             create_users_from_env()  # Benutzer aus Umgebungsvariable erstellen
-            logger.info("Datenbank erfolgreich initialisiert")
+            similarity_index.load()
+            suggest_index.load(clock.today())
+            logger.info("Datenbank erfolgreich initialisiert in %.2fs", time.perf_counter() - started)
         except Exception as e:
-            logger.error(f"Fehler bei der Datenbankinitialisierung: {e}")
+            logger.error("Fehler bei der Datenbankinitialisierung: %s", e)
     
-    # Routen registrieren
+    # Routen, Hintergrundjobs und CLI-Befehle registrieren
     register_routes(app)
+    register_api_routes(app)
+    register_admin_routes(app)
+    register_jobs(app)
+    register_commands(app)
     
     # Error Handler
     @app.errorhandler(404)
@@ -69,31 +234,50 @@ def create_app():
     @app.errorhandler(500)
     def internal_error(e):
         db.session.rollback()
-        logger.error(f"Interner Serverfehler: {e}")
+        logger.error("Interner Serverfehler: %s", e)
         flash('Ein interner Fehler ist aufgetreten. Bitte versuche es erneut.')
         return redirect(url_for('dashboard'))
     
     return app
 
+def configure_sqlite(app):
+    """Setzt die SQLite-Pragmas für jede neue Verbindung"""
+    if not app.config['SQLALCHEMY_DATABASE_URI'].startswith('sqlite'):
+        return
+    
+    pragmas = [
+        # Muss vor dem ersten Schreibzugriff kommen und wirkt nur auf neue
+        # Datenbanken (bestehende: flask archive compact --full)
+        "PRAGMA auto_vacuum=INCREMENTAL",
+        f"PRAGMA journal_mode={app.config['SQLITE_JOURNAL_MODE']}",
+        f"PRAGMA synchronous={app.config['SQLITE_SYNCHRONOUS']}",
+        f"PRAGMA busy_timeout={app.config['SQLITE_BUSY_TIMEOUT_MS']}",
+        # Negative Werte bedeuten KiB statt Seiten
+        f"PRAGMA cache_size=-{app.config['SQLITE_CACHE_SIZE_KB']}",
+    ]
+    
+    with app.app_context():
+        @event.listens_for(db.engine, 'connect')
+        def set_sqlite_pragmas(dbapi_connection, connection_record):
+            cursor = dbapi_connection.cursor()
+            try:
+                for pragma in pragmas:
+                    cursor.execute(pragma)
+            finally:
+                cursor.close()
+
 def init_default_data():
     """Initialisiert Standarddaten in der Datenbank"""
     try:
-        # Default settings
-        defaults = {
-            'notify_time': '12:00',
-            'dinner_time': '18:00',
-            'cooldown_days': '14',
-            'max_changes': '3'
-        }
-        for key, value in defaults.items():
-            if not Setting.query.filter_by(key=key).first():
-                db.session.add(Setting(key=key, value=value))
+        # Standardraum mit Default settings (eine Abfrage für alle Schlüssel)
+        ensure_default_room()
+        ensure_room_settings(DEFAULT_ROOM_ID)
         
         # Create default admin if not exists
         if not User.query.filter_by(username='admin').first():
             admin = User(
                 username='admin', 
-                password_hash=generate_password_hash('admin123'),
+                password_hash=hash_password('admin123'),
                 role='admin'
             )
             db.session.add(admin)
@@ -102,73 +286,171 @@ def init_default_data():
         db.session.commit()
     except Exception as e:
         db.session.rollback()
-        logger.error(f"Fehler beim Initialisieren der Standarddaten: {e}")
+        logger.error("Fehler beim Initialisieren der Standarddaten: %s", e)
         raise
 
+def parse_users_spec(users_env):
+    """Zerlegt die USERS-Variable in (username, password, role, room)-Tupel
+    
+    Der Raum (Kürzel) ist optional, ohne Angabe None (Standardraum).
+    Ungültige Einträge werden mit Warnung übersprungen. Doppelte
+    Benutzernamen: der letzte Eintrag gewinnt.
+    """
+    users = {}
+    for user_def in users_env.split(','):
+        user_def = user_def.strip()
+        if not user_def:
+            continue
+        
+        parts = user_def.split(':')
+        if len(parts) not in (3, 4):
+            logger.warning("Ungültiges Benutzerformat: %s (erwartet: username:password:role[:raum])",
+                           user_def)
+            continue
+        
+        username, password, role = (part.strip() for part in parts[:3])
+        room = parts[3].strip().lower() if len(parts) == 4 and parts[3].strip() else None
+        if role not in ['player', 'admin']:
+            logger.warning("Ungültige Rolle für %s: %s (erwartet: player oder admin)", username, role)
+            continue
+        users[username] = (username, password, role, room)
+    return list(users.values())
+
+def _provisioned_digest(users):
+    """Prüfsumme über Name, Hash, Rolle und Raum der provisionierten Benutzer"""
+    digest = hashlib.sha256()
+    for user in sorted(users, key=lambda u: u.username):
+        digest.update(f'{user.username}\0{user.password_hash}\0{user.role}\0{user.room_id}\n'.encode())
+    return digest.hexdigest()
+
 def create_users_from_env():
     """Erstellt Benutzer aus USERS Umgebungsvariable
     
-    Format: username:password:role,username:password:role,...
-    Beispiel: USERS=max:geheim123:player,anna:test456:player,admin:admin123:admin
+    Format: username:password:role[:raum],username:password:role[:raum],...
+    Beispiel: USERS=max:geheim123:player,anna:test456:player:familie,admin:admin123:admin
+    
+    Ein unbekannter Raum wird mit Standardeinstellungen angelegt.
+    
+    Teures Hashing wird vermieden: Ist die Spezifikation unverändert und hat
+    niemand die provisionierten Benutzer angefasst, genügt ein einziger
+    Hash-Vergleich. Sonst werden nur geänderte Passwörter neu gehasht,
+    parallel in einem Prozess-Pool.
     """
     users_env = os.environ.get('USERS', '')
     if not users_env:
         logger.info("Keine USERS Umgebungsvariable gefunden, überspringe Benutzererstellung")
         return
     
+    started = time.perf_counter()
     try:
-        user_definitions = users_env.split(',')
+        specs = parse_users_spec(users_env)
+        if not specs:
+            return
+        
+        # Ein IN-Query statt einer Abfrage pro Benutzer
+        existing = {u.username: u for u in User.query.filter(
+            User.username.in_([username for username, _, _, _ in specs]))}
+        
+        state = {s.key: s.value for s in Setting.query.filter(
+            Setting.room_id == DEFAULT_ROOM_ID,
+            Setting.key.in_(['_users_env_spec', '_users_env_digest']))}
+        if (len(existing) == len(specs)
+                and state.get('_users_env_digest') == _provisioned_digest(existing.values())
+                and not any(needs_rehash(u.password_hash) for u in existing.values())
+                and '_users_env_spec' in state
+                and check_password_hash(state['_users_env_spec'], users_env)):
+            logger.info("Benutzer aus USERS unverändert (%s), übersprungen in %.2fs",
+                        len(specs), time.perf_counter() - started)
+            return
+        
+        # Räume auflösen, unbekannte anlegen (ohne Angabe: Standardraum)
+        room_ids = {None: DEFAULT_ROOM_ID}
+        for slug in {room for _, _, _, room in specs if room is not None}:
+            room = find_room(slug) or create_room(slug, slug)
+            room_ids[slug] = room.id
+        
+        # Bestehende Passwörter parallel prüfen, nur geänderte neu hashen
+        known = [(username, password) for username, password, _, _ in specs if username in existing]
+        unchanged = verify_passwords(
+            [(existing[username].password_hash, password) for username, password in known])
+        changed_passwords = {username for (username, _), ok in zip(known, unchanged)
+                             if not ok or needs_rehash(existing[username].password_hash)}
+        
+        to_hash = [(username, password) for username, password, _, _ in specs
+                   if username not in existing or username in changed_passwords]
+        new_hashes = dict(zip([username for username, _ in to_hash],
+                              hash_passwords([password for _, password in to_hash])))
+        
         created_count = 0
         updated_count = 0
-        
-        for user_def in user_definitions:
-            user_def = user_def.strip()
-            if not user_def:
-                continue
-            
-            parts = user_def.split(':')
-            if len(parts) != 3:
-                logger.warning(f"Ungültiges Benutzerformat: {user_def} (erwartet: username:password:role)")
-                continue
-            
-            username, password, role = parts
-            username = username.strip()
-            password = password.strip()
-            role = role.strip()
-            
-            if role not in ['player', 'admin']:
-                logger.warning(f"Ungültige Rolle für {username}: {role} (erwartet: player oder admin)")
-                continue
-            
-            # Prüfen ob Benutzer existiert
-            existing_user = User.query.filter_by(username=username).first()
-            if existing_user:
-                # Benutzer existiert - Passwort und Rolle aktualisieren
-                existing_user.password_hash = generate_password_hash(password)
-                existing_user.role = role
+        new_users = []
+        changed_rooms = set()
+        for username, password, role, room in specs:
+            user = existing.get(username)
+            room_id = room_ids[room]
+            if user is None:
+                new_users.append({'username': username, 'password_hash': new_hashes[username],
+                                  'role': role, 'points': 0, 'room_id': room_id})
+                created_count += 1
+                changed_rooms.add(room_id)
+                logger.info("Neuer Benutzer erstellt: %s (Rolle: %s, Raum: %s)",
+                            username, role, room_id)
+            elif username in new_hashes or user.role != role or user.room_id != room_id:
+                if username in new_hashes:
+                    user.password_hash = new_hashes[username]
+                if user.room_id != room_id:
+                    changed_rooms |= {user.room_id, room_id}
+                    user.room_id = room_id
+                user.role = role
                 updated_count += 1
-                logger.info(f"Benutzer aktualisiert: {username} (Rolle: {role})")
+                logger.info("Benutzer aktualisiert: %s (Rolle: %s, Raum: %s)", username, role, room_id)
+        
+        if new_users:
+            db.session.execute(db.insert(User), new_users)
+        
+        # Zustand für den nächsten Start merken
+        provisioned = User.query.filter(User.username.in_([username for username, _, _, _ in specs])).all()
+        for key, value in [('_users_env_spec', hash_password(users_env)),
+                           ('_users_env_digest', _provisioned_digest(provisioned))]:
+            setting = Setting.query.filter_by(room_id=DEFAULT_ROOM_ID, key=key).first()
+            if setting:
+                setting.value = value
             else:
-                # Neuen Benutzer erstellen
-                new_user = User(
-                    username=username,
-                    password_hash=generate_password_hash(password),
-                    role=role
-                )
-                db.session.add(new_user)
-                created_count += 1
-                logger.info(f"Neuer Benutzer erstellt: {username} (Rolle: {role})")
+                db.session.add(Setting(room_id=DEFAULT_ROOM_ID, key=key, value=value))
         
         db.session.commit()
+        for room_id in changed_rooms:
+            leaderboard_cache.invalidate(room_id)
+        if updated_count:
+            identity_cache.invalidate_all()
         
-        if created_count > 0 or updated_count > 0:
-            logger.info(f"Benutzerverwaltung abgeschlossen: {created_count} erstellt, {updated_count} aktualisiert")
+        logger.info("Benutzerverwaltung abgeschlossen: %s erstellt, %s aktualisiert in %.2fs",
+                    created_count, updated_count, time.perf_counter() - started)
     
     except Exception as e:
         db.session.rollback()
-        logger.error(f"Fehler beim Erstellen von Benutzern aus Umgebungsvariable: {e}")
+        logger.error("Fehler beim Erstellen von Benutzern aus Umgebungsvariable: %s", e)
         raise
 
+def register_jobs(app):
+    """Registriert die wiederkehrenden Wartungsjobs (gestartet über scheduler.start())"""
+    prune_batch_size = int(os.environ.get('COOLDOWN_PRUNE_BATCH_SIZE', '500'))
+    scheduler.add_job('prune_cooldowns',
+                      lambda: prune_expired_cooldowns(batch_size=prune_batch_size),
+                      every(6 * 3600))
+    scheduler.add_job('prune_round_events', prune_round_events, every(3600))
+    scheduler.add_job('prune_login_buckets', login_limiter.prune, every(3600))
+    # Stempel vergangener Tage und gelöschter Benutzer (sonst eine Datei pro Raum und Tag)
+    scheduler.add_job('prune_stamps',
+                      lambda: prune_round_stamps() + identity_cache.prune_stamps(),
+                      daily(dtime(0, 30)))
+    # Ein Job für die Phasenwechsel aller Räume (Runde schließen, Push, siehe rooms.py)
+    scheduler.add_job('room_transitions', run_room_transitions, room_schedule.next_due)
+    # Abgestimmt wird in allen Räumen bis Mitternacht
+    scheduler.add_job('rollup_stats', rollup_pending, daily(dtime(0, 0)))
+    scheduler.add_job('archive_old_rows', archive_old_rows, daily(dtime(3, 30)))
+    scheduler.add_job('backup', create_backup, daily(dtime(4, 0)))
+
 def register_routes(app):
     """Registriert alle Routen"""
     
@@ -189,16 +471,39 @@ def register_routes(app):
                     flash('Bitte Benutzername und Passwort eingeben')
                     return render_template('login.html')
                 
+                # Überzählige Versuche abweisen, bevor teuer gehasht wird
+                user_key = f'user:{username.lower()}'
+                user_capacity = app.config['LOGIN_RATE_USER_CAPACITY']
+                buckets = [(user_key, user_capacity, app.config['LOGIN_RATE_USER_PER_MINUTE'])]
+                if app.config['LOGIN_RATE_IP_CAPACITY'] > 0:
+                    buckets.insert(0, (f'ip:{request.remote_addr}', app.config['LOGIN_RATE_IP_CAPACITY'],
+                                       app.config['LOGIN_RATE_IP_PER_MINUTE']))
+                for key, capacity, per_minute in buckets:
+                    allowed, retry_after = login_limiter.consume(key, capacity, per_minute)
+                    if not allowed:
+                        logger.warning("Login-Ratenlimit erreicht (%s)", key,
+                                       extra={'event': 'login_rate_limited'})
+                        flash(f'Zu viele Anmeldeversuche. Bitte warte {retry_after} Sekunden.')
+                        return render_template('login.html'), 429, {'Retry-After': str(retry_after)}
+                
                 user = User.query.filter_by(username=username).first()
                 if user and check_password_hash(user.password_hash, password):
+                    login_limiter.refund(user_key, user_capacity)
+                    if needs_rehash(user.password_hash):
+                        # Veraltete Hash-Parameter transparent aktualisieren
+                        user.password_hash = hash_password(password)
+                        db.session.commit()
+                        logger.info("Passwort-Hash für %s erneuert", username)
                     login_user(user)
-                    logger.info(f"Benutzer {username} erfolgreich eingeloggt")
+                    logger.info("Benutzer %s erfolgreich eingeloggt", username,
+                                extra={'event': 'login', 'user_id': user.id})
                     return redirect(url_for('dashboard'))
                 
                 flash('Ungültiger Benutzername oder Passwort')
-                logger.warning(f"Fehlgeschlagener Login-Versuch für Benutzer: {username}")
+                logger.warning("Fehlgeschlagener Login-Versuch für Benutzer: %s", username,
+                               extra={'event': 'login_failed'})
             except Exception as e:
-                logger.error(f"Fehler beim Login: {e}")
+                logger.error("Fehler beim Login: %s", e)
                 flash('Ein Fehler ist aufgetreten. Bitte versuche es erneut.')
         
         return render_template('login.html')
@@ -208,48 +513,48 @@ def register_routes(app):
     def logout():
         username = current_user.username
         logout_user()
-        logger.info(f"Benutzer {username} ausgeloggt")
+        logger.info("Benutzer %s ausgeloggt", username, extra={'event': 'logout'})
         return redirect(url_for('login'))
     
     @app.route('/dashboard')
     @login_required
     def dashboard():
         try:
-            today = datetime.now().date()
-            now_time = datetime.now().strftime('%H:%M')
+            room_id = current_user.room_id
+            state = clock.state(room_id)
+            today = state.day
             
-            # Get settings
-            notify_time_setting = Setting.query.filter_by(key='notify_time').first()
-            dinner_time_setting = Setting.query.filter_by(key='dinner_time').first()
-            
-            if not notify_time_setting or not dinner_time_setting:
-                logger.error("Zeiteinstellungen nicht gefunden")
-                flash('Konfigurationsfehler. Bitte kontaktiere den Administrator.')
-                return redirect(url_for('settings'))
-            
-            notify_time = notify_time_setting.value
-            dinner_time = dinner_time_setting.value
+            # Get settings (aus dem Cache, bereits geparst)
+            game_settings = settings_cache.get(room_id)
+            notify_time = game_settings.notify_time
+            dinner_time = game_settings.dinner_time
             
             # State flags
-            is_open = now_time >= notify_time and now_time < dinner_time
-            is_dinner = now_time >= dinner_time
+            is_open = state.phase == 'open'
+            is_dinner = state.phase == 'voting'
             
-            user_word = WordLog.query.filter_by(user_id=current_user.id, date=today).first()
+            # Ein gecachter Snapshot statt einer Abfrage pro Teilnehmer;
+            # in der Abstimmungsphase der eingefrorene Stand
+            if is_dinner:
+                snapshot = round_cache.voting_snapshot(room_id, today)
+            else:
+                snapshot = round_cache.get(room_id, today)
+            user_word = snapshot.get(current_user.id)
             
             all_words = []
-            if user_word or is_dinner:
+            if snapshot.visible_to(current_user.id, state.phase):
                 # Show all words if user submitted or if dinner has started
-                all_words = WordLog.query.filter_by(date=today).all()
+                all_words = snapshot.entries
             
             return render_template('dashboard.html', 
                                    user_word=user_word, 
                                    all_words=all_words,
-                                   notify_time=notify_time,
-                                   dinner_time=dinner_time,
+                                   notify_time=notify_time.strftime('%H:%M'),
+                                   dinner_time=dinner_time.strftime('%H:%M'),
                                    is_open=is_open,
                                    is_dinner=is_dinner)
         except Exception as e:
-            logger.error(f"Fehler im Dashboard: {e}")
+            logger.error("Fehler im Dashboard: %s", e)
             flash('Ein Fehler ist aufgetreten beim Laden des Dashboards.')
             return redirect(url_for('login'))
     
@@ -257,13 +562,112 @@ def register_routes(app):
     @login_required
     def leaderboard():
         try:
-            users = User.query.order_by(User.points.desc()).all()
-            return render_template('leaderboard.html', users=users)
+            per_page = app.config['LEADERBOARD_PAGE_SIZE']
+            room_id = current_user.room_id
+            snapshot = leaderboard_cache.get(room_id)
+            page = request.args.get('page', type=int)
+            if page is None:
+                # Ohne Angabe die Seite mit dem eigenen Platz zeigen
+                page = snapshot.page_of(current_user.id, per_page)
+            board, rows_html = leaderboard_cache.render_page(room_id, page, per_page)
+            return render_template('leaderboard.html', board=board, rows_html=rows_html,
+                                   me=snapshot.rank_of(current_user.id),
+                                   my_page=snapshot.page_of(current_user.id, per_page))
         except Exception as e:
-            logger.error(f"Fehler beim Laden der Bestenliste: {e}")
+            logger.error("Fehler beim Laden der Bestenliste: %s", e)
             flash('Fehler beim Laden der Bestenliste.')
             return redirect(url_for('dashboard'))
     
+    @app.route('/stats')
+    @login_required
+    def stats():
+        try:
+            return render_template('stats.html', stats=stats_overview(current_user.room_id, current_user.id))
+        except Exception as e:
+            logger.error("Fehler beim Laden der Statistik: %s", e)
+            flash('Ein Fehler ist aufgetreten beim Laden der Statistik.')
+            return redirect(url_for('dashboard'))
+    
+    @app.route('/events')
+    @login_required
+    def events():
+        """Server-Sent-Events-Stream mit kleinen JSON-Deltas zur Runde"""
+        if event_hub.client_count >= app.config['SSE_MAX_CLIENTS']:
+            # Client fällt auf normales Neuladen zurück
+            logger.warning("Live-Feed voll (%s Streams), Client fällt auf Neuladen zurück",
+                           event_hub.client_count, extra={'event': 'sse_rejected'})
+            return Response(status=503, headers={'Retry-After': '30'})
+        
+        room_id = current_user.room_id
+        state = clock.state(room_id)
+        can_see_words = (state.phase == 'voting'
+                         or round_cache.get(room_id, state.day).get(current_user.id) is not None)
+        subscriber = event_hub.subscribe(current_user.id, room_id, can_see_words)
+        max_seconds = app.config['SSE_STREAM_SECONDS']
+        
+        def stream():
+            try:
+                yield 'retry: 5000\n\n'
+                deadline = time.monotonic() + max_seconds
+                while time.monotonic() < deadline:
+                    try:
+                        yield subscriber.queue.get(timeout=15)
+                    except queue.Empty:
+                        yield ': keepalive\n\n'
+            finally:
+                event_hub.unsubscribe(subscriber)
+        
+        return Response(stream(), mimetype='text/event-stream',
+                        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+    
+    @app.route('/api/push/public_key')
+    @login_required
+    def push_public_key():
+        public_key = vapid_public_key(app.config)
+        if not public_key:
+            return jsonify(error='Push-Benachrichtigungen sind nicht konfiguriert'), 404
+        return jsonify(public_key=public_key)
+    
+    @app.route('/api/push/subscribe', methods=['POST'])
+    @login_required
+    def push_subscribe():
+        try:
+            info = request.get_json(silent=True) or {}
+            keys = info.get('keys') or {}
+            endpoint = info.get('endpoint')
+            if not endpoint or not keys.get('p256dh') or not keys.get('auth'):
+                return jsonify(error='Ungültige Subscription'), 400
+            
+            if not find_subscriptions(current_user.id, endpoint):
+                subscription_info = {'endpoint': endpoint,
+                                     'keys': {'p256dh': keys['p256dh'], 'auth': keys['auth']}}
+                db.session.add(Subscription(user_id=current_user.id,
+                                            subscription_info=json.dumps(subscription_info)))
+                db.session.commit()
+                logger.info("Push-Subscription für %s gespeichert", current_user.username)
+            return jsonify(status='subscribed'), 201
+        except Exception as e:
+            db.session.rollback()
+            logger.error("Fehler beim Speichern der Push-Subscription: %s", e)
+            return jsonify(error='Subscription konnte nicht gespeichert werden'), 500
+    
+    @app.route('/api/push/unsubscribe', methods=['POST'])
+    @login_required
+    def push_unsubscribe():
+        try:
+            endpoint = (request.get_json(silent=True) or {}).get('endpoint')
+            if not endpoint:
+                return jsonify(error='Endpunkt fehlt'), 400
+            
+            for subscription in find_subscriptions(current_user.id, endpoint):
+                db.session.delete(subscription)
+            db.session.commit()
+            return jsonify(status='unsubscribed')
+        except Exception as e:
+            db.session.rollback()
+            logger.error("Fehler beim Entfernen der Push-Subscription: %s", e)
+            return jsonify(error='Subscription konnte nicht entfernt werden'), 500
+    
     @app.route('/settings')
     @login_required
     def settings():
@@ -287,54 +691,86 @@ def register_routes(app):
                 flash('Wort ist zu lang (max. 100 Zeichen)')
                 return redirect(url_for('dashboard'))
             
-            today = datetime.now().date()
-            now_time = datetime.now().strftime('%H:%M')
+            room_id = current_user.room_id
+            state = clock.state(room_id)
+            today = state.day
+            game_settings = settings_cache.get(room_id)
             
-            notify_time = Setting.query.filter_by(key='notify_time').first().value
-            dinner_time = Setting.query.filter_by(key='dinner_time').first().value
-            
-            if now_time < notify_time:
-                flash('Die Eingabe startet erst um {notify_time} Uhr.')
+            if state.phase == 'waiting':
+                flash(f"Die Eingabe startet erst um {game_settings.notify_time.strftime('%H:%M')} Uhr.")
                 return redirect(url_for('dashboard'))
                 
-            if now_time >= dinner_time:
+            if state.phase == 'voting':
                 flash('Die Abstimmungsphase hat bereits begonnen. Keine Änderungen mehr möglich.')
                 return redirect(url_for('dashboard'))
             
-            # Check cooldown
-            cooldown = CooldownLog.query.filter_by(word=word).first()
-            if cooldown and cooldown.expiry_date > today:
-                flash(f'Dieses Wort steht noch unter Cooldown bis zum {cooldown.expiry_date}')
+            # Check cooldown (Hash-Lookup im In-Memory-Index)
+            cooldown_expiry = cooldown_index.lookup(room_id, word, today)
+            if cooldown_expiry:
+                flash(f'Dieses Wort steht noch unter Cooldown bis zum {cooldown_expiry}')
                 return redirect(url_for('dashboard'))
             
             # Check duplicates for today
-            duplicate = WordLog.query.filter_by(word=word, date=today).first()
+            duplicate = WordLog.query.filter_by(room_id=room_id, word=word, date=today).first()
             if duplicate and duplicate.user_id != current_user.id:
                 flash('Dieses Wort wurde heute bereits von jemand anderem gewählt.')
                 return redirect(url_for('dashboard'))
             
+            # Ähnliche Schreibweisen (Plural, Tippfehler) zählen wie dasselbe Wort
+            conflict = similarity_index.find_conflict(room_id, word, today, current_user.id)
+            if conflict:
+                reason, similar_word, expiry = conflict
+                if reason == 'cooldown':
+                    flash(f"'{word}' ist zu ähnlich zu '{similar_word}' (Cooldown bis zum {expiry})")
+                else:
+                    # Blinde Einreichung: das Wort eines anderen Spielers nicht verraten
+                    flash(f"'{word}' ist zu ähnlich zu einem heute bereits gewählten Wort.")
+                return redirect(url_for('dashboard'))
+            
             # Check changes limit
-            max_changes = int(Setting.query.filter_by(key='max_changes').first().value)
+            max_changes = game_settings.max_changes
             existing_log = WordLog.query.filter_by(user_id=current_user.id, date=today).first()
             
+            changed = True
             if existing_log:
                 if existing_log.word != word:
                     if existing_log.changes_count >= max_changes:
                         flash('Du hast das Limit für Wortänderungen heute erreicht.')
                         return redirect(url_for('dashboard'))
-                    existing_log.word = word
-                    existing_log.changes_count += 1
+                    # Bedingtes UPDATE: ein bereits gesperrtes Wort bleibt unverändert,
+                    # auch wenn die Runde gerade eben geschlossen wurde
+                    updated = WordLog.query.filter(
+                        WordLog.id == existing_log.id, WordLog.is_locked.isnot(True)
+                    ).update({'word': word, 'changes_count': WordLog.changes_count + 1},
+                             synchronize_session=False)
+                    if not updated:
+                        flash('Die Abstimmungsphase hat bereits begonnen. Keine Änderungen mehr möglich.')
+                        return redirect(url_for('dashboard'))
+                else:
+                    changed = False
             else:
-                new_log = WordLog(user_id=current_user.id, word=word, date=today)
+                new_log = WordLog(user_id=current_user.id, word=word, date=today, room_id=room_id)
                 db.session.add(new_log)
+                db.session.flush()
+                if round_cache.get(room_id, today).closed:
+                    db.session.rollback()
+                    flash('Die Abstimmungsphase hat bereits begonnen. Keine Änderungen mehr möglich.')
+                    return redirect(url_for('dashboard'))
             
+            if changed:
+                publish('word_submitted', room_id, user_id=current_user.id,
+                        username=current_user.username, word=word)
             db.session.commit()
-            logger.info(f"Benutzer {current_user.username} hat Wort '{word}' eingereicht")
+            if changed:
+                round_cache.invalidate(room_id, today)
+                similarity_index.add(word, room_id, today)
+            logger.info("Benutzer %s hat Wort '%s' eingereicht", current_user.username, word,
+                        extra={'event': 'word_submitted', 'user_id': current_user.id})
             flash('Wort erfolgreich eingeloggt!')
             
         except Exception as e:
             db.session.rollback()
-            logger.error(f"Fehler beim Einreichen des Wortes: {e}")
+            logger.error("Fehler beim Einreichen des Wortes: %s", e)
             flash('Fehler beim Speichern des Wortes. Bitte versuche es erneut.')
         
         return redirect(url_for('dashboard'))
@@ -343,26 +779,34 @@ def register_routes(app):
     @login_required
     def withdraw_word():
         try:
-            today = datetime.now().date()
-            now_time = datetime.now().strftime('%H:%M')
-            dinner_time = Setting.query.filter_by(key='dinner_time').first().value
+            room_id = current_user.room_id
+            state = clock.state(room_id)
+            today = state.day
             
-            if now_time >= dinner_time:
+            if state.phase == 'voting':
                 flash('Die Abstimmungsphase hat bereits begonnen. Zurückziehen nicht mehr möglich.')
                 return redirect(url_for('dashboard'))
             
-            deleted_count = WordLog.query.filter_by(user_id=current_user.id, date=today).delete()
+            # Gesperrte Wörter werden nie gelöscht
+            deleted_count = WordLog.query.filter(
+                WordLog.user_id == current_user.id, WordLog.date == today,
+                WordLog.is_locked.isnot(True)
+            ).delete(synchronize_session=False)
+            if deleted_count > 0:
+                publish('word_withdrawn', room_id, user_id=current_user.id)
             db.session.commit()
             
             if deleted_count > 0:
-                logger.info(f"Benutzer {current_user.username} hat Wort zurückgezogen")
+                round_cache.invalidate(room_id, today)
+                logger.info("Benutzer %s hat Wort zurückgezogen", current_user.username,
+                            extra={'event': 'word_withdrawn', 'user_id': current_user.id})
                 flash('Wort zurückgezogen.')
             else:
                 flash('Kein Wort zum Zurückziehen gefunden.')
                 
         except Exception as e:
             db.session.rollback()
-            logger.error(f"Fehler beim Zurückziehen des Wortes: {e}")
+            logger.error("Fehler beim Zurückziehen des Wortes: %s", e)
             flash('Fehler beim Zurückziehen des Wortes.')
         
         return redirect(url_for('dashboard'))
@@ -377,32 +821,51 @@ def register_routes(app):
                 return redirect(url_for('dashboard'))
             
             voted_user = User.query.get(voted_user_id)
+            room_id = current_user.room_id
             
-            if not voted_user:
+            # Abgestimmt wird nur im eigenen Raum
+            if not voted_user or voted_user.room_id != room_id:
                 flash('Benutzer nicht gefunden')
                 return redirect(url_for('dashboard'))
             
-            voted_user.points += 1
+            voted_username = voted_user.username
+            state = clock.state(room_id)
+            today = state.day
+            # Vor der Stimme: voting_snapshot() schließt ggf. die Runde mit
+            # eigenem Commit bzw. Rollback, der die Stimme sonst mitnähme
+            if state.phase == 'voting':
+                snapshot = round_cache.voting_snapshot(room_id, today)
+            else:
+                snapshot = round_cache.get(room_id, today)
+            try:
+                record_vote(room_id, current_user.id, voted_user.id, today)
+            except IntegrityError:
+                db.session.rollback()
+                flash(f'Du hast heute bereits für {voted_username} abgestimmt.')
+                return redirect(url_for('dashboard'))
             
             # Add word to cooldown
-            today = datetime.now().date()
-            user_word = WordLog.query.filter_by(user_id=voted_user.id, date=today).first()
+            user_word = snapshot.get(voted_user.id)
+            cooldown_expiry = None
             if user_word:
-                cooldown_days = int(Setting.query.filter_by(key='cooldown_days').first().value)
-                expiry = today + timedelta(days=cooldown_days)
-                cd = CooldownLog.query.filter_by(word=user_word.word).first()
-                if cd:
-                    cd.expiry_date = expiry
-                else:
-                    db.session.add(CooldownLog(word=user_word.word, expiry_date=expiry))
+                cooldown_days = settings_cache.get(room_id).cooldown_days
+                cooldown_expiry = today + timedelta(days=cooldown_days)
+                upsert_cooldown(room_id, user_word.word, cooldown_expiry)
             
+            publish('points_awarded', room_id, user_id=voted_user.id, username=voted_username)
             db.session.commit()
-            logger.info(f"Punkt vergeben an {voted_user.username} von {current_user.username}")
-            flash(f'Punkt vergeben an {voted_user.username}!')
+            if cooldown_expiry:
+                cooldown_index.add(room_id, user_word.word, cooldown_expiry)
+                similarity_index.add(user_word.word)
+            leaderboard_cache.invalidate(room_id)
+            identity_cache.invalidate(voted_user.id)
+            logger.info("Punkt vergeben an %s von %s", voted_username, current_user.username,
+                        extra={'event': 'vote', 'user_id': current_user.id, 'target_id': voted_user.id})
+            flash(f'Punkt vergeben an {voted_username}!')
             
         except Exception as e:
             db.session.rollback()
-            logger.error(f"Fehler beim Abstimmen: {e}")
+            logger.error("Fehler beim Abstimmen: %s", e)
             flash('Fehler beim Vergeben des Punktes.')
         
         return redirect(url_for('dashboard'))
@@ -420,58 +883,20 @@ def register_routes(app):
                 flash('Passwort muss mindestens 4 Zeichen lang sein')
                 return redirect(url_for('settings'))
             
-            current_user.password_hash = generate_password_hash(new_password)
+            user = User.query.get(current_user.id)
+            user.password_hash = hash_password(new_password)
             db.session.commit()
-            logger.info(f"Benutzer {current_user.username} hat Passwort geändert")
+            identity_cache.invalidate(user.id)
+            logger.info("Benutzer %s hat Passwort geändert", current_user.username)
             flash('Passwort erfolgreich geändert!')
             
         except Exception as e:
             db.session.rollback()
-            logger.error(f"Fehler beim Ändern des Passworts: {e}")
+            logger.error("Fehler beim Ändern des Passworts: %s", e)
             flash('Fehler beim Ändern des Passworts.')
         
         return redirect(url_for('settings'))
-    
-    @app.route('/admin', methods=['GET', 'POST'])
-    @login_required
-    def admin_panel():
-        if current_user.role != 'admin':
-            logger.warning(f"Unbefugter Zugriff auf Admin-Panel von {current_user.username}")
-            return "Zugriff verweigert", 403
-        
-        try:
-            if request.method == 'POST':
-                if 'update_settings' in request.form:
-                    for key in ['notify_time', 'dinner_time', 'cooldown_days', 'max_changes']:
-                        setting = Setting.query.filter_by(key=key).first()
-                        if setting:
-                            setting.value = request.form.get(key)
-                    db.session.commit()
-                    logger.info("Einstellungen aktualisiert")
-                    flash('Einstellungen aktualisiert')
-                
-                elif 'reward_points' in request.form:
-                    user_id = request.form.get('user_id')
-                    new_points = request.form.get('points')
-                    user = User.query.get(user_id)
-                    if user and new_points:
-                        user.points = int(new_points)
-                        db.session.commit()
-                        logger.info(f"Punkte für {user.username} auf {new_points} gesetzt")
-                        flash(f'Punkte für {user.username} auf {new_points} gesetzt.')
-            
-            users = User.query.all()
-            settings = {s.key: s.value for s in Setting.query.all()}
-            return render_template('admin.html', users=users, settings=settings)
-            
-        except Exception as e:
-            db.session.rollback()
-            logger.error(f"Fehler im Admin-Panel: {e}")
-            flash('Ein Fehler ist aufgetreten.')
-            return redirect(url_for('dashboard'))
-
-# Für direkte Ausführung
-app = create_app()
 
+# Für direkte Ausführung (Produktion: wsgi.py, Entwicklung: run.py)
 if __name__ == '__main__':
-    app.run(debug=True, host='0.0.0.0', port=5000)
+    create_app().run(debug=True, host='0.0.0.0', port=5000)
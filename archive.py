@@ -0,0 +1,187 @@
+"""Archivierung alter Zeilen in komprimierte JSONL-Dateien
+
+Zeilen aus WordLog, Vote und ClosedRound, die älter als
+ARCHIVE_RETENTION_DAYS sind, werden in Batches nach
+`instance/archive/<tabelle>/<JJJJ-MM>.jsonl.gz` verschoben. Die Dateien sind
+append-only: jeder Batch wird als eigenes gzip-Member angehängt und erst nach
+fsync in der Datenbank gelöscht. Stürzt der Prozess dazwischen ab, steht ein
+Batch doppelt im Archiv; `iter_rows()` filtert solche Duplikate über die id.
+
+Archiviert werden nur Tage, die die Statistik bereits fortgeschrieben hat
+(siehe stats.py). Danach gibt `incremental_vacuum()` freie Seiten in kleinen
+Schritten an das Dateisystem zurück, ohne die App lange zu blockieren.
+"""
+from datetime import date, datetime, timedelta
+import gzip
+import json
+import logging
+import os
+import time
+
+from flask import current_app
+
+from clock import clock
+from models import db, WordLog, Vote, ClosedRound
+import stats
+
+logger = logging.getLogger(__name__)
+
+# Tabelle -> Modell (jeweils mit den Spalten id und date)
+ARCHIVED_MODELS = {
+    'word_log': WordLog,
+    'vote': Vote,
+    'closed_round': ClosedRound,
+}
+
+
+def _archive_dir(table):
+    return os.path.join(current_app.config['ARCHIVE_DIR'], table)
+
+
+def _serialize(model, row):
+    record = {}
+    for column in model.__table__.columns:
+        value = getattr(row, column.key)
+        record[column.key] = value.isoformat() if isinstance(value, (date, datetime)) else value
+    return record
+
+
+def _append(path, records):
+    """Hängt Datensätze als neues gzip-Member an und wartet auf die Platte"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'ab') as raw:
+        with gzip.GzipFile(fileobj=raw, mode='ab') as f:
+            for record in records:
+                f.write(json.dumps(record, ensure_ascii=False).encode() + b'\n')
+        raw.flush()
+        os.fsync(raw.fileno())
+
+
+def archive_cutoff(retention_days, today=None):
+    """Erster Tag, der in der Datenbank bleibt"""
+    today = today or clock.today()
+    cutoff = today - timedelta(days=retention_days)
+    # Noch nicht fortgeschriebene Runden bleiben für die Statistik erhalten
+    rolled_up = stats.rolled_up_through()
+    if rolled_up is None:
+        return None
+    return min(cutoff, rolled_up + timedelta(days=1))
+
+
+def archive_table(table, cutoff, batch_size):
+    """Verschiebt alle Zeilen von `table` vor `cutoff` ins Archiv; liefert die Anzahl"""
+    model = ARCHIVED_MODELS[table]
+    moved = 0
+    while True:
+        rows = model.query.filter(model.date < cutoff).order_by(
+            model.date, model.id).limit(batch_size).all()
+        if not rows:
+            return moved
+
+        by_month = {}
+        for row in rows:
+            by_month.setdefault(row.date.strftime('%Y-%m'), []).append(_serialize(model, row))
+        for month, records in by_month.items():
+            _append(os.path.join(_archive_dir(table), f'{month}.jsonl.gz'), records)
+
+        model.query.filter(model.id.in_([row.id for row in rows])).delete(synchronize_session=False)
+        db.session.commit()
+        moved += len(rows)
+
+
+def archive_old_rows(retention_days=None, batch_size=None, today=None):
+    """Job: archiviert alte Zeilen aller Tabellen und verkleinert danach die Datenbank"""
+    config = current_app.config
+    retention_days = retention_days or config['ARCHIVE_RETENTION_DAYS']
+    batch_size = batch_size or config['ARCHIVE_BATCH_SIZE']
+    cutoff = archive_cutoff(retention_days, today)
+    if cutoff is None:
+        logger.info("Archivierung übersprungen: Statistik noch nicht fortgeschrieben")
+        return {}
+
+    started = time.perf_counter()
+    moved = {table: archive_table(table, cutoff, batch_size) for table in ARCHIVED_MODELS}
+    if any(moved.values()):
+        freed = incremental_vacuum()
+        logger.info("Archiviert vor %s: %s, %s Seiten freigegeben in %.2fs",
+                    cutoff, moved, freed, time.perf_counter() - started)
+    return moved
+
+
+def months(table):
+    """Vorhandene Archiv-Partitionen einer Tabelle, älteste zuerst"""
+    directory = _archive_dir(table)
+    if not os.path.isdir(directory):
+        return []
+    return sorted(name[:-len('.jsonl.gz')] for name in os.listdir(directory)
+                  if name.endswith('.jsonl.gz'))
+
+
+def iter_rows(table, month=None):
+    """Streamt archivierte Zeilen (als dict) ohne Duplikate, nach Datum sortiert
+
+    Ohne `month` werden alle Partitionen nacheinander gelesen.
+    """
+    for partition in ([month] if month else months(table)):
+        path = os.path.join(_archive_dir(table), f'{partition}.jsonl.gz')
+        if not os.path.exists(path):
+            continue
+        seen = set()
+        with gzip.open(path, 'rt', encoding='utf-8') as f:
+            for line in f:
+                record = json.loads(line)
+                if record['id'] in seen:
+                    continue
+                seen.add(record['id'])
+                record['date'] = date.fromisoformat(record['date'])
+                yield record
+
+
+# --- Verkleinern -------------------------------------------------------------
+
+def _is_sqlite():
+    return db.engine.dialect.name == 'sqlite'
+
+
+def incremental_vacuum(step_pages=None, pause=0.05):
+    """Gibt freie Seiten schrittweise frei (jeder Schritt eine kurze Transaktion)
+
+    Wirkt nur mit `auto_vacuum=INCREMENTAL`; neue Datenbanken werden so
+    angelegt, bestehende einmalig mit `flask archive compact --full` umgestellt.
+    """
+    if not _is_sqlite():
+        return 0
+    step_pages = step_pages or current_app.config['VACUUM_STEP_PAGES']
+    raw = db.engine.raw_connection()
+    try:
+        conn = raw.driver_connection
+        if conn.execute('PRAGMA auto_vacuum').fetchone()[0] != 2:
+            logger.info("auto_vacuum ist nicht INCREMENTAL, überspringe Verkleinerung "
+                        "(einmalig: flask archive compact --full)")
+            return 0
+        freed = 0
+        while True:
+            free_pages = conn.execute('PRAGMA freelist_count').fetchone()[0]
+            if not free_pages:
+                return freed
+            # execute() macht nur einen Schritt und gibt damit nur eine Seite
+            # frei; executescript() lässt das Pragma vollständig durchlaufen.
+            conn.executescript(f'PRAGMA incremental_vacuum({min(step_pages, free_pages)})')
+            step_freed = free_pages - conn.execute('PRAGMA freelist_count').fetchone()[0]
+            if step_freed <= 0:
+                return freed
+            freed += step_freed
+            time.sleep(pause)
+    finally:
+        raw.close()
+
+
+def enable_incremental_vacuum():
+    """Stellt eine bestehende Datenbank auf auto_vacuum=INCREMENTAL um (blockierendes VACUUM)"""
+    if not _is_sqlite():
+        return False
+    with db.engine.connect() as conn:
+        conn = conn.execution_options(isolation_level='AUTOCOMMIT')
+        conn.exec_driver_sql('PRAGMA auto_vacuum=INCREMENTAL')
+        conn.exec_driver_sql('VACUUM')
+        return conn.exec_driver_sql('PRAGMA auto_vacuum').scalar() == 2
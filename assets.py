@@ -0,0 +1,192 @@
+"""Statische Assets mit Fingerprint und Vorkomprimierung
+
+Beim App-Start (oder per `flask assets build`) wird jede Datei aus `static/`
+mit einem Inhalts-Hash im Namen in den Build-Ordner kopiert, z.B.
+`material-design.css` -> `material-design.3f9c0a1b2d.css`. Textdateien werden
+zusätzlich als `.gz` (und `.br`, falls das Paket `brotli` installiert ist)
+abgelegt. Ausgeliefert wird unter `/assets/...` mit einem Jahr
+`Cache-Control: immutable` - ändert sich der Inhalt, ändert sich die URL.
+
+Der Service Worker (`/sw.js`) bekommt aus demselben Manifest eine
+versionierte Precache-Liste.
+"""
+import gzip
+import hashlib
+import logging
+import mimetypes
+import os
+
+from flask import Response, abort, render_template, request, send_file, url_for
+
+try:
+    import brotli
+except ImportError:  # optional, gzip genügt allen Browsern
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+# Nur Text lohnt sich zu komprimieren; PNG & Co. sind es bereits
+COMPRESSIBLE_TYPES = ('text/', 'application/javascript', 'application/json',
+                      'application/manifest+json', 'image/svg+xml')
+
+# Der alte Service Worker unter /static/sw.js wird nur noch abgemeldet
+EXCLUDED = {'sw.js'}
+
+IMMUTABLE = 'public, max-age=31536000, immutable'
+
+
+def _fingerprint(data):
+    return hashlib.sha256(data).hexdigest()[:10]
+
+
+def _hashed_name(filename, digest):
+    stem, ext = os.path.splitext(filename)
+    return f'{stem}.{digest}{ext}'
+
+
+def _write_atomic(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f'{path}.tmp-{os.getpid()}'
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def _compressible(filename):
+    mimetype = mimetypes.guess_type(filename)[0] or ''
+    return mimetype.startswith(COMPRESSIBLE_TYPES) or filename.endswith('.webmanifest')
+
+
+class AssetPipeline:
+    """Baut das Asset-Manifest und liefert die gehashten Dateien aus"""
+
+    def __init__(self):
+        self.source_dir = None
+        self.build_dir = None
+        self.manifest = {}
+        self.encodings = {}
+        self.version = None
+
+    def init_app(self, app):
+        self.source_dir = app.static_folder
+        self.build_dir = app.config['ASSET_BUILD_DIR']
+        app.extensions['assets'] = self
+        self.build()
+
+        app.add_url_rule('/assets/<path:filename>', 'asset', self.serve)
+        app.add_url_rule('/sw.js', 'service_worker', self.service_worker)
+        app.jinja_env.globals['asset_url'] = self.url
+
+    def build(self):
+        """Hasht, kopiert und komprimiert alle Dateien aus static/
+
+        Idempotent: vorhandene Dateien mit gleichem Hash werden nicht neu
+        geschrieben. Veraltete Builds werden danach entfernt.
+        """
+        manifest, encodings = {}, {}
+        compressed = 0
+        for root, _, files in os.walk(self.source_dir):
+            for name in sorted(files):
+                source = os.path.join(root, name)
+                filename = os.path.relpath(source, self.source_dir).replace(os.sep, '/')
+                if filename in EXCLUDED:
+                    continue
+                with open(source, 'rb') as f:
+                    data = f.read()
+
+                hashed = _hashed_name(filename, _fingerprint(data))
+                target = os.path.join(self.build_dir, hashed)
+                manifest[filename] = hashed
+                encodings[hashed] = []
+                if not os.path.exists(target):
+                    _write_atomic(target, data)
+                if not _compressible(filename):
+                    continue
+
+                variants = [('gzip', '.gz', lambda d: gzip.compress(d, 9, mtime=0))]
+                if brotli is not None:
+                    variants.insert(0, ('br', '.br', lambda d: brotli.compress(d, quality=11)))
+                for encoding, suffix, compress in variants:
+                    if not os.path.exists(target + suffix):
+                        packed = compress(data)
+                        # Lohnt sich nicht bei winzigen Dateien
+                        if len(packed) >= len(data):
+                            continue
+                        _write_atomic(target + suffix, packed)
+                        compressed += 1
+                    encodings[hashed].append(encoding)
+
+        self.manifest, self.encodings = manifest, encodings
+        self.version = _fingerprint('\n'.join(sorted(manifest.values())).encode())
+        removed = self._prune()
+        logger.info("Assets gebaut: %s Dateien, %s neu komprimiert, %s veraltet entfernt "
+                    "(Version %s)", len(manifest), compressed, removed, self.version)
+        return manifest
+
+    def _prune(self):
+        keep = set()
+        for hashed, encodings in self.encodings.items():
+            keep.add(hashed)
+            keep.update(hashed + ('.br' if encoding == 'br' else '.gz') for encoding in encodings)
+
+        removed = 0
+        for root, _, files in os.walk(self.build_dir):
+            for name in files:
+                path = os.path.join(root, name)
+                filename = os.path.relpath(path, self.build_dir).replace(os.sep, '/')
+                if filename in keep or '.tmp-' in name:
+                    continue
+                try:
+                    os.remove(path)
+                    removed += 1
+                except FileNotFoundError:
+                    pass  # von einem anderen Worker bereits entfernt
+        return removed
+
+    def url(self, filename):
+        """URL einer Datei aus static/ (Jinja: asset_url('style.css'))"""
+        hashed = self.manifest.get(filename)
+        if hashed is None:
+            return url_for('static', filename=filename)
+        return url_for('asset', filename=hashed)
+
+    def serve(self, filename):
+        """Liefert ein gehashtes Asset, wenn möglich vorkomprimiert"""
+        encodings = self.encodings.get(filename)
+        if encodings is None:
+            abort(404)
+
+        path, encoding = os.path.join(self.build_dir, filename), None
+        for candidate in encodings:
+            if request.accept_encodings[candidate]:
+                path += '.br' if candidate == 'br' else '.gz'
+                encoding = candidate
+                break
+
+        response = send_file(path, mimetype=mimetypes.guess_type(filename)[0],
+                             conditional=True, etag=True)
+        if encoding:
+            response.headers['Content-Encoding'] = encoding
+        if encodings:
+            response.vary.add('Accept-Encoding')
+        response.headers['Cache-Control'] = IMMUTABLE
+        return response
+
+    def service_worker(self):
+        """Service Worker mit versionierter Precache-Liste
+
+        Liegt unter /sw.js, damit sein Scope die ganze App umfasst. Der Browser
+        muss ihn immer revalidieren, sonst greift ein neues Deployment nicht.
+        """
+        body = render_template(
+            'sw.js',
+            version=self.version,
+            precache=[url_for('asset', filename=hashed) for hashed in sorted(self.manifest.values())],
+            icon=self.url('icons/icon-512.png'),
+        )
+        response = Response(body, mimetype='application/javascript')
+        response.headers['Cache-Control'] = 'no-cache'
+        return response
+
+
+asset_pipeline = AssetPipeline()
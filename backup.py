@@ -0,0 +1,233 @@
+"""Online-Backup und Wiederherstellung der SQLite-Datenbank
+
+Die laufende Datenbank wird über die Backup-API von SQLite kopiert, in kleinen
+Schritten von BACKUP_STEP_PAGES Seiten mit kurzer Pause dazwischen. Jeder
+Schritt hält die Lesesperre nur kurz, schreibende Worker warten also höchstens
+einen Schritt lang. Die Kopie wird geprüft (`PRAGMA integrity_check`), gestreamt
+nach `instance/backups/bingo-<zeitstempel>.db.gz` komprimiert und mit einer
+SHA-256-Prüfsumme im sha256sum-Format abgelegt. Es bleiben die neuesten
+BACKUP_KEEP Snapshots erhalten.
+
+Die Wiederherstellung prüft Prüfsumme und Integrität, bevor sie etwas
+verändert, sichert den aktuellen Stand und spielt den Snapshot dann ebenfalls
+über die Backup-API ein. Anders als ein Umbenennen der Datei sehen so auch
+laufende Worker sofort den neuen Stand, und die WAL-Datei bleibt konsistent.
+"""
+from datetime import datetime, timedelta
+import gzip
+import hashlib
+import logging
+import os
+import shutil
+import sqlite3
+
+from flask import current_app
+
+from cache import DATABASE_STAMP, bump_all_stamps
+from clock import clock
+from cooldown_index import cooldown_index
+from identity import identity_cache
+from leaderboard import leaderboard_cache
+from models import db, Room, migrate_schema
+from rooms import ensure_default_room, ensure_room_settings
+from round_cache import RoundCache
+from settings_service import settings_cache
+import stats
+
+logger = logging.getLogger(__name__)
+
+SUFFIX = '.db.gz'
+CHUNK_SIZE = 1024 * 1024
+# Ohne diese Tabellen ist ein Snapshot keine Datenbank dieser App
+REQUIRED_TABLES = {'user', 'word_log', 'setting'}
+
+
+def database_path():
+    """Pfad der SQLite-Datei oder None (andere Datenbank, In-Memory)"""
+    url = db.engine.url
+    if url.get_backend_name() != 'sqlite' or url.database in (None, '', ':memory:'):
+        return None
+    return url.database
+
+
+def _backup_dir():
+    directory = current_app.config['BACKUP_DIR']
+    os.makedirs(directory, exist_ok=True)
+    return directory
+
+
+def _copy_online(source_path, target_path, journal_mode=None):
+    """Kopiert eine SQLite-Datenbank schrittweise über die Backup-API"""
+    config = current_app.config
+    source = sqlite3.connect(source_path, timeout=config['SQLITE_BUSY_TIMEOUT_MS'] / 1000)
+    target = sqlite3.connect(target_path)
+    try:
+        source.backup(target, pages=config['BACKUP_STEP_PAGES'],
+                      sleep=config['BACKUP_PAUSE_MS'] / 1000)
+        if journal_mode:
+            target.execute(f'PRAGMA journal_mode={journal_mode}')
+    finally:
+        target.close()
+        source.close()
+
+
+def _check_database(path):
+    """Prüft Integrität und Schema einer Datenbankdatei, wirft ValueError"""
+    conn = sqlite3.connect(f'file:{path}?mode=ro', uri=True)
+    try:
+        result = [row[0] for row in conn.execute('PRAGMA integrity_check')]
+        if result != ['ok']:
+            raise ValueError(f"Integritätsprüfung fehlgeschlagen: {'; '.join(result[:5])}")
+        tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    except sqlite3.DatabaseError as e:
+        raise ValueError(f"Keine gültige SQLite-Datenbank: {e}")
+    finally:
+        conn.close()
+    missing = REQUIRED_TABLES - tables
+    if missing:
+        raise ValueError(f"Tabellen fehlen: {', '.join(sorted(missing))}")
+
+
+def _file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _compress(source_path, target_path):
+    """Komprimiert gestreamt und liefert die SHA-256 der komprimierten Datei"""
+    tmp_path = f'{target_path}.tmp'
+    digest = hashlib.sha256()
+
+    class HashingWriter:
+        def __init__(self, f):
+            self.f = f
+
+        def write(self, data):
+            digest.update(data)
+            return self.f.write(data)
+
+        def flush(self):
+            self.f.flush()
+
+    with open(source_path, 'rb') as src, open(tmp_path, 'wb') as raw:
+        with gzip.GzipFile(filename=os.path.basename(source_path), mode='wb',
+                           fileobj=HashingWriter(raw), mtime=0) as f:
+            shutil.copyfileobj(src, f, CHUNK_SIZE)
+        raw.flush()
+        os.fsync(raw.fileno())
+    os.replace(tmp_path, target_path)
+    return digest.hexdigest()
+
+
+def list_backups(label=None):
+    """Vorhandene Snapshots (optional nur mit Präfix `label`), neueste zuerst"""
+    directory = _backup_dir()
+    prefix = f'{label}-' if label else ''
+    paths = [os.path.join(directory, name) for name in os.listdir(directory)
+             if name.endswith(SUFFIX) and name.startswith(prefix)]
+    return sorted(paths, key=os.path.getmtime, reverse=True)
+
+
+def rotate_backups(label='bingo', keep=None):
+    """Löscht alle Snapshots von `label` außer den neuesten `keep`; liefert die gelöschten"""
+    keep = keep or current_app.config['BACKUP_KEEP']
+    removed = list_backups(label)[keep:]
+    for path in removed:
+        for stale in (path, f'{path}.sha256'):
+            if os.path.exists(stale):
+                os.remove(stale)
+    return removed
+
+
+def create_backup(label='bingo'):
+    """Job: erstellt einen geprüften, komprimierten Snapshot; liefert dessen Pfad"""
+    source_path = database_path()
+    if source_path is None:
+        logger.info("Backup übersprungen: keine SQLite-Datei konfiguriert")
+        return None
+
+    started = datetime.now()
+    name = f"{label}-{started.strftime('%Y%m%d-%H%M%S')}"
+    directory = _backup_dir()
+    raw_path = os.path.join(directory, f'{name}.db.tmp')
+    target_path = os.path.join(directory, f'{name}{SUFFIX}')
+    try:
+        # Der Snapshot soll eine einzelne Datei ohne -wal/-shm sein
+        _copy_online(source_path, raw_path, journal_mode='DELETE')
+        _check_database(raw_path)
+        checksum = _compress(raw_path, target_path)
+    finally:
+        if os.path.exists(raw_path):
+            os.remove(raw_path)
+
+    with open(f'{target_path}.sha256', 'w') as f:
+        f.write(f'{checksum}  {os.path.basename(target_path)}\n')
+    removed = rotate_backups(label)
+    logger.info("Backup erstellt: %s (%s KiB, %.2fs, %s alte gelöscht)",
+                target_path, os.path.getsize(target_path) // 1024,
+                (datetime.now() - started).total_seconds(), len(removed))
+    return target_path
+
+
+def verify_backup(path):
+    """Prüft die Prüfsumme eines Snapshots, wirft ValueError bei Abweichung"""
+    checksum_path = f'{path}.sha256'
+    if not os.path.exists(checksum_path):
+        raise ValueError(f"Prüfsummendatei fehlt: {checksum_path}")
+    with open(checksum_path) as f:
+        expected = f.read().split()[0]
+    if _file_sha256(path) != expected:
+        raise ValueError(f"Prüfsumme stimmt nicht: {path}")
+
+
+def restore_backup(path):
+    """Spielt einen Snapshot in die laufende Datenbank ein
+
+    Vorher werden Prüfsumme und Integrität geprüft und der aktuelle Stand als
+    `pre-restore-*` gesichert. Liefert den Pfad dieser Sicherung.
+    """
+    target_path = database_path()
+    if target_path is None:
+        raise ValueError("Wiederherstellung nur für eine SQLite-Datei möglich")
+    verify_backup(path)
+
+    restore_path = f'{target_path}.restore'
+    try:
+        with gzip.open(path, 'rb') as src, open(restore_path, 'wb') as dst:
+            shutil.copyfileobj(src, dst, CHUNK_SIZE)
+        _check_database(restore_path)
+
+        safety_copy = create_backup(label='pre-restore')
+        # Offene Verbindungen des Pools schließen, sonst hält die App alte Seiten
+        db.session.remove()
+        db.engine.dispose()
+        _copy_online(restore_path, target_path)
+    finally:
+        if os.path.exists(restore_path):
+            os.remove(restore_path)
+
+    # Snapshots von vor den Räumen auf das aktuelle Schema bringen
+    db.create_all()
+    migrate_schema()
+    ensure_default_room()
+    for (room_id,) in db.session.query(Room.id):
+        ensure_room_settings(room_id)
+    db.session.commit()
+
+    # Alle Caches aller Worker verwerfen, auch die noch nie invalidierten;
+    # DATABASE_STAMP lässt Ähnlichkeits- und Vorschlagsindex neu laden und
+    # setzt den Cursor des Live-Feeds auf die wiederhergestellte Tabelle
+    today = clock.today()
+    names = [DATABASE_STAMP, settings_cache.STAMP_NAME, identity_cache.STAMP_NAME, stats.STAMP_NAME]
+    for (room_id,) in db.session.query(Room.id):
+        names += [f'{settings_cache.STAMP_NAME}-{room_id}',
+                  f'{cooldown_index.STAMP_NAME}-{room_id}',
+                  f'{leaderboard_cache.STAMP_NAME}-{room_id}']
+        names += [f'round-{room_id}-{(today - timedelta(days=d)).isoformat()}'
+                  for d in range(RoundCache.MAX_DAYS)]
+    bump_all_stamps(names)
+    logger.info("Backup wiederhergestellt: %s (vorheriger Stand: %s)", path, safety_copy)
+    return safety_copy
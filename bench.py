@@ -0,0 +1,270 @@
+#!/usr/bin/env python3
+"""
+Benchmark: simuliert einen kompletten Spieltag über die echten Routen
+
+Für jede Spielerzahl wird in einem eigenen Prozess eine frische Datenbank
+angelegt. Dann läuft ein Tag über den Flask-Test-Client, die Uhr wird über
+`clock.set_source()` gesteuert:
+
+    11:00  waiting  Login, Dashboard
+    12:30  open     Wort einreichen, teils ändern oder zurückziehen, Dashboard
+    18:00  voting   Runde schließen, Dashboard, Abstimmen, Bestenliste
+
+Gemessen werden Durchsatz, p50/p95/p99-Latenz und SQL-Abfragen pro Request
+(über den Header X-Query-Count, siehe metrics.py).
+
+Verwendung:
+    python bench.py                                  # 10, 100, 1000 Spieler
+    python bench.py --players 10 100 --save-baseline bench_baseline.json
+    python bench.py --compare bench_baseline.json    # Exit-Code 1 bei Regression
+"""
+
+import argparse
+from datetime import date, datetime, time as dtime
+import json
+import logging
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+DEFAULT_PLAYERS = [10, 100, 1000]
+BENCH_DAY = date(2026, 1, 15)
+PASSWORD = 'bench'
+
+# Schwellen für --compare (Latenzen schwanken je nach Maschine und Dateisystem)
+LATENCY_TOLERANCE = 0.5    # p95 darf um 50 % steigen ...
+LATENCY_SLACK_MS = 1.0     # ... und mindestens um 1 ms (Rauschen bei schnellen Routen)
+QUERY_TOLERANCE = 0.05     # Abfragen pro Request sind deterministisch
+
+
+def _percentile(values, pct):
+    ordered = sorted(values)
+    index = min(int(round(pct / 100 * (len(ordered) - 1))), len(ordered) - 1)
+    return ordered[index]
+
+
+def _word(index):
+    """Eindeutiges, rein alphabetisches Wort pro Spieler
+
+    Jeder Buchstabe steht doppelt und das Wort endet auf 'o', damit sich zwei
+    Wörter um mindestens zwei Zeichen unterscheiden und keine Endung
+    abgeschnitten wird (sonst greift der Ähnlichkeitsabgleich, similarity.py).
+    """
+    letters = ''
+    index += 1
+    while index:
+        index, rest = divmod(index - 1, 26)
+        letters = chr(ord('a') + rest) * 2 + letters
+    return f'wort{letters}o'
+
+
+class Recorder:
+    """Misst Latenz und Abfragen pro Route"""
+
+    def __init__(self):
+        self.samples = {}  # Route -> [(Sekunden, Abfragen)]
+
+    def call(self, route, func, *args, **kwargs):
+        started = time.perf_counter()
+        response = func(*args, **kwargs)
+        elapsed = time.perf_counter() - started
+        if response.status_code >= 500:
+            raise RuntimeError(f"{route}: HTTP {response.status_code}")
+        queries = int(response.headers.get('X-Query-Count', 0))
+        self.samples.setdefault(route, []).append((elapsed, queries))
+        return response
+
+    def summary(self, wall_seconds):
+        def stats(samples):
+            latencies = [s for s, _ in samples]
+            queries = [q for _, q in samples]
+            return {
+                'count': len(samples),
+                'p50_ms': round(_percentile(latencies, 50) * 1000, 3),
+                'p95_ms': round(_percentile(latencies, 95) * 1000, 3),
+                'p99_ms': round(_percentile(latencies, 99) * 1000, 3),
+                'queries_mean': round(sum(queries) / len(queries), 3),
+                'queries_max': max(queries),
+            }
+
+        everything = [s for samples in self.samples.values() for s in samples]
+        return {
+            'requests': len(everything),
+            'seconds': round(wall_seconds, 3),
+            'throughput_rps': round(len(everything) / wall_seconds, 1),
+            'overall': stats(everything),
+            'routes': {route: stats(samples) for route, samples in sorted(self.samples.items())},
+        }
+
+
+def run_day(players, seed=42):
+    """Ein Spieltag mit `players` Spielern (läuft im Kindprozess)"""
+    workdir = tempfile.mkdtemp(prefix='bingo-bench-')
+    os.environ.update({
+        'DATABASE_URL': f"sqlite:///{os.path.join(workdir, 'bench.db')}",
+        'CACHE_STAMP_DIR': os.path.join(workdir, 'stamps'),
+        'RATELIMIT_DB': os.path.join(workdir, 'ratelimit.db'),
+        'METRICS_DB': os.path.join(workdir, 'metrics.db'),
+        'ASSET_BUILD_DIR': os.path.join(workdir, 'assets'),
+        'RATELIMIT_ENABLED': '0',
+        'METRICS_DEBUG_HEADERS': '1',
+        'SCHEDULER_ENABLED': '0',
+        # Billiger Hash: gemessen wird die App, nicht scrypt
+        'PASSWORD_HASH_METHOD': 'pbkdf2:sha256:1',
+        'USERS': '',
+    })
+
+    from app import create_app
+    from clock import clock
+    from models import db, User
+    from passwords import hash_password
+
+    app = create_app()
+    logging.getLogger().setLevel(logging.WARNING)
+
+    with app.app_context():
+        password_hash = hash_password(PASSWORD)
+        db.session.execute(db.insert(User), [
+            {'username': f'spieler{i}', 'password_hash': password_hash, 'role': 'player', 'points': 0}
+            for i in range(players)
+        ])
+        db.session.commit()
+        user_ids = [user_id for (user_id,) in db.session.query(User.id).filter(
+            User.username.like('spieler%')).order_by(User.id)]
+
+    rng = random.Random(seed)
+    now = [datetime.combine(BENCH_DAY, dtime(11, 0))]
+    clock.set_source(lambda: now[0])
+    scheduler = app.extensions['scheduler']
+    with app.app_context():
+        # Wie der Scheduler beim Start: Zeitplan der Räume ab jetzt
+        scheduler.jobs['room_transitions'].trigger(now[0])
+    recorder = Recorder()
+    clients = []
+    started = time.perf_counter()
+
+    # Vor der Runde: Login und Dashboard
+    for i in range(players):
+        client = app.test_client()
+        recorder.call('login', client.post, '/login',
+                      data={'username': f'spieler{i}', 'password': PASSWORD})
+        recorder.call('dashboard', client.get, '/dashboard')
+        clients.append(client)
+
+    # Runde offen: Wörter einreichen, ändern, zurückziehen
+    now[0] = datetime.combine(BENCH_DAY, dtime(12, 30))
+    for i, client in enumerate(clients):
+        recorder.call('submit_word', client.post, '/submit_word', data={'word': _word(i)})
+        roll = rng.random()
+        if roll < 0.2:
+            recorder.call('submit_word', client.post, '/submit_word', data={'word': _word(i + players)})
+        elif roll < 0.25:
+            recorder.call('withdraw_word', client.post, '/withdraw_word')
+            recorder.call('submit_word', client.post, '/submit_word', data={'word': _word(i)})
+        recorder.call('dashboard', client.get, '/dashboard')
+
+    # Abstimmung: Runde schließen (wie der Scheduler-Job), dann abstimmen
+    now[0] = datetime.combine(BENCH_DAY, dtime(18, 0, 5))
+    scheduler.run_job('room_transitions')
+    for i, client in enumerate(clients):
+        recorder.call('dashboard', client.get, '/dashboard')
+        others = [user_id for user_id in user_ids if user_id != user_ids[i]]
+        for target in rng.sample(others, min(3, len(others))):
+            recorder.call('vote', client.post, '/vote', data={'voted_user_id': str(target)})
+        recorder.call('leaderboard', client.get, '/leaderboard')
+
+    result = recorder.summary(time.perf_counter() - started)
+    result['players'] = players
+    return result
+
+
+def _run_isolated(players):
+    """Startet run_day in einem frischen Prozess (saubere Caches und Singletons)"""
+    output = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), '--child', str(players)],
+        check=True, capture_output=True, text=True,
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def print_report(result):
+    print(f"\n=== {result['players']} Spieler: {result['requests']} Requests in "
+          f"{result['seconds']:.2f}s ({result['throughput_rps']} req/s) ===")
+    print(f"{'Route':<16} {'Anzahl':>7} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'Queries':>8}")
+    print("-" * 60)
+    for route, stats in list(result['routes'].items()) + [('GESAMT', result['overall'])]:
+        print(f"{route:<16} {stats['count']:>7} {stats['p50_ms']:>8.2f} {stats['p95_ms']:>8.2f} "
+              f"{stats['p99_ms']:>8.2f} {stats['queries_mean']:>8.2f}")
+
+
+def compare(results, baseline, latency_tolerance=LATENCY_TOLERANCE):
+    """Vergleicht mit einer Baseline; liefert eine Liste von Regressionen"""
+    regressions = []
+    for result in results:
+        base = baseline['results'].get(str(result['players']))
+        if base is None:
+            continue
+        for route, stats in result['routes'].items():
+            old = base['routes'].get(route)
+            if old is None:
+                continue
+            limit = max(old['p95_ms'] * (1 + latency_tolerance), old['p95_ms'] + LATENCY_SLACK_MS)
+            if stats['p95_ms'] > limit:
+                regressions.append(f"{result['players']} Spieler, {route}: p95 "
+                                   f"{old['p95_ms']:.2f} -> {stats['p95_ms']:.2f} ms")
+            if stats['queries_mean'] > old['queries_mean'] * (1 + QUERY_TOLERANCE):
+                regressions.append(f"{result['players']} Spieler, {route}: Queries/Request "
+                                   f"{old['queries_mean']:.2f} -> {stats['queries_mean']:.2f}")
+    return regressions
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description='Benchmark eines kompletten Spieltags')
+    parser.add_argument('--players', type=int, nargs='+', default=DEFAULT_PLAYERS)
+    parser.add_argument('--save-baseline', metavar='DATEI', help='Ergebnisse als Baseline speichern')
+    parser.add_argument('--compare', metavar='DATEI', help='Mit Baseline vergleichen')
+    parser.add_argument('--latency-tolerance', type=float, default=LATENCY_TOLERANCE,
+                        help='Erlaubter relativer Anstieg der p95-Latenz (Standard: %(default)s)')
+    parser.add_argument('--child', type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv[1:])
+
+    if args.child:
+        print(json.dumps(run_day(args.child)))
+        return 0
+
+    results = []
+    for players in args.players:
+        result = _run_isolated(players)
+        print_report(result)
+        results.append(result)
+
+    if args.save_baseline:
+        with open(args.save_baseline, 'w', encoding='utf-8') as f:
+            json.dump({
+                'created': datetime.now().isoformat(timespec='seconds'),
+                'python': platform.python_version(),
+                'machine': platform.machine(),
+                'results': {str(r['players']): r for r in results},
+            }, f, indent=2)
+            f.write('\n')
+        print(f"\n✅ Baseline gespeichert: {args.save_baseline}")
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            regressions = compare(results, json.load(f), args.latency_tolerance)
+        if regressions:
+            print("\n❌ Regressionen gegenüber der Baseline:")
+            for line in regressions:
+                print(f"   {line}")
+            return 1
+        print("\n✅ Keine Regressionen gegenüber der Baseline")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv))
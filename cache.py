@@ -0,0 +1,110 @@
+"""Prozessübergreifende Cache-Invalidierung über Versionsstempel
+
+Jeder Stempel ist eine kleine Datei im Instance-Ordner. Schreibende Routen
+ersetzen ihren Inhalt nach dem Commit durch ein neues Token, lesende Caches
+vergleichen das Token vor jeder Nutzung. So bleiben alle Gunicorn-Worker
+konsistent, ohne dass für die Prüfung eine Datenbankabfrage nötig ist.
+
+Stempel mit Datum oder Benutzer-ID im Namen werden von Wartungsjobs wieder
+gelöscht (`remove_stamps`); die gemerkten Objekte pro Prozess sind begrenzt.
+"""
+from datetime import datetime
+import os
+import threading
+import uuid
+
+from flask import current_app
+
+
+class VersionStamp:
+    """Versionszähler, der über alle Worker-Prozesse geteilt wird"""
+
+    def __init__(self, directory, name):
+        self.path = os.path.join(directory, name)
+
+    def read(self):
+        """Liefert das aktuelle Token ('0' falls noch nie gesetzt)"""
+        try:
+            with open(self.path, 'r') as f:
+                return f.read() or '0'
+        except FileNotFoundError:
+            return '0'
+
+    def modified(self):
+        """Zeitpunkt des letzten bump() (UTC) oder None"""
+        try:
+            return datetime.utcfromtimestamp(os.path.getmtime(self.path))
+        except FileNotFoundError:
+            return None
+
+    def bump(self):
+        """Setzt ein neues, eindeutiges Token und gibt es zurück"""
+        token = uuid.uuid4().hex
+        tmp_path = f'{self.path}.{os.getpid()}.{threading.get_ident()}.tmp'
+        with open(tmp_path, 'w') as f:
+            f.write(token)
+        os.replace(tmp_path, self.path)
+        return token
+
+
+# Wird bei einer Wiederherstellung neu gesetzt: Indizes ohne eigene Stempel
+# (Ähnlichkeit, Vorschläge, Event-Cursor) bauen sich daraufhin neu auf
+DATABASE_STAMP = 'database'
+
+# Obergrenze der gemerkten Stempel-Objekte pro Prozess (Räume × Tage, Benutzer)
+MAX_CACHED_STAMPS = 4096
+
+_stamps = {}
+_stamps_lock = threading.Lock()
+
+
+def get_stamp(name):
+    """Liefert den Versionsstempel `name` der aktuellen App"""
+    directory = current_app.config['CACHE_STAMP_DIR']
+    key = (directory, name)
+    stamp = _stamps.get(key)
+    if stamp is None:
+        with _stamps_lock:
+            stamp = _stamps.get(key)
+            if stamp is None:
+                os.makedirs(directory, exist_ok=True)
+                stamp = _stamps[key] = VersionStamp(directory, name)
+                # Älteste zuerst verwerfen; sie werden bei Bedarf neu angelegt
+                while len(_stamps) > MAX_CACHED_STAMPS:
+                    del _stamps[next(iter(_stamps))]
+    return stamp
+
+
+def list_stamps():
+    """Namen aller vorhandenen Stempel-Dateien"""
+    directory = current_app.config['CACHE_STAMP_DIR']
+    os.makedirs(directory, exist_ok=True)
+    return {name for name in os.listdir(directory) if not name.endswith('.tmp')}
+
+
+def remove_stamps(names):
+    """Löscht die Stempel `names` (Datei und gemerktes Objekt); gibt die Anzahl zurück
+
+    Nur für Stempel, die sich nicht mehr ändern (z.B. vergangene Tage): ein
+    gelöschter Stempel liest sich wieder als '0'.
+    """
+    directory = current_app.config['CACHE_STAMP_DIR']
+    removed = 0
+    with _stamps_lock:
+        for name in names:
+            _stamps.pop((directory, name), None)
+            try:
+                os.remove(os.path.join(directory, name))
+                removed += 1
+            except FileNotFoundError:
+                pass
+    return removed
+
+
+def bump_all_stamps(names=()):
+    """Setzt alle vorhandenen Stempel und zusätzlich `names` neu
+
+    Für Fälle, in denen sich die ganze Datenbank geändert hat (Wiederherstellung).
+    """
+    for name in sorted(list_stamps() | set(names)):
+        get_stamp(name).bump()
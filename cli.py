@@ -0,0 +1,329 @@
+"""Flask-CLI-Befehle für Administration und Wartung
+
+Beispiele:
+    flask users create max geheim123 player
+    flask users create anna geheim456 player --room familie
+    flask users import benutzer.csv
+    flask users list
+    flask rooms create familie "Familie Müller" --dinner-time 19:00
+    flask rooms list
+    flask jobs run prune_cooldowns
+    flask assets build
+    flask stats rebuild
+    flask archive run
+    flask archive compact --full
+    flask backup create
+    flask backup restore instance/backups/bingo-20260101-040000.db.gz
+"""
+import csv
+import itertools
+import os
+
+import click
+from flask import current_app
+from flask.cli import AppGroup
+
+import archive
+import backup
+from identity import identity_cache
+from leaderboard import leaderboard_cache
+from models import db, DEFAULT_ROOM_ID, Room, User
+from passwords import hash_password, hash_passwords
+from rooms import create_room, find_room
+from stats import rebuild_stats
+
+VALID_ROLES = ('player', 'admin')
+
+users_cli = AppGroup('users', help='Benutzerverwaltung')
+rooms_cli = AppGroup('rooms', help='Räume (getrennte Spielgruppen)')
+jobs_cli = AppGroup('jobs', help='Hintergrundjobs')
+assets_cli = AppGroup('assets', help='Statische Assets')
+stats_cli = AppGroup('stats', help='Statistik-Rollups')
+archive_cli = AppGroup('archive', help='Archivierung alter Runden')
+backup_cli = AppGroup('backup', help='Backup und Wiederherstellung der Datenbank')
+
+
+def create_user(username, password, role='player', room_id=DEFAULT_ROOM_ID):
+    """Erstellt einen neuen Benutzer (im App-Kontext aufrufen)"""
+    if User.query.filter_by(username=username).first():
+        click.echo(f"❌ Fehler: Benutzer '{username}' existiert bereits!")
+        return False
+
+    db.session.add(User(
+        username=username,
+        password_hash=hash_password(password),
+        role=role,
+        room_id=room_id
+    ))
+    db.session.commit()
+    leaderboard_cache.invalidate(room_id)
+
+    click.echo(f"✅ Benutzer '{username}' erfolgreich erstellt!")
+    click.echo(f"   Rolle: {role}")
+    return True
+
+
+def _room_id(slug):
+    """room_id zu einem Kürzel (None: Standardraum); bricht bei unbekanntem Raum ab"""
+    if slug is None:
+        return DEFAULT_ROOM_ID
+    room = find_room(slug)
+    if room is None:
+        raise click.BadParameter(f"Unbekannter Raum '{slug}' (siehe flask rooms list)",
+                                 param_hint='--room')
+    return room.id
+
+
+def list_users(batch_size=500):
+    """Gibt alle Benutzer aus, ohne die ganze Tabelle in den Speicher zu laden"""
+    rows = db.session.query(User.username, User.role, User.points, Room.slug).join(
+        Room, Room.id == User.room_id).order_by(User.id).execution_options(yield_per=batch_size)
+
+    header_printed = False
+    for username, role, points, room in rows:
+        if not header_printed:
+            click.echo("\n=== Alle Benutzer ===")
+            click.echo(f"{'Username':<20} {'Rolle':<10} {'Punkte':<10} {'Raum':<20}")
+            click.echo("-" * 60)
+            header_printed = True
+        click.echo(f"{username:<20} {role:<10} {points:<10} {room:<20}")
+
+    if not header_printed:
+        click.echo("Keine Benutzer gefunden.")
+    else:
+        click.echo()
+
+
+def _read_user_rows(csv_file):
+    """Liest (username, password, role) aus einer CSV-Datei; Kopfzeile optional"""
+    for line_no, row in enumerate(csv.reader(csv_file), start=1):
+        if not row or not row[0].strip() or row[0].startswith('#'):
+            continue
+        if line_no == 1 and row[0].strip().lower() == 'username':
+            continue
+        if len(row) < 2:
+            click.echo(f"⚠️  Zeile {line_no} übersprungen: Passwort fehlt")
+            continue
+        username, password = row[0].strip(), row[1].strip()
+        role = row[2].strip() if len(row) > 2 and row[2].strip() else 'player'
+        if role not in VALID_ROLES:
+            click.echo(f"⚠️  Zeile {line_no} übersprungen: Ungültige Rolle '{role}'")
+            continue
+        yield username, password, role
+
+
+def import_users(csv_file, update=False, batch_size=500, room_id=DEFAULT_ROOM_ID):
+    """Importiert Benutzer in Batches; Passwörter werden parallel gehasht
+
+    Neue Benutzer kommen in den Raum `room_id`, bestehende behalten ihren Raum.
+    """
+    created = updated = skipped = 0
+    rows = _read_user_rows(csv_file)
+    while True:
+        batch = list(itertools.islice(rows, batch_size))
+        if not batch:
+            break
+        # Doppelte Namen innerhalb eines Batches: der letzte Eintrag gewinnt
+        batch = list({username: (username, password, role) for username, password, role in batch}.values())
+
+        existing = {username: user_id for user_id, username in db.session.query(User.id, User.username).filter(
+            User.username.in_([username for username, _, _ in batch]))}
+        todo = [row for row in batch if update or row[0] not in existing]
+        skipped += len(batch) - len(todo)
+
+        hashes = hash_passwords([password for _, password, _ in todo])
+        new_users, changed_users = [], []
+        for (username, _, role), password_hash in zip(todo, hashes):
+            if username in existing:
+                changed_users.append({'id': existing[username], 'password_hash': password_hash, 'role': role})
+            else:
+                new_users.append({'username': username, 'password_hash': password_hash,
+                                  'role': role, 'points': 0, 'room_id': room_id})
+
+        if new_users:
+            db.session.execute(db.insert(User), new_users)
+        if changed_users:
+            db.session.execute(db.update(User), changed_users)
+        db.session.commit()
+        created += len(new_users)
+        updated += len(changed_users)
+
+    if created:
+        leaderboard_cache.invalidate(room_id)
+    if updated:
+        identity_cache.invalidate_all()
+
+    click.echo(f"✅ Import abgeschlossen: {created} erstellt, {updated} aktualisiert, {skipped} übersprungen")
+    return created, updated, skipped
+
+
+@users_cli.command('create')
+@click.argument('username')
+@click.argument('password')
+@click.argument('role', default='player', type=click.Choice(VALID_ROLES))
+@click.option('--room', help='Kürzel des Raums (Standard: Standardraum).')
+def create_user_command(username, password, role, room):
+    """Erstellt einen neuen Benutzer."""
+    if not create_user(username, password, role, _room_id(room)):
+        raise SystemExit(1)
+
+
+@users_cli.command('list')
+def list_users_command():
+    """Listet alle Benutzer auf (gestreamt)."""
+    list_users()
+
+
+@users_cli.command('import')
+@click.argument('csv_file', type=click.File('r', encoding='utf-8'))
+@click.option('--update', is_flag=True, help='Passwort und Rolle bestehender Benutzer überschreiben.')
+@click.option('--batch-size', default=500, show_default=True, help='Zeilen pro Transaktion.')
+@click.option('--room', help='Raum für neue Benutzer (Standard: Standardraum).')
+def import_users_command(csv_file, update, batch_size, room):
+    """Importiert Benutzer aus einer CSV-Datei (username,password[,role])."""
+    import_users(csv_file, update=update, batch_size=batch_size, room_id=_room_id(room))
+
+
+@rooms_cli.command('create')
+@click.argument('slug')
+@click.argument('name')
+@click.option('--notify-time', help='Beginn der Eingabe (HH:MM).')
+@click.option('--dinner-time', help='Beginn der Abstimmung (HH:MM).')
+def create_room_command(slug, name, notify_time, dinner_time):
+    """Legt einen Raum mit eigenen Einstellungen an."""
+    settings = {key: value for key, value in [('notify_time', notify_time),
+                                              ('dinner_time', dinner_time)] if value}
+    try:
+        room = create_room(slug, name, settings)
+    except ValueError as e:
+        click.echo(f"❌ Fehler: {e}")
+        raise SystemExit(1)
+    click.echo(f"✅ Raum '{room.slug}' erstellt (#{room.id})")
+
+
+@rooms_cli.command('list')
+def list_rooms_command():
+    """Listet alle Räume mit Anzahl der Benutzer auf."""
+    rows = db.session.query(Room.id, Room.slug, Room.name, db.func.count(User.id)).outerjoin(
+        User, User.room_id == Room.id).group_by(Room.id).order_by(Room.id).all()
+    click.echo(f"{'ID':<5} {'Kürzel':<20} {'Name':<30} {'Benutzer':>8}")
+    click.echo("-" * 66)
+    for room_id, slug, name, users in rows:
+        click.echo(f"{room_id:<5} {slug:<20} {name:<30} {users:>8}")
+
+
+@jobs_cli.command('list')
+def list_jobs_command():
+    """Listet alle registrierten Hintergrundjobs auf."""
+    for name in sorted(current_app.extensions['scheduler'].jobs):
+        click.echo(name)
+
+
+@jobs_cli.command('run')
+@click.argument('name')
+def run_job_command(name):
+    """Führt einen Hintergrundjob sofort aus."""
+    scheduler = current_app.extensions['scheduler']
+    if name not in scheduler.jobs:
+        raise click.BadParameter(f"Unbekannter Job '{name}'", param_hint='NAME')
+    result = scheduler.run_job(name)
+    if result is not None:
+        click.echo(result)
+
+
+@assets_cli.command('build')
+def build_assets_command():
+    """Hasht und komprimiert die Dateien aus static/ neu."""
+    manifest = current_app.extensions['assets'].build()
+    for filename, hashed in sorted(manifest.items()):
+        click.echo(f"{filename:<30} -> {hashed}")
+
+
+@stats_cli.command('rebuild')
+@click.option('--batch-size', default=1000, show_default=True, help='Zeilen pro Batch.')
+def rebuild_stats_command(batch_size):
+    """Berechnet die Statistik-Rollups neu aus Archiv und WordLog."""
+    days = rebuild_stats(batch_size=batch_size)
+    click.echo(f"✅ Statistik neu berechnet: {days} Runde(n)")
+
+
+@archive_cli.command('run')
+@click.option('--retention-days', type=int, help='Tage in der Datenbank (Standard: ARCHIVE_RETENTION_DAYS).')
+def archive_run_command(retention_days):
+    """Verschiebt alte Zeilen ins Archiv und verkleinert die Datenbank."""
+    moved = archive.archive_old_rows(retention_days=retention_days)
+    if not moved:
+        click.echo("Nichts archiviert (Statistik noch nicht fortgeschrieben?)")
+        return
+    for table, count in moved.items():
+        click.echo(f"{table:<14} {count:>8} Zeile(n)")
+
+
+@archive_cli.command('compact')
+@click.option('--full', is_flag=True, help='Einmalig auf auto_vacuum=INCREMENTAL umstellen (blockiert).')
+def archive_compact_command(full):
+    """Gibt freie Seiten der Datenbank an das Dateisystem zurück."""
+    if full:
+        if archive.enable_incremental_vacuum():
+            click.echo("✅ auto_vacuum=INCREMENTAL aktiv, Datenbank neu geschrieben")
+        else:
+            click.echo("❌ Umstellung nicht möglich (keine SQLite-Datenbank?)")
+        return
+    freed = archive.incremental_vacuum()
+    click.echo(f"✅ {freed} Seite(n) freigegeben")
+
+
+@backup_cli.command('create')
+def backup_create_command():
+    """Erstellt einen Snapshot der laufenden Datenbank."""
+    path = backup.create_backup()
+    if path is None:
+        click.echo("❌ Kein Backup möglich (keine SQLite-Datei konfiguriert)")
+        raise SystemExit(1)
+    click.echo(f"✅ Backup erstellt: {path}")
+
+
+@backup_cli.command('list')
+def backup_list_command():
+    """Listet die vorhandenen Snapshots auf, neueste zuerst."""
+    for path in backup.list_backups():
+        click.echo(f"{os.path.basename(path):<40} {os.path.getsize(path) // 1024:>8} KiB")
+
+
+@backup_cli.command('verify')
+@click.argument('path', type=click.Path(exists=True, dir_okay=False))
+def backup_verify_command(path):
+    """Prüft die Prüfsumme eines Snapshots."""
+    try:
+        backup.verify_backup(path)
+    except ValueError as e:
+        click.echo(f"❌ {e}")
+        raise SystemExit(1)
+    click.echo(f"✅ Prüfsumme in Ordnung: {path}")
+
+
+@backup_cli.command('restore')
+@click.argument('path', type=click.Path(exists=True, dir_okay=False))
+@click.option('--yes', is_flag=True, help='Ohne Rückfrage wiederherstellen.')
+def backup_restore_command(path, yes):
+    """Prüft einen Snapshot und spielt ihn in die Datenbank ein."""
+    if not yes:
+        click.confirm(f"Aktuelle Datenbank durch {path} ersetzen?", abort=True)
+    try:
+        safety_copy = backup.restore_backup(path)
+    except ValueError as e:
+        click.echo(f"❌ Wiederherstellung abgebrochen: {e}")
+        raise SystemExit(1)
+    click.echo(f"✅ Wiederhergestellt aus {path}")
+    click.echo(f"   Vorheriger Stand gesichert: {safety_copy}")
+
+
+def register_commands(app):
+    """Registriert alle CLI-Befehle an der App"""
+    app.cli.add_command(users_cli)
+    app.cli.add_command(rooms_cli)
+    app.cli.add_command(jobs_cli)
+    app.cli.add_command(assets_cli)
+    app.cli.add_command(stats_cli)
+    app.cli.add_command(archive_cli)
+    app.cli.add_command(backup_cli)
@@ -0,0 +1,70 @@
+"""Zentrale Uhr und Phase der aktuellen Runde
+
+Alle Zeitabfragen der Spiellogik laufen über `clock`. Die Phase eines Raums
+wird aus dessen gecachten Einstellungen berechnet und bis zum nächsten
+Übergang gemerkt (notify_time, dinner_time, Mitternacht). Ein Request
+vergleicht danach nur noch einen Zeitstempel seines Raums.
+
+Für Benchmarks und Tests lässt sich die Zeitquelle mit `clock.set_source()`
+austauschen.
+"""
+from collections import namedtuple
+from datetime import datetime, time, timedelta
+import threading
+
+from settings_service import settings_cache
+
+RoundState = namedtuple('RoundState', ['day', 'phase', 'next_transition'])
+
+
+class RoundClock:
+    """Liefert Uhrzeit, Datum und Phase der Runde"""
+
+    def __init__(self):
+        self._source = datetime.now
+        self._lock = threading.Lock()
+        self._cached = {}  # room_id -> (GameSettings, gültig ab, RoundState)
+
+    def set_source(self, source=None):
+        """Setzt die Zeitquelle (eine Funktion, die ein datetime liefert); None = Systemzeit"""
+        with self._lock:
+            self._source = source or datetime.now
+            self._cached = {}
+
+    def now(self):
+        return self._source()
+
+    def today(self):
+        return self.now().date()
+
+    @staticmethod
+    def _transitions(game_settings, day):
+        return sorted({
+            datetime.combine(day, game_settings.notify_time),
+            datetime.combine(day, game_settings.dinner_time),
+            datetime.combine(day + timedelta(days=1), time()),
+        })
+
+    def next_transition(self, after, game_settings):
+        """Nächster Phasenwechsel nach `after` mit den Zeiten aus `game_settings`"""
+        for moment in self._transitions(game_settings, after.date()):
+            if moment > after:
+                return moment
+
+    def state(self, room_id):
+        """Aktueller RoundState eines Raums; wird nur an Phasengrenzen neu berechnet"""
+        now = self.now()
+        game_settings = settings_cache.get(room_id)
+        cached = self._cached.get(room_id)
+        if cached is not None and cached[0] is game_settings and \
+                cached[1] <= now < cached[2].next_transition:
+            return cached[2]
+
+        state = RoundState(now.date(), game_settings.phase_at(now.time()),
+                           self.next_transition(now, game_settings))
+        with self._lock:
+            self._cached[room_id] = (game_settings, now, state)
+        return state
+
+
+clock = RoundClock()
@@ -0,0 +1,118 @@
+"""In-Memory-Index der aktiven Cooldown-Wörter, getrennt pro Raum"""
+from datetime import datetime
+import heapq
+import logging
+import threading
+
+from cache import get_stamp
+from models import db, CooldownLog
+
+logger = logging.getLogger(__name__)
+
+
+class _RoomCooldowns:
+    def __init__(self, version, active):
+        self.version = version
+        self.active = active  # Wort -> Ablaufdatum
+        self.heap = [(expiry, word) for word, expiry in active.items()]
+        heapq.heapify(self.heap)
+
+
+class CooldownIndex:
+    """Pro Raum: Menge der aktiven Cooldowns plus Min-Heap nach Ablaufdatum
+
+    Nachschlagen ist ein Dictionary-Zugriff. Abgelaufene Einträge werden
+    beim Datumswechsel lazy über den Heap entfernt, ohne die Datenbank zu
+    fragen. Ein Raum wird beim ersten Zugriff geladen; Änderungen anderer
+    Worker kommen über den Stempel `cooldowns-<room_id>` an.
+    """
+
+    STAMP_NAME = 'cooldowns'
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._rooms = {}  # room_id -> _RoomCooldowns
+
+    def room_stamp(self, room_id):
+        return get_stamp(f'{self.STAMP_NAME}-{room_id}')
+
+    def load(self, room_id, today=None):
+        """Lädt alle aktiven Cooldowns eines Raums aus der Datenbank"""
+        today = today or datetime.now().date()
+        version = self.room_stamp(room_id).read()
+        rows = db.session.query(CooldownLog.word, CooldownLog.expiry_date).filter(
+            CooldownLog.room_id == room_id, CooldownLog.expiry_date > today
+        ).all()
+        room = _RoomCooldowns(version, dict(rows))
+        with self._lock:
+            self._rooms[room_id] = room
+        return room
+
+    def _room(self, room_id, today):
+        room = self._rooms.get(room_id)
+        if room is None or room.version != self.room_stamp(room_id).read():
+            room = self.load(room_id, today)
+        return room
+
+    @staticmethod
+    def _expire(room, today):
+        while room.heap and room.heap[0][0] <= today:
+            expiry, word = heapq.heappop(room.heap)
+            # Veraltete Heap-Einträge (Cooldown wurde verlängert) überspringen
+            if room.active.get(word) == expiry:
+                del room.active[word]
+
+    def lookup(self, room_id, word, today=None):
+        """Liefert das Ablaufdatum, falls `word` im Raum unter aktivem Cooldown steht"""
+        today = today or datetime.now().date()
+        room = self._room(room_id, today)
+        with self._lock:
+            if room.heap and room.heap[0][0] <= today:
+                self._expire(room, today)
+            return room.active.get(word)
+
+    def words(self, room_id, today=None):
+        """Alle Wörter mit aktivem Cooldown in einem Raum"""
+        today = today or datetime.now().date()
+        room = self._room(room_id, today)
+        with self._lock:
+            self._expire(room, today)
+            return list(room.active)
+
+    def add(self, room_id, word, expiry_date):
+        """Nach dem Commit eines neuen/verlängerten Cooldowns aufrufen"""
+        stamp = self.room_stamp(room_id)
+        with self._lock:
+            room = self._rooms.get(room_id)
+            current = room is not None and room.version == stamp.read()
+            token = stamp.bump()
+            if room is not None:
+                room.active[word] = expiry_date
+                heapq.heappush(room.heap, (expiry_date, word))
+                # Eigenes Token übernehmen, damit nur andere Worker neu laden;
+                # war der Raum schon veraltet, lädt der nächste Zugriff ihn trotzdem
+                room.version = token if current else None
+
+
+cooldown_index = CooldownIndex()
+
+
+def prune_expired_cooldowns(batch_size=500, today=None):
+    """Löscht abgelaufene CooldownLog-Zeilen aller Räume in Batches
+
+    Gibt die Anzahl gelöschter Zeilen zurück.
+    """
+    today = today or datetime.now().date()
+    total = 0
+    while True:
+        ids = [row.id for row in db.session.query(CooldownLog.id).filter(
+            CooldownLog.expiry_date <= today
+        ).limit(batch_size)]
+        if not ids:
+            break
+        CooldownLog.query.filter(CooldownLog.id.in_(ids)).delete(synchronize_session=False)
+        db.session.commit()
+        total += len(ids)
+    if total:
+        logger.info("%s abgelaufene Cooldowns gelöscht", total)
+    return total
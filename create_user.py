@@ -8,82 +8,53 @@ Verwendung: python create_user.py <username> <password> [role]
 Beispiele:
     python create_user.py max geheim123 player
     python create_user.py admin admin123 admin
+    python create_user.py --import benutzer.csv
+
+Die gleichen Funktionen gibt es als Flask-CLI-Befehle:
+    flask users create|list|import
 """
 
 import sys
-import os
-from werkzeug.security import generate_password_hash
-
-# Flask-App importieren
-from app import create_app, db
-from models import User
 
-def create_user(username, password, role='player'):
-    """Erstellt einen neuen Benutzer"""
-    app = create_app()
-    
-    with app.app_context():
-        # Prüfen ob Benutzer bereits existiert
-        existing_user = User.query.filter_by(username=username).first()
-        if existing_user:
-            print(f"❌ Fehler: Benutzer '{username}' existiert bereits!")
-            return False
-        
-        # Neuen Benutzer erstellen
-        new_user = User(
-            username=username,
-            password_hash=generate_password_hash(password),
-            role=role
-        )
-        
-        db.session.add(new_user)
-        db.session.commit()
-        
-        print(f"✅ Benutzer '{username}' erfolgreich erstellt!")
-        print(f"   Rolle: {role}")
-        print(f"   Passwort: {password}")
-        return True
+from app import create_app
+from cli import create_user, list_users, import_users
 
-def list_users():
-    """Listet alle Benutzer auf"""
-    app = create_app()
-    
-    with app.app_context():
-        users = User.query.all()
-        
-        if not users:
-            print("Keine Benutzer gefunden.")
-            return
-        
-        print("\n=== Alle Benutzer ===")
-        print(f"{'Username':<20} {'Rolle':<10} {'Punkte':<10}")
-        print("-" * 40)
-        for user in users:
-            print(f"{user.username:<20} {user.role:<10} {user.points:<10}")
-        print()
 
-if __name__ == '__main__':
-    if len(sys.argv) < 2:
+def main(argv):
+    if len(argv) < 2:
         print("Verwendung:")
         print("  Benutzer erstellen: python create_user.py <username> <password> [role]")
         print("  Benutzer auflisten: python create_user.py --list")
+        print("  Benutzer importieren: python create_user.py --import <datei.csv>")
         print("\nRollen: player (Standard), admin")
-        sys.exit(1)
-    
-    if sys.argv[1] == '--list':
-        list_users()
-    else:
-        if len(sys.argv) < 3:
+        return 1
+
+    if argv[1] not in ('--list', '--import'):
+        if len(argv) < 3:
             print("❌ Fehler: Benutzername und Passwort erforderlich!")
             print("Verwendung: python create_user.py <username> <password> [role]")
-            sys.exit(1)
-        
-        username = sys.argv[1]
-        password = sys.argv[2]
-        role = sys.argv[3] if len(sys.argv) > 3 else 'player'
-        
+            return 1
+
+        role = argv[3] if len(argv) > 3 else 'player'
         if role not in ['player', 'admin']:
             print(f"❌ Fehler: Ungültige Rolle '{role}'. Erlaubt: player, admin")
-            sys.exit(1)
-        
-        create_user(username, password, role)
+            return 1
+
+    # App nur einmal bauen, alle Aktionen teilen sich einen App-Kontext
+    app = create_app()
+    with app.app_context():
+        if argv[1] == '--list':
+            list_users()
+        elif argv[1] == '--import':
+            if len(argv) < 3:
+                print("❌ Fehler: CSV-Datei erforderlich!")
+                return 1
+            with open(argv[2], encoding='utf-8') as csv_file:
+                import_users(csv_file)
+        elif not create_user(argv[1], argv[2], role):
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv))
@@ -0,0 +1,175 @@
+"""Live-Feed der Runde über Server-Sent Events
+
+Schreibende Routen legen mit `publish()` eine RoundEvent-Zeile in derselben
+Transaktion an. Pro Worker pollt ein einziger Thread die Tabelle und verteilt
+neue Events an alle verbundenen Clients dieses Workers im selben Raum.
+Phasenwechsel berechnet jeder Worker selbst aus den gecachten Einstellungen
+der Räume, in denen Clients verbunden sind.
+"""
+from datetime import datetime, timedelta
+import json
+import logging
+import queue
+import threading
+import time
+
+from cache import DATABASE_STAMP, get_stamp
+from models import db, RoundEvent
+from clock import clock
+
+logger = logging.getLogger(__name__)
+
+# Events, die das eingereichte Wort enthalten (nur für berechtigte Clients)
+WORD_EVENTS = ('word_submitted',)
+
+
+def publish(kind, room_id, **payload):
+    """Legt ein Event für einen Raum an; wird mit dem nächsten Commit sichtbar"""
+    db.session.add(RoundEvent(kind=kind, room_id=room_id, payload=json.dumps(payload)))
+
+
+def format_sse(data, event_id=None):
+    """Formatiert ein Event im text/event-stream-Format"""
+    lines = []
+    if event_id is not None:
+        lines.append(f'id: {event_id}')
+    lines.append(f'data: {json.dumps(data, separators=(",", ":"))}')
+    return '\n'.join(lines) + '\n\n'
+
+
+class Subscriber:
+    """Verbindung eines Clients mit eigener Warteschlange"""
+
+    def __init__(self, user_id, room_id, can_see_words):
+        self.user_id = user_id
+        self.room_id = room_id
+        self.can_see_words = can_see_words
+        self.queue = queue.Queue(maxsize=100)
+
+    def deliver(self, event_id, data):
+        kind = data.get('kind')
+        if data.get('user_id') == self.user_id:
+            # Eigene Aktionen schalten die Sicht auf andere Wörter um
+            if kind == 'word_submitted':
+                self.can_see_words = True
+            elif kind == 'word_withdrawn':
+                self.can_see_words = False
+        if kind == 'phase' and data.get('phase') == 'voting':
+            self.can_see_words = True
+
+        if kind in WORD_EVENTS and not self.can_see_words:
+            data = {k: v for k, v in data.items() if k != 'word'}
+        try:
+            self.queue.put_nowait(format_sse(data, event_id))
+        except queue.Full:
+            pass  # Langsamer Client: Event verwerfen, der Client lädt beim Phasenwechsel neu
+
+
+class EventHub:
+    """Verteilt Events an alle verbundenen Clients eines Workers"""
+
+    def __init__(self):
+        self.app = None
+        self._lock = threading.Lock()
+        self._subscribers = set()
+        self._thread = None
+        self._last_id = None
+        self._last_phase = {}  # room_id -> Phase beim letzten Poll
+        self._database = None  # DATABASE_STAMP beim Setzen von _last_id
+
+    def init_app(self, app):
+        self.app = app
+        app.config.setdefault('SSE_POLL_INTERVAL', 1.0)
+        app.extensions['event_hub'] = self
+
+    @property
+    def client_count(self):
+        return len(self._subscribers)
+
+    def subscribe(self, user_id, room_id, can_see_words):
+        """Meldet einen Client an (im Request-Kontext aufrufen)"""
+        subscriber = Subscriber(user_id, room_id, can_see_words)
+        with self._lock:
+            if self._last_id is None:
+                # Startpunkt sofort festlegen, damit kein Event zwischen Seitenaufbau
+                # und erstem Poll verloren geht
+                self._reset_cursor()
+            self._subscribers.add(subscriber)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._poll_loop, name='bingo-events', daemon=True)
+                self._thread.start()
+        return subscriber
+
+    def _reset_cursor(self, before=None):
+        """Setzt den Cursor auf das letzte Event (mit `before`: das letzte davor)"""
+        self._database = get_stamp(DATABASE_STAMP).read()
+        query = db.session.query(db.func.max(RoundEvent.id))
+        if before is not None:
+            query = query.filter(RoundEvent.created_at < before)
+        self._last_id = query.scalar() or 0
+
+    def unsubscribe(self, subscriber):
+        with self._lock:
+            self._subscribers.discard(subscriber)
+
+    def _broadcast(self, room_id, event_id, data):
+        with self._lock:
+            subscribers = [s for s in self._subscribers if s.room_id == room_id]
+        for subscriber in subscribers:
+            subscriber.deliver(event_id, data)
+
+    def _poll_loop(self):
+        interval = self.app.config['SSE_POLL_INTERVAL']
+        while True:
+            time.sleep(interval)
+            if not self._subscribers:
+                # Ohne Clients keine Abfragen; beim nächsten Client ab dem aktuellen Stand
+                with self._lock:
+                    if not self._subscribers:
+                        self._last_id = None
+                        self._last_phase = {}
+                continue
+            try:
+                with self.app.app_context():
+                    self._poll_once()
+            except Exception as e:
+                logger.error("Fehler beim Abfragen der Live-Events: %s", e)
+
+    def _poll_once(self):
+        with self._lock:
+            room_ids = {s.room_id for s in self._subscribers}
+        last_phase = {}
+        for room_id in room_ids:
+            phase = clock.state(room_id).phase
+            previous = self._last_phase.get(room_id)
+            if previous is not None and phase != previous:
+                self._broadcast(room_id, None, {'kind': 'phase', 'phase': phase})
+            last_phase[room_id] = phase
+        self._last_phase = last_phase
+
+        database = get_stamp(DATABASE_STAMP)
+        if self._last_id is not None and database.read() != self._database:
+            # Wiederherstellung: die Tabelle ist älter als der Cursor. Weiter
+            # mit allen Events, die seit der Wiederherstellung entstanden sind
+            with self._lock:
+                self._reset_cursor(before=database.modified())
+        last_id = self._last_id
+        if last_id is None:
+            return
+        events = RoundEvent.query.filter(RoundEvent.id > last_id).order_by(RoundEvent.id).all()
+        for event in events:
+            data = json.loads(event.payload)
+            data['kind'] = event.kind
+            self._broadcast(event.room_id, event.id, data)
+            self._last_id = event.id
+
+
+event_hub = EventHub()
+
+
+def prune_round_events(max_age_hours=24):
+    """Löscht alte Events (der Feed dient nur der Live-Verteilung)"""
+    cutoff = datetime.utcnow() - timedelta(hours=max_age_hours)
+    deleted = RoundEvent.query.filter(RoundEvent.created_at < cutoff).delete(synchronize_session=False)
+    db.session.commit()
+    return deleted
@@ -0,0 +1,58 @@
+"""Gunicorn-Konfiguration für den Produktivbetrieb
+
+Start: gunicorn -c gunicorn.conf.py
+Alle Werte lassen sich über Umgebungsvariablen überschreiben.
+"""
+import multiprocessing
+import os
+
+wsgi_app = 'wsgi:app'
+bind = os.environ.get('GUNICORN_BIND', '0.0.0.0:5000')
+
+# Mehrere Prozesse mit je einem kleinen Thread-Pool. GUNICORN_THREADS sind die
+# Threads für normale Requests (danach richtet sich der Connection-Pool in
+# create_app()). Jeder offene /events-Stream belegt einen Thread dauerhaft, daher
+# kommen SSE_MAX_CLIENTS Threads hinzu: Streams verdrängen keine Requests.
+workers = int(os.environ.get('WEB_CONCURRENCY', min(multiprocessing.cpu_count() * 2 + 1, 4)))
+threads = (int(os.environ.get('GUNICORN_THREADS', '8'))
+           + int(os.environ.get('SSE_MAX_CLIENTS', '50')))
+worker_class = 'gthread'
+
+# App einmal im Master laden (create_all, Seeding) statt in jedem Worker
+preload_app = True
+
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', '30'))
+graceful_timeout = int(os.environ.get('GUNICORN_GRACEFUL_TIMEOUT', '30'))
+keepalive = int(os.environ.get('GUNICORN_KEEPALIVE', '5'))
+max_requests = int(os.environ.get('GUNICORN_MAX_REQUESTS', '0'))
+max_requests_jitter = int(os.environ.get('GUNICORN_MAX_REQUESTS_JITTER', '0'))
+
+accesslog = os.environ.get('GUNICORN_ACCESSLOG', '-')
+errorlog = '-'
+loglevel = os.environ.get('GUNICORN_LOGLEVEL', 'info')
+
+
+def on_starting(server):
+    """Metriken gelten ab Serverstart (CLI-Aufrufe setzen sie nicht zurück)"""
+    from metrics import metrics
+
+    server.app.wsgi()
+    metrics.reset()
+
+
+def post_fork(server, worker):
+    """Vom Master geerbte DB-Verbindungen und Log-Queue nicht im Worker weiterverwenden"""
+    from logs import log_pipeline
+    from models import db
+
+    log_pipeline.restart_after_fork()
+    app = server.app.wsgi()
+    with app.app_context():
+        db.engine.dispose(close=False)
+
+
+def post_worker_init(worker):
+    """Hintergrundjobs starten (nur ein Worker erhält die Scheduler-Sperre)"""
+    from scheduler import scheduler
+
+    scheduler.start()
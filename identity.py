@@ -0,0 +1,112 @@
+"""Gecachte Identität für Flask-Logins user_loader
+
+Flask-Login lädt den Benutzer bei jedem Request mit Session. Statt der ganzen
+User-Zeile (mit Passwort-Hash und Beziehungen) hält jeder Worker eine kleine
+Identity (id, username, role, points, room_id) in einem begrenzten LRU-Cache
+mit TTL.
+
+Gültig ist ein Eintrag, solange sich weder der Stempel `users` (alle Benutzer,
+z.B. nach einem Import) noch der Stempel `user-<id>` (ein Benutzer) geändert
+hat. Wer Passwort, Rolle oder Punkte eines Benutzers ändert, ruft nach dem
+Commit `invalidate()` bzw. `invalidate_all()` auf.
+"""
+from collections import OrderedDict
+import threading
+import time
+
+from flask_login import UserMixin
+
+from cache import get_stamp, list_stamps, remove_stamps
+from models import db, User
+
+
+class Identity(UserMixin):
+    """Schreibgeschützte Sicht auf einen angemeldeten Benutzer
+
+    Änderungen gehen über das User-Modell (`User.query.get(identity.id)`).
+    """
+
+    def __init__(self, id, username, role, points, room_id):
+        self.id = id
+        self.username = username
+        self.role = role
+        self.points = points or 0
+        self.room_id = room_id
+
+    def __repr__(self):
+        return f'<Identity {self.username} (Role: {self.role})>'
+
+
+class IdentityCache:
+    """LRU-Cache user_id -> Identity, begrenzt auf `max_size` Einträge und `ttl` Sekunden"""
+
+    STAMP_NAME = 'users'
+
+    def __init__(self, max_size=1024, ttl=300):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # user_id -> (Version, Ablauf, Identity)
+
+    def init_app(self, app):
+        self.max_size = app.config['IDENTITY_CACHE_SIZE']
+        self.ttl = app.config['IDENTITY_CACHE_TTL']
+        app.extensions['identity_cache'] = self
+
+    @staticmethod
+    def _user_stamp(user_id):
+        return get_stamp(f'user-{user_id}')
+
+    def _version(self, user_id):
+        return get_stamp(self.STAMP_NAME).read(), self._user_stamp(user_id).read()
+
+    def get(self, user_id):
+        """Liefert die Identity oder None, wenn es den Benutzer nicht gibt"""
+        version = self._version(user_id)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is not None and entry[0] == version and entry[1] > now:
+                self._entries.move_to_end(user_id)
+                return entry[2]
+
+        row = db.session.query(User.id, User.username, User.role, User.points, User.room_id).filter(
+            User.id == user_id).first()
+        if row is None:
+            return None
+        identity = Identity(*row)
+        with self._lock:
+            self._entries[user_id] = (version, now + self.ttl, identity)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+        return identity
+
+    def invalidate(self, *user_ids):
+        """Nach Änderungen an einzelnen Benutzern aufrufen (nach dem Commit)"""
+        for user_id in user_ids:
+            self._user_stamp(user_id).bump()
+        with self._lock:
+            for user_id in user_ids:
+                self._entries.pop(user_id, None)
+
+    def prune_stamps(self):
+        """Löscht die Stempel gelöschter Benutzer; gibt die Anzahl zurück"""
+        stamp_ids = {}
+        for name in list_stamps():
+            prefix, _, user_id = name.partition('-')
+            if prefix == 'user' and user_id.isdigit():
+                stamp_ids[int(user_id)] = name
+        if not stamp_ids:
+            return 0
+        existing = {user_id for (user_id,) in db.session.query(User.id)}
+        return remove_stamps(name for user_id, name in stamp_ids.items() if user_id not in existing)
+
+    def invalidate_all(self):
+        """Nach Änderungen an vielen Benutzern aufrufen (nach dem Commit)"""
+        get_stamp(self.STAMP_NAME).bump()
+        with self._lock:
+            self._entries.clear()
+
+
+identity_cache = IdentityCache()
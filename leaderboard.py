@@ -0,0 +1,139 @@
+"""Materialisierte Rangliste mit Seiten und Fragment-Cache
+
+Jeder Raum hat seine eigene Rangliste. Sie ändert sich nur, wenn Punkte
+vergeben oder Benutzer angelegt werden. Sie wird daher einmal pro Version des
+Stempels `leaderboard-<room_id>` geladen und gerankt. Auch die gerenderten
+HTML-Seiten werden pro Version gecacht. Zwischen zwei Stimmen kostet ein
+Aufruf der Bestenliste keine Abfrage.
+
+Ränge:
+    rank        Wettkampf-Rang (1, 1, 3): Gleichstand teilt sich den Platz
+    dense_rank  dichter Rang (1, 1, 2): ohne Lücken nach Gleichstand
+"""
+from collections import namedtuple
+import math
+import threading
+
+from flask import render_template
+from markupsafe import Markup
+
+from cache import get_stamp
+from models import db, User
+
+Standing = namedtuple('Standing', ['rank', 'dense_rank', 'user_id', 'username', 'points'])
+LeaderboardPage = namedtuple('LeaderboardPage', ['standings', 'page', 'pages', 'per_page', 'total'])
+
+
+def rank_standings(rows):
+    """Rankt (user_id, username, points)-Zeilen, die nach Punkten absteigend sortiert sind"""
+    standings = []
+    rank = dense_rank = 0
+    previous = None
+    for position, (user_id, username, points) in enumerate(rows, start=1):
+        points = points or 0
+        if points != previous:
+            rank, dense_rank, previous = position, dense_rank + 1, points
+        standings.append(Standing(rank, dense_rank, user_id, username, points))
+    return standings
+
+
+class LeaderboardSnapshot:
+    """Unveränderliche, gerankte Sicht auf alle Benutzer"""
+
+    def __init__(self, standings):
+        self.standings = tuple(standings)
+        self._position = {s.user_id: i for i, s in enumerate(self.standings)}
+
+    def __iter__(self):
+        return iter(self.standings)
+
+    def __len__(self):
+        return len(self.standings)
+
+    def top(self, n):
+        """Die ersten `n` Plätze"""
+        return self.standings[:n]
+
+    def page(self, page, per_page):
+        """Seite `page` (ab 1); zu große Seitenzahlen landen auf der letzten Seite"""
+        pages = max(math.ceil(len(self.standings) / per_page), 1)
+        page = min(max(page, 1), pages)
+        start = (page - 1) * per_page
+        return LeaderboardPage(self.standings[start:start + per_page], page, pages,
+                               per_page, len(self.standings))
+
+    def rank_of(self, user_id):
+        """Standing eines Benutzers oder None"""
+        position = self._position.get(user_id)
+        return None if position is None else self.standings[position]
+
+    def page_of(self, user_id, per_page):
+        """Seite, auf der ein Benutzer steht (1, wenn unbekannt)"""
+        return self._position.get(user_id, 0) // per_page + 1
+
+
+def load_leaderboard(room_id):
+    """Lädt und rankt alle Benutzer eines Raums mit einer Abfrage (nutzt idx_user_room_points)"""
+    rows = db.session.query(User.id, User.username, User.points).filter(
+        User.room_id == room_id).order_by(User.points.desc(), User.username).all()
+    return LeaderboardSnapshot(rank_standings(rows))
+
+
+class LeaderboardCache:
+    """Hält pro Raum den Snapshot und gerenderte Seiten für die aktuelle Version
+
+    Schreibzugriffe auf Punkte oder Benutzer rufen `invalidate(room_id)` nach
+    dem Commit auf; alle Worker laden dann beim nächsten Zugriff neu.
+    """
+
+    STAMP_NAME = 'leaderboard'
+    MAX_FRAGMENTS = 32
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = {}  # room_id -> (Version, LeaderboardSnapshot)
+        self._fragments = {}  # (room_id, Version, Seite, Größe) -> Markup
+
+    def _stamp(self, room_id):
+        return get_stamp(f'{self.STAMP_NAME}-{room_id}')
+
+    def version(self, room_id):
+        return self._stamp(room_id).read()
+
+    def get(self, room_id):
+        """Liefert den aktuellen Snapshot eines Raums"""
+        version = self.version(room_id)
+        entry = self._entries.get(room_id)
+        if entry is not None and entry[0] == version:
+            return entry[1]
+
+        with self._lock:
+            entry = self._entries.get(room_id)
+            if entry is None or entry[0] != version:
+                entry = self._entries[room_id] = (version, load_leaderboard(room_id))
+            return entry[1]
+
+    def render_page(self, room_id, page, per_page):
+        """Liefert (LeaderboardPage, HTML der Zeilen); das HTML wird pro Version gecacht"""
+        version = self.version(room_id)
+        board_page = self.get(room_id).page(page, per_page)
+        key = (room_id, version, board_page.page, per_page)
+        html = self._fragments.get(key)
+        if html is None:
+            html = Markup(render_template('_leaderboard_rows.html', standings=board_page.standings))
+            with self._lock:
+                if len(self._fragments) >= self.MAX_FRAGMENTS:
+                    self._fragments.clear()
+                self._fragments[key] = html
+        return board_page, html
+
+    def invalidate(self, room_id):
+        """Nach Änderungen an Punkten oder Benutzern eines Raums aufrufen (nach dem Commit)"""
+        self._stamp(room_id).bump()
+        with self._lock:
+            self._entries.pop(room_id, None)
+            self._fragments = {key: html for key, html in self._fragments.items()
+                               if key[0] != room_id}
+
+
+leaderboard_cache = LeaderboardCache()
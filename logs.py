@@ -0,0 +1,214 @@
+"""Strukturiertes Logging über eine Queue, mit Sampling und Ratenlimits
+
+Requests schreiben Logeinträge nur in eine begrenzte Queue (QueueHandler).
+Formatiert (JSON, eine Zeile pro Eintrag) und ausgegeben wird in einem
+eigenen Thread (QueueListener). Die Nachricht wird erst dort zusammengesetzt,
+Aufrufe im Stil `logger.info("... %s", wert)` kosten im Request also kaum
+etwas. Ist die Queue voll, wird verworfen statt gewartet; der nächste Eintrag
+trägt die Zahl der verworfenen im Feld `dropped`.
+
+Einträge mit einem Ereignistyp (`extra={'event': 'login_failed'}`) lassen
+sich pro Typ sampeln (LOG_SAMPLE_RATES, Anteil 0-1, nur bis INFO) und
+begrenzen (LOG_RATE_LIMITS, Einträge pro Minute). Unterdrückte Einträge
+werden im Feld `suppressed` des nächsten durchgelassenen mitgezählt.
+
+Jeder Request bekommt eine ID (X-Request-ID, vom Proxy übernommen oder neu),
+die in allen seinen Logeinträgen und im Timing-Eintrag `request` steht.
+"""
+import atexit
+from datetime import datetime, timezone
+import json
+import logging
+import logging.handlers
+import queue
+import random
+import re
+import sys
+import threading
+import time
+import uuid
+
+from flask import g, has_request_context, request
+
+# Attribute, die jeder LogRecord hat; alles andere kommt aus `extra`
+RESERVED = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime'}
+REQUEST_ID_PATTERN = re.compile(r'^[A-Za-z0-9._-]{1,64}$')
+
+
+def parse_rates(value):
+    """'login_failed=30,request=0.05' -> {'login_failed': 30.0, 'request': 0.05}"""
+    rates = {}
+    for item in (value or '').split(','):
+        name, _, rate = item.partition('=')
+        if name.strip() and rate.strip():
+            rates[name.strip()] = float(rate)
+    return rates
+
+
+class JsonFormatter(logging.Formatter):
+    """Eine JSON-Zeile pro Eintrag; Felder aus `extra` landen auf oberster Ebene"""
+
+    def format(self, record):
+        entry = {
+            'ts': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'msg': record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in RESERVED and not key.startswith('_'):
+                entry[key] = value
+        if record.exc_info:
+            entry['exc'] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class RequestContextFilter(logging.Filter):
+    """Hängt die Request-ID an (läuft im aufrufenden Thread, nicht im Listener)"""
+
+    def filter(self, record):
+        if has_request_context() and 'request_id' in g:
+            record.request_id = g.request_id
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """Sampling und Ratenlimit pro Ereignistyp (`record.event`)"""
+
+    def __init__(self, sample_rates=None, rate_limits=None):
+        super().__init__()
+        self.sample_rates = sample_rates or {}
+        self.rate_limits = rate_limits or {}
+        self._lock = threading.Lock()
+        self._buckets = {}     # Ereignis -> (Tokens, letzte Auffüllung)
+        self._suppressed = {}  # Ereignis -> seit dem letzten Eintrag unterdrückt
+
+    def _allow(self, event, per_minute):
+        now = time.monotonic()
+        tokens, updated = self._buckets.get(event, (per_minute, now))
+        tokens = min(per_minute, tokens + (now - updated) * per_minute / 60)
+        allowed = tokens >= 1
+        self._buckets[event] = (tokens - allowed, now)
+        return allowed
+
+    def filter(self, record):
+        event = getattr(record, 'event', None)
+        if event is None:
+            return True
+        rate = self.sample_rates.get(event)
+        sampled_out = rate is not None and record.levelno <= logging.INFO and random.random() >= rate
+        with self._lock:
+            per_minute = self.rate_limits.get(event)
+            if sampled_out or (per_minute is not None and not self._allow(event, per_minute)):
+                self._suppressed[event] = self._suppressed.get(event, 0) + 1
+                return False
+            suppressed = self._suppressed.pop(event, 0)
+        if suppressed:
+            record.suppressed = suppressed
+        return True
+
+
+class BoundedQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler, der bei voller Queue verwirft und nichts vorformatiert"""
+
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record):
+        # Gleicher Prozess, kein Pickling nötig: getMessage() erst im Listener
+        return record
+
+    def enqueue(self, record):
+        if self.dropped:
+            record.dropped, self.dropped = self.dropped, 0
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class _Listener(logging.handlers.QueueListener):
+    def enqueue_sentinel(self):
+        # Blockierend: bei voller Queue wartet das Ende, bis der Listener aufgeholt hat
+        self.queue.put(self._sentinel)
+
+
+class LogPipeline:
+    """Richtet das Root-Logging ein und vergibt Request-IDs"""
+
+    def __init__(self):
+        self.handler = None
+        self.listener = None
+        self.output = None
+        self.queue_size = 10000
+        self.slow_request_seconds = 1.0
+        self._atexit_registered = False
+
+    def init_app(self, app):
+        self.queue_size = app.config['LOG_QUEUE_SIZE']
+        self.slow_request_seconds = app.config['LOG_SLOW_REQUEST_MS'] / 1000
+        if app.config['LOG_FORMAT'] == 'json':
+            formatter = JsonFormatter()
+        else:
+            formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+        self.output = logging.StreamHandler(sys.stderr)
+        self.output.setFormatter(formatter)
+
+        root = logging.getLogger()
+        if self.handler is not None:
+            root.removeHandler(self.handler)
+            self.stop()
+        self.handler = BoundedQueueHandler(queue.Queue(self.queue_size))
+        self.handler.addFilter(RequestContextFilter())
+        self.handler.addFilter(SamplingFilter(parse_rates(app.config['LOG_SAMPLE_RATES']),
+                                              parse_rates(app.config['LOG_RATE_LIMITS'])))
+        root.addHandler(self.handler)
+        root.setLevel(app.config['LOG_LEVEL'])
+        self.start()
+        if not self._atexit_registered:
+            atexit.register(self.stop)
+            self._atexit_registered = True
+
+        app.before_request(self._before_request)
+        app.after_request(self._after_request)
+        app.extensions['log_pipeline'] = self
+
+    def start(self):
+        self.listener = _Listener(self.handler.queue, self.output)
+        self.listener.start()
+
+    def stop(self):
+        """Gibt alle noch wartenden Einträge aus und beendet den Listener"""
+        if self.listener is not None:
+            self.listener.stop()
+            self.listener = None
+
+    def restart_after_fork(self):
+        """Im Worker nach dem Fork: der Listener-Thread des Masters lebt dort nicht"""
+        if self.handler is None:
+            return
+        self.handler.queue = queue.Queue(self.queue_size)
+        self.listener = None
+        self.start()
+
+    def _before_request(self):
+        request_id = request.headers.get('X-Request-ID', '')
+        g.request_id = request_id if REQUEST_ID_PATTERN.match(request_id) else uuid.uuid4().hex
+        g.log_started = time.perf_counter()
+
+    def _after_request(self, response):
+        started = g.get('log_started')
+        if started is None:
+            return response
+        response.headers['X-Request-ID'] = g.request_id
+        elapsed = time.perf_counter() - started
+        level = logging.WARNING if elapsed >= self.slow_request_seconds else logging.INFO
+        logging.getLogger('bingo.request').log(
+            level, "%s %s %s %.1f ms", request.method, request.path, response.status_code, elapsed * 1000,
+            extra={'event': 'request', 'endpoint': request.endpoint, 'status': response.status_code,
+                   'duration_ms': round(elapsed * 1000, 1), 'queries': g.get('query_count')})
+        return response
+
+
+log_pipeline = LogPipeline()
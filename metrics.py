@@ -0,0 +1,248 @@
+"""Request- und Query-Metriken im Prometheus-Textformat (/metrics)
+
+Jede SQL-Abfrage wird über die SQLAlchemy-Events `before_cursor_execute` und
+`after_cursor_execute` gezählt und gemessen und dem laufenden Request
+zugeordnet. Pro Route entstehen Histogramme für Latenz und Abfragen pro
+Request. Ein N+1-Problem zeigt sich so sofort als Sprung in
+`bingo_db_queries_per_request`.
+
+Jeder Gunicorn-Worker sammelt lokal und schreibt die Deltas alle paar Sekunden
+in eine kleine SQLite-Datei im Instance-Ordner (wie ratelimit.py). /metrics
+liest daraus die Summe über alle Worker. Zurückgesetzt wird nur beim Start des
+Servers (`reset()` aus gunicorn.conf.py bzw. run.py), nicht bei jedem
+`create_app()`: CLI-Befehle und Cronjobs bauen ebenfalls eine App.
+"""
+import atexit
+import hmac
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+from flask import Response, g, has_request_context, request
+from flask_login import current_user
+from sqlalchemy import event
+
+from models import db
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+# Name -> (Typ, Hilfetext, Buckets)
+FAMILIES = {
+    'bingo_http_requests_total': (
+        'counter', 'HTTP-Requests nach Route, Methode und Status', None),
+    'bingo_http_request_duration_seconds': (
+        'histogram', 'Bearbeitungszeit pro Request', LATENCY_BUCKETS),
+    'bingo_db_queries_per_request': (
+        'histogram', 'SQL-Abfragen pro Request', QUERY_COUNT_BUCKETS),
+    'bingo_db_query_duration_seconds': (
+        'histogram', 'Dauer einzelner SQL-Abfragen', LATENCY_BUCKETS),
+    'bingo_db_queries_total': (
+        'counter', 'SQL-Abfragen (endpoint="background": Jobs und Threads)', None),
+    'bingo_db_slow_queries_total': (
+        'counter', 'SQL-Abfragen über SLOW_QUERY_MS', None),
+}
+
+
+def _labels(**labels):
+    return ','.join(f'{key}="{value}"' for key, value in sorted(labels.items()))
+
+
+def _format_le(bound):
+    return repr(float(bound))
+
+
+class Metrics:
+    """Sammelt Zähler und Histogramme und exportiert sie für Prometheus"""
+
+    def __init__(self):
+        self.path = None
+        self.enabled = True
+        self.flush_interval = 5
+        self.slow_query_seconds = 0.2
+        self.debug_headers = False
+        self.token = None
+        self._lock = threading.Lock()
+        self._pending = {}  # (Name, Labels, le) -> Delta
+        self._last_flush = time.monotonic()
+        self._local = threading.local()
+
+    def init_app(self, app):
+        self.path = app.config['METRICS_DB']
+        self.enabled = app.config['METRICS_ENABLED']
+        self.flush_interval = app.config['METRICS_FLUSH_SECONDS']
+        self.slow_query_seconds = app.config['SLOW_QUERY_MS'] / 1000
+        self.debug_headers = app.config['METRICS_DEBUG_HEADERS']
+        self.token = app.config['METRICS_TOKEN']
+        app.extensions['metrics'] = self
+        if not self.enabled:
+            return
+
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with sqlite3.connect(self.path) as conn:
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS sample ('
+                ' name TEXT NOT NULL, labels TEXT NOT NULL, le TEXT NOT NULL,'
+                ' value REAL NOT NULL, PRIMARY KEY (name, labels, le))'
+            )
+
+        with app.app_context():
+            event.listen(db.engine, 'before_cursor_execute', self._before_cursor_execute)
+            event.listen(db.engine, 'after_cursor_execute', self._after_cursor_execute)
+        app.before_request(self._before_request)
+        app.after_request(self._after_request)
+        app.add_url_rule('/metrics', 'metrics', self.metrics_view)
+        atexit.register(self.flush)
+
+    # --- Sammeln ---------------------------------------------------------
+
+    def inc(self, name, labels, value=1):
+        key = (name, labels, '')
+        with self._lock:
+            self._pending[key] = self._pending.get(key, 0) + value
+
+    def observe(self, name, labels, value):
+        """Trägt einen Messwert in ein Histogramm ein (kumulative Buckets)"""
+        buckets = FAMILIES[name][2]
+        with self._lock:
+            pending = self._pending
+            for bound in buckets:
+                if value <= bound:
+                    key = (f'{name}_bucket', labels, _format_le(bound))
+                    pending[key] = pending.get(key, 0) + 1
+            for suffix, delta in (('_bucket', 1), ('_count', 1), ('_sum', value)):
+                key = (f'{name}{suffix}', labels, '+Inf' if suffix == '_bucket' else '')
+                pending[key] = pending.get(key, 0) + delta
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault('query_start', []).append(time.perf_counter())
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info['query_start'].pop()
+        if has_request_context():
+            g.query_count = g.get('query_count', 0) + 1
+            g.query_seconds = g.get('query_seconds', 0.0) + elapsed
+            endpoint = request.endpoint or 'unmatched'
+        else:
+            endpoint = 'background'
+            self.inc('bingo_db_queries_total', _labels(endpoint=endpoint))
+        self.observe('bingo_db_query_duration_seconds', _labels(endpoint=endpoint), elapsed)
+
+        if elapsed >= self.slow_query_seconds:
+            self.inc('bingo_db_slow_queries_total', _labels(endpoint=endpoint))
+            logger.warning("Langsame Abfrage (%.0f ms, %s): %s",
+                           elapsed * 1000, endpoint, ' '.join(statement.split())[:500])
+
+    def _before_request(self):
+        g.request_started = time.perf_counter()
+        g.query_count = 0
+        g.query_seconds = 0.0
+
+    def _after_request(self, response):
+        started = g.get('request_started')
+        if started is None:
+            return response
+        elapsed = time.perf_counter() - started
+        endpoint = request.endpoint or 'unmatched'
+        labels = _labels(endpoint=endpoint)
+        query_count = g.get('query_count', 0)
+
+        self.inc('bingo_http_requests_total', _labels(
+            endpoint=endpoint, method=request.method, status=response.status_code))
+        self.observe('bingo_http_request_duration_seconds', labels, elapsed)
+        self.observe('bingo_db_queries_per_request', labels, query_count)
+        if query_count:
+            self.inc('bingo_db_queries_total', labels, query_count)
+
+        if self.debug_headers:
+            response.headers['X-Query-Count'] = str(query_count)
+            response.headers['X-Query-Time'] = f"{g.get('query_seconds', 0.0) * 1000:.1f}ms"
+
+        if time.monotonic() - self._last_flush >= self.flush_interval:
+            self.flush()
+        return response
+
+    # --- Speichern und Export ---------------------------------------------
+
+    def reset(self):
+        """Setzt alle Zähler zurück; nur beim Start des Servers aufrufen, vor den Workern"""
+        with self._lock:
+            self._pending = {}
+        if not self.enabled or self.path is None:
+            return
+        self._connection().execute('DELETE FROM sample')
+        # Läuft im Gunicorn-Master: keine Verbindung an die Worker vererben
+        self._local.conn.close()
+        self._local.conn = None
+
+    def _connection(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.path != self.path:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn, self._local.path = conn, self.path
+        return conn
+
+    def flush(self):
+        """Schreibt die lokal gesammelten Deltas in den gemeinsamen Speicher"""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            self._last_flush = time.monotonic()
+        if not pending or not self.enabled:
+            return
+        try:
+            conn = self._connection()
+            conn.execute('BEGIN IMMEDIATE')
+            conn.executemany(
+                'INSERT INTO sample (name, labels, le, value) VALUES (?, ?, ?, ?) '
+                'ON CONFLICT(name, labels, le) DO UPDATE SET value = value + excluded.value',
+                [(name, labels, le, value) for (name, labels, le), value in pending.items()]
+            )
+            conn.execute('COMMIT')
+        except sqlite3.Error as e:
+            logger.error("Fehler beim Schreiben der Metriken: %s", e)
+
+    def export(self):
+        """Alle Worker zusammen im Prometheus-Textformat"""
+        self.flush()
+        rows = self._connection().execute('SELECT name, labels, le, value FROM sample').fetchall()
+
+        samples = {}
+        for name, labels, le, value in rows:
+            family = next((f for f in FAMILIES if name == f or name.startswith(f + '_')), name)
+            samples.setdefault(family, []).append((name, labels, le, value))
+
+        lines = []
+        for family, (kind, help_text, _) in FAMILIES.items():
+            lines.append(f'# HELP {family} {help_text}')
+            lines.append(f'# TYPE {family} {kind}')
+            # Buckets numerisch sortiert, _count und _sum danach
+            for name, labels, le, value in sorted(
+                    samples.get(family, ()),
+                    key=lambda s: (s[1], s[0] != f'{family}_bucket', s[0], float(s[2] or 0))):
+                if le:
+                    labels = f'{labels},le="{le}"' if labels else f'le="{le}"'
+                value = int(value) if float(value).is_integer() else value
+                lines.append(f'{name}{{{labels}}} {value}' if labels else f'{name} {value}')
+        return '\n'.join(lines) + '\n'
+
+    def _authorized(self):
+        """Mit METRICS_TOKEN (Bearer) oder als eingeloggter Admin"""
+        if self.token and hmac.compare_digest(request.headers.get('Authorization', ''),
+                                              f'Bearer {self.token}'):
+            return True
+        return current_user.is_authenticated and current_user.role == 'admin'
+
+    def metrics_view(self):
+        if not self._authorized():
+            # Ohne Token bleibt der Endpunkt für alle außer Admins unsichtbar
+            return Response(status=403 if self.token else 404)
+        return Response(self.export(), mimetype='text/plain; version=0.0.4')
+
+
+metrics = Metrics()
@@ -4,6 +4,25 @@ from datetime import datetime
 
 db = SQLAlchemy()
 
+# Bestehende Daten (vor Einführung der Räume) gehören zu diesem Raum
+DEFAULT_ROOM_ID = 1
+
+
+def room_column():
+    """room_id-Spalte; server_default, damit ALTER TABLE bestehende Zeilen füllen kann"""
+    return db.Column(db.Integer, db.ForeignKey('room.id'), nullable=False,
+                     default=DEFAULT_ROOM_ID, server_default=str(DEFAULT_ROOM_ID))
+
+class Room(db.Model):
+    """Eine Spielgruppe mit eigenen Zeiten, Runden, Cooldowns und eigener Rangliste"""
+    id = db.Column(db.Integer, primary_key=True)
+    slug = db.Column(db.String(50), unique=True, nullable=False)
+    name = db.Column(db.String(100), nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    def __repr__(self):
+        return f'<Room {self.slug}>'
+
 class User(UserMixin, db.Model):
     """Benutzer-Modell für Authentifizierung und Punkteverwaltung"""
     id = db.Column(db.Integer, primary_key=True)
@@ -11,11 +30,17 @@ class User(UserMixin, db.Model):
     password_hash = db.Column(db.String(120), nullable=False)
     role = db.Column(db.String(20), default='player')  # 'admin' or 'player'
     points = db.Column(db.Integer, default=0)
+    room_id = room_column()
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
     # Relationship to words submitted by this user
     words = db.relationship('WordLog', backref='user', lazy=True, cascade='all, delete-orphan')
     
+    # Rangliste pro Raum: Punkte absteigend, bei Gleichstand alphabetisch
+    __table_args__ = (
+        db.Index('idx_user_room_points', 'room_id', db.desc('points'), 'username'),
+    )
+    
     def __repr__(self):
         return f'<User {self.username} (Role: {self.role}, Points: {self.points})>'
 
@@ -27,24 +52,31 @@ class WordLog(db.Model):
     date = db.Column(db.Date, default=lambda: datetime.now().date(), index=True)
     is_locked = db.Column(db.Boolean, default=False)
     changes_count = db.Column(db.Integer, default=0)
+    room_id = room_column()
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
     # Composite Index für schnelle Abfragen
     __table_args__ = (
         db.Index('idx_user_date', 'user_id', 'date'),
-        db.Index('idx_word_date', 'word', 'date'),
+        db.Index('idx_room_date', 'room_id', 'date'),
+        db.Index('idx_room_word_date', 'room_id', 'word', 'date'),
     )
     
     def __repr__(self):
         return f'<WordLog {self.word} by User#{self.user_id} on {self.date}>'
 
 class CooldownLog(db.Model):
-    """Cooldown-Verwaltung für bereits verwendete Wörter"""
+    """Cooldown-Verwaltung für bereits verwendete Wörter (pro Raum)"""
     id = db.Column(db.Integer, primary_key=True)
-    word = db.Column(db.String(100), unique=True, nullable=False, index=True)
+    word = db.Column(db.String(100), nullable=False)
     expiry_date = db.Column(db.Date, nullable=False, index=True)
+    room_id = room_column()
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
+    __table_args__ = (
+        db.UniqueConstraint('room_id', 'word', name='uq_cooldown_room_word'),
+    )
+    
     def __repr__(self):
         return f'<CooldownLog {self.word} until {self.expiry_date}>'
     
@@ -52,13 +84,90 @@ class CooldownLog(db.Model):
         """Prüft ob der Cooldown noch aktiv ist"""
         return self.expiry_date > datetime.now().date()
 
+class Vote(db.Model):
+    """Stimmen-Ledger: höchstens eine Stimme pro Wähler, Ziel und Tag"""
+    id = db.Column(db.Integer, primary_key=True)
+    voter_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    target_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    date = db.Column(db.Date, default=lambda: datetime.now().date(), nullable=False)
+    room_id = room_column()
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    __table_args__ = (
+        db.UniqueConstraint('voter_id', 'target_id', 'date', name='uq_vote_voter_target_date'),
+        db.Index('idx_vote_target_date', 'target_id', 'date'),
+        db.Index('idx_vote_room_date', 'room_id', 'date'),
+    )
+    
+    def __repr__(self):
+        return f'<Vote User#{self.voter_id} -> User#{self.target_id} on {self.date}>'
+
+class ClosedRound(db.Model):
+    """Eingefrorener Stand einer Runde ab dinner_time (wird nie verändert)"""
+    id = db.Column(db.Integer, primary_key=True)
+    date = db.Column(db.Date, nullable=False)
+    entries = db.Column(db.Text, nullable=False)  # JSON-Liste der RoundEntry-Felder
+    room_id = room_column()
+    closed_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    __table_args__ = (
+        db.UniqueConstraint('room_id', 'date', name='uq_closed_round_room_date'),
+    )
+    
+    def __repr__(self):
+        return f'<ClosedRound {self.date}>'
+
+class UserStats(db.Model):
+    """Rollup pro Spieler, fortgeschrieben nach Ende jeder Runde (stats.py)"""
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), primary_key=True)
+    rounds_played = db.Column(db.Integer, default=0, nullable=False)
+    wins = db.Column(db.Integer, default=0, nullable=False)  # Runden mit mindestens einer Stimme
+    votes_received = db.Column(db.Integer, default=0, nullable=False)
+    current_streak = db.Column(db.Integer, default=0, nullable=False)
+    best_streak = db.Column(db.Integer, default=0, nullable=False)
+    last_played = db.Column(db.Date)
+    
+    __table_args__ = (
+        db.Index('idx_user_stats_wins', db.desc('wins'), db.desc('rounds_played')),
+    )
+    
+    @property
+    def win_rate(self):
+        return self.wins / self.rounds_played if self.rounds_played else 0.0
+    
+    def __repr__(self):
+        return f'<UserStats User#{self.user_id} {self.wins}/{self.rounds_played}>'
+
+class WordStats(db.Model):
+    """Rollup pro Raum und Wort, fortgeschrieben nach Ende jeder Runde (stats.py)"""
+    room_id = db.Column(db.Integer, db.ForeignKey('room.id'), primary_key=True,
+                        default=DEFAULT_ROOM_ID, server_default=str(DEFAULT_ROOM_ID))
+    word = db.Column(db.String(100), primary_key=True)
+    times_used = db.Column(db.Integer, default=0, nullable=False)
+    times_won = db.Column(db.Integer, default=0, nullable=False)
+    votes = db.Column(db.Integer, default=0, nullable=False)
+    first_used = db.Column(db.Date)
+    last_used = db.Column(db.Date)
+    
+    __table_args__ = (
+        db.Index('idx_word_stats_room_used', 'room_id', db.desc('times_used'), 'word'),
+    )
+    
+    def __repr__(self):
+        return f'<WordStats {self.word} x{self.times_used}>'
+
 class Setting(db.Model):
-    """Anwendungseinstellungen"""
+    """Anwendungseinstellungen pro Raum (Systemwerte mit '_' beim Standardraum)"""
     id = db.Column(db.Integer, primary_key=True)
-    key = db.Column(db.String(50), unique=True, nullable=False, index=True)
+    key = db.Column(db.String(50), nullable=False)
     value = db.Column(db.String(200), nullable=False)
+    room_id = room_column()
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
+    __table_args__ = (
+        db.UniqueConstraint('room_id', 'key', name='uq_setting_room_key'),
+    )
+    
     def __repr__(self):
         return f'<Setting {self.key}={self.value}>'
 
@@ -72,3 +181,78 @@ class Subscription(db.Model):
     def __repr__(self):
         return f'<Subscription for User#{self.user_id}>'
 
+class RoundEvent(db.Model):
+    """Änderungs-Feed für den Live-Stream (/events), von allen Workern gepollt"""
+    id = db.Column(db.Integer, primary_key=True)
+    kind = db.Column(db.String(30), nullable=False)
+    payload = db.Column(db.Text, nullable=False)  # JSON string
+    room_id = room_column()
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+    
+    def __repr__(self):
+        return f'<RoundEvent #{self.id} {self.kind}>'
+
+
+# Tabellen, deren Eindeutigkeit jetzt pro Raum gilt: SQLite kann UNIQUE und
+# PRIMARY KEY nicht per ALTER TABLE ändern, sie werden einmalig umkopiert
+REBUILT_TABLES = ('setting', 'cooldown_log', 'closed_round', 'word_stats')
+# Von Indizes mit room_id an erster Stelle abgelöst
+OBSOLETE_INDEXES = ('idx_user_points', 'idx_word_date', 'idx_word_stats_used')
+
+
+def _rebuild_table(conn, table, existing_columns):
+    old_name = f'{table.name}_old'
+    conn.exec_driver_sql(f'ALTER TABLE "{table.name}" RENAME TO "{old_name}"')
+    # Indexnamen sind datenbankweit eindeutig, die alten müssen vorher weg
+    old_indexes = conn.exec_driver_sql(
+        "SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = ? AND sql IS NOT NULL",
+        (old_name,)).scalars().all()
+    for index_name in old_indexes:
+        conn.exec_driver_sql(f'DROP INDEX "{index_name}"')
+    table.create(conn)
+    columns = ', '.join(f'"{name}"' for name in table.columns.keys() if name in existing_columns)
+    conn.exec_driver_sql(f'INSERT INTO "{table.name}" ({columns}) SELECT {columns} FROM "{old_name}"')
+    conn.exec_driver_sql(f'DROP TABLE "{old_name}"')
+
+
+def migrate_schema():
+    """Bringt eine bestehende SQLite-Datenbank auf den Stand der Modelle
+    
+    create_all() legt nur fehlende Tabellen an. Fehlende Spalten (room_id)
+    werden mit ALTER TABLE ergänzt und über ihren server_default gefüllt.
+    Liefert die Namen der geänderten Tabellen.
+    """
+    if db.engine.dialect.name != 'sqlite':
+        return []
+    inspector = db.inspect(db.engine)
+    changed = []
+    with db.engine.begin() as conn:
+        for table in db.metadata.sorted_tables:
+            if not inspector.has_table(table.name):
+                continue
+            existing = {column['name'] for column in inspector.get_columns(table.name)}
+            missing = [column for column in table.columns if column.name not in existing]
+            if not missing:
+                continue
+            if table.name in REBUILT_TABLES:
+                _rebuild_table(conn, table, existing)
+            else:
+                for column in missing:
+                    column_type = column.type.compile(dialect=db.engine.dialect)
+                    default = f' NOT NULL DEFAULT {column.server_default.arg}' if column.server_default else ''
+                    conn.exec_driver_sql(
+                        f'ALTER TABLE "{table.name}" ADD COLUMN "{column.name}" {column_type}{default}')
+            changed.append(table.name)
+        for index_name in OBSOLETE_INDEXES:
+            conn.exec_driver_sql(f'DROP INDEX IF EXISTS "{index_name}"')
+    return changed
+
+
+def create_missing_indexes():
+    """Legt neue Indizes auch in bestehenden Datenbanken an
+    
+    create_all() überspringt vorhandene Tabellen samt ihren Indizes.
+    """
+    for table in db.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(db.engine, checkfirst=True)
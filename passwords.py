@@ -0,0 +1,65 @@
+"""Passwort-Hashing mit konfigurierbaren Parametern
+
+scrypt ist absichtlich teuer. Die Parameter kommen aus PASSWORD_HASH_METHOD
+(Werkzeug-Format, z.B. "scrypt:32768:8:1" oder "pbkdf2:sha256:600000").
+Hashes mit veralteten Parametern werden beim nächsten Login erneuert
+(`needs_rehash`). Beim Provisionieren vieler Benutzer werden die Hashes
+parallel in einem Prozess-Pool berechnet.
+"""
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+import os
+
+from werkzeug.security import generate_password_hash, check_password_hash
+
+DEFAULT_METHOD = 'scrypt:32768:8:1'
+
+# Unterhalb dieser Anzahl lohnt sich das Starten eines Prozess-Pools nicht
+PARALLEL_THRESHOLD = 4
+
+_method = DEFAULT_METHOD
+_method_prefix = DEFAULT_METHOD
+
+
+def configure(method):
+    """Setzt das Hash-Verfahren (einmal beim App-Start)"""
+    global _method, _method_prefix
+    # Werkzeug ergänzt fehlende Parameter; das Präfix eines echten Hashes
+    # ist daher die normalisierte Form für den Vergleich in needs_rehash()
+    prefix = generate_password_hash('', method=method).split('$', 1)[0]
+    _method, _method_prefix = method, prefix
+
+
+def hash_password(password):
+    """Hasht ein Passwort mit den konfigurierten Parametern"""
+    return generate_password_hash(password, method=_method)
+
+
+def needs_rehash(password_hash):
+    """True, wenn der Hash mit anderen als den konfigurierten Parametern erzeugt wurde"""
+    return password_hash.split('$', 1)[0] != _method_prefix
+
+
+def _verify(pair):
+    password_hash, password = pair
+    return check_password_hash(password_hash, password)
+
+
+def _map(func, items):
+    items = list(items)
+    if len(items) < PARALLEL_THRESHOLD:
+        return [func(item) for item in items]
+    workers = min(len(items), os.cpu_count() or 1)
+    chunksize = max(len(items) // (workers * 4), 1)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(func, items, chunksize=chunksize))
+
+
+def hash_passwords(passwords):
+    """Hasht alle Passwörter (Reihenfolge bleibt erhalten)"""
+    return _map(partial(generate_password_hash, method=_method), passwords)
+
+
+def verify_passwords(pairs):
+    """Prüft (password_hash, password)-Paare; liefert eine Liste von bool"""
+    return _map(_verify, pairs)
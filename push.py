@@ -0,0 +1,197 @@
+"""Web-Push-Versand an alle gespeicherten Subscriptions (optional nur eines Raums)
+
+Subscriptions werden seitenweise gelesen und pro Seite parallel auf einem
+begrenzten Thread-Pool verschickt. Vorübergehende Fehler (429, 5xx,
+Netzwerk) werden mit exponentiellem Backoff wiederholt, abgelaufene
+Endpunkte (404/410) am Ende jeder Seite gesammelt gelöscht.
+"""
+from concurrent.futures import ThreadPoolExecutor
+import base64
+import json
+import logging
+import time
+
+from cryptography.hazmat.primitives import serialization
+from flask import current_app
+from py_vapid import Vapid
+import requests
+from pywebpush import webpush, WebPushException
+
+from models import db, Subscription, User
+
+logger = logging.getLogger(__name__)
+
+GONE_STATUS = (404, 410)
+RETRY_STATUS = (429, 500, 502, 503, 504)
+
+
+def _percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    index = min(int(len(sorted_values) * fraction), len(sorted_values) - 1)
+    return sorted_values[index]
+
+
+class PushDispatcher:
+    """Verschickt eine Nachricht an alle Subscriptions und liefert einen Bericht"""
+
+    def __init__(self, sender=None, max_workers=8, page_size=200, max_retries=3, backoff=0.5, ttl=3600):
+        self.sender = sender or webpush
+        self.max_workers = max_workers
+        self.page_size = page_size
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.ttl = ttl
+
+    @classmethod
+    def from_config(cls, config, **kwargs):
+        return cls(
+            max_workers=config['PUSH_MAX_WORKERS'],
+            page_size=config['PUSH_PAGE_SIZE'],
+            max_retries=config['PUSH_MAX_RETRIES'],
+            ttl=config['PUSH_TTL'],
+            **kwargs
+        )
+
+    def _send_one(self, subscription_id, subscription_info, data, vapid):
+        """Sendet an einen Endpunkt; liefert (id, Status, Latenz in Sekunden)"""
+        started = time.perf_counter()
+        for attempt in range(self.max_retries + 1):
+            # pywebpush trägt 'aud'/'exp' in die Claims ein, daher pro Versand kopieren
+            options = dict(vapid, vapid_claims=dict(vapid['vapid_claims']))
+            try:
+                response = self.sender(subscription_info=subscription_info, data=data,
+                                       timeout=10, ttl=self.ttl, **options)
+                status = getattr(response, 'status_code', 201)
+            except WebPushException as e:
+                status = e.response.status_code if e.response is not None else None
+            except requests.RequestException as e:
+                # Netzwerkfehler: erneut versuchen
+                logger.warning("Push an Subscription #%s fehlgeschlagen: %s", subscription_id, e)
+                status = None
+            except Exception as e:
+                logger.error("Push an Subscription #%s nicht möglich: %s", subscription_id, e)
+                break
+
+            if status is not None and status < 400:
+                return subscription_id, 'sent', time.perf_counter() - started
+            if status in GONE_STATUS:
+                return subscription_id, 'gone', time.perf_counter() - started
+            if status is not None and status not in RETRY_STATUS:
+                break
+            if attempt < self.max_retries:
+                time.sleep(self.backoff * (2 ** attempt))
+        return subscription_id, 'failed', time.perf_counter() - started
+
+    def _pages(self, room_id=None):
+        """Liest Subscriptions seitenweise (Keyset-Pagination über die ID)"""
+        last_id = 0
+        query = db.session.query(Subscription.id, Subscription.subscription_info)
+        if room_id is not None:
+            query = query.join(User, User.id == Subscription.user_id).filter(User.room_id == room_id)
+        while True:
+            rows = query.filter(
+                Subscription.id > last_id
+            ).order_by(Subscription.id).limit(self.page_size).all()
+            if not rows:
+                return
+            last_id = rows[-1].id
+            yield rows
+
+    def send_to_all(self, payload, vapid, room_id=None):
+        """Verschickt `payload` (dict) an alle Subscriptions, mit `room_id` nur an die eines Raums"""
+        data = json.dumps(payload)
+        latencies = []
+        report = {'sent': 0, 'failed': 0, 'pruned': 0}
+        started = time.perf_counter()
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            for rows in self._pages(room_id):
+                futures = []
+                for subscription_id, info in rows:
+                    try:
+                        subscription_info = json.loads(info)
+                    except ValueError:
+                        report['failed'] += 1
+                        continue
+                    futures.append(executor.submit(self._send_one, subscription_id, subscription_info, data, vapid))
+
+                gone = []
+                for future in futures:
+                    subscription_id, outcome, latency = future.result()
+                    latencies.append(latency)
+                    if outcome == 'sent':
+                        report['sent'] += 1
+                    elif outcome == 'gone':
+                        gone.append(subscription_id)
+                    else:
+                        report['failed'] += 1
+
+                if gone:
+                    Subscription.query.filter(Subscription.id.in_(gone)).delete(synchronize_session=False)
+                    db.session.commit()
+                    report['pruned'] += len(gone)
+
+        duration = time.perf_counter() - started
+        latencies.sort()
+        total = len(latencies)
+        report.update({
+            'duration_s': round(duration, 3),
+            'throughput_per_s': round(total / duration, 1) if duration > 0 else 0.0,
+            'latency_p50_ms': round(_percentile(latencies, 0.50) * 1000, 1),
+            'latency_p95_ms': round(_percentile(latencies, 0.95) * 1000, 1),
+            'latency_max_ms': round(latencies[-1] * 1000, 1) if latencies else 0.0,
+        })
+        logger.info(
+            "Push-Versand: %(sent)s gesendet, %(failed)s fehlgeschlagen, %(pruned)s entfernt "
+            "in %(duration_s)ss (%(throughput_per_s)s/s, p50 %(latency_p50_ms)sms, "
+            "p95 %(latency_p95_ms)sms)", dict(report)
+        )
+        return report
+
+
+def vapid_options(config):
+    """VAPID-Parameter für pywebpush oder None, wenn Push nicht konfiguriert ist"""
+    if not config.get('VAPID_PRIVATE_KEY'):
+        return None
+    return {
+        # Schlüssel einmal parsen statt bei jedem Versand
+        'vapid_private_key': Vapid.from_string(config['VAPID_PRIVATE_KEY']),
+        'vapid_claims': {'sub': f"mailto:{config['VAPID_CLAIMS_EMAIL']}"},
+    }
+
+
+def send_round_notifications(room_id, phase):
+    """Zu notify_time/dinner_time eines Raums: benachrichtigt dessen Subscriptions"""
+    vapid = vapid_options(current_app.config)
+    if vapid is None:
+        logger.info("Kein VAPID_PRIVATE_KEY gesetzt, überspringe Push-Benachrichtigungen")
+        return None
+
+    if phase == 'open':
+        payload = {'title': 'Wort Bingo', 'body': 'Die Runde ist offen! Wähle dein Wort für heute.'}
+    elif phase == 'voting':
+        payload = {'title': 'Wort Bingo', 'body': 'Abstimmung! Wurde dein Wort erwähnt?'}
+    else:
+        return None
+    return PushDispatcher.from_config(current_app.config).send_to_all(payload, vapid, room_id)
+
+
+def vapid_public_key(config):
+    """Öffentlicher Schlüssel (applicationServerKey) für den Browser"""
+    if config.get('VAPID_PUBLIC_KEY'):
+        return config['VAPID_PUBLIC_KEY']
+    if not config.get('VAPID_PRIVATE_KEY'):
+        return None
+    # Aus dem privaten Schlüssel ableiten, damit beide nie auseinanderlaufen
+    public_key = Vapid.from_string(config['VAPID_PRIVATE_KEY']).public_key
+    raw = public_key.public_bytes(serialization.Encoding.X962, serialization.PublicFormat.UncompressedPoint)
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def find_subscriptions(user_id, endpoint):
+    """Subscriptions eines Benutzers für einen Endpunkt"""
+    return [
+        s for s in Subscription.query.filter_by(user_id=user_id).all()
+        if json.loads(s.subscription_info).get('endpoint') == endpoint
+    ]
@@ -0,0 +1,84 @@
+"""Token-Bucket-Ratenbegrenzung für Logins
+
+Die Buckets liegen in einer eigenen kleinen SQLite-Datei im Instance-Ordner.
+So teilen sich alle Gunicorn-Worker denselben Zustand, ohne dass ein
+Brute-Force-Angriff die Hauptdatenbank mit Schreibzugriffen belastet.
+"""
+import os
+import sqlite3
+import threading
+import time
+
+
+class TokenBucketLimiter:
+    """Prozessübergreifender Token-Bucket (ein Token pro Versuch)"""
+
+    def __init__(self):
+        self.path = None
+        self.enabled = True
+        self._local = threading.local()
+
+    def init_app(self, app):
+        self.path = app.config['RATELIMIT_DB']
+        self.enabled = app.config['RATELIMIT_ENABLED']
+        app.extensions['ratelimit'] = self
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with sqlite3.connect(self.path) as conn:
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS bucket ('
+                ' key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL)'
+            )
+
+    def _connection(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.path != self.path:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn, self._local.path = conn, self.path
+        return conn
+
+    def consume(self, key, capacity, per_minute):
+        """Versucht ein Token zu entnehmen
+
+        Liefert (erlaubt, Sekunden bis zum nächsten Token).
+        """
+        if not self.enabled:
+            return True, 0
+        rate = per_minute / 60.0
+        now = time.time()
+        conn = self._connection()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            row = conn.execute('SELECT tokens, updated FROM bucket WHERE key = ?', (key,)).fetchone()
+            tokens = capacity if row is None else min(capacity, row[0] + (now - row[1]) * rate)
+            allowed = tokens >= 1
+            if allowed:
+                tokens -= 1
+            conn.execute(
+                'INSERT INTO bucket (key, tokens, updated) VALUES (?, ?, ?) '
+                'ON CONFLICT(key) DO UPDATE SET tokens = excluded.tokens, updated = excluded.updated',
+                (key, tokens, now)
+            )
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        retry_after = 0 if allowed else int((1 - tokens) / rate) + 1
+        return allowed, retry_after
+
+    def refund(self, key, capacity):
+        """Gibt ein Token zurück (z.B. nach erfolgreichem Login)"""
+        if not self.enabled:
+            return
+        self._connection().execute(
+            'UPDATE bucket SET tokens = MIN(?, tokens + 1) WHERE key = ?', (capacity, key))
+
+    def prune(self, max_idle_seconds=3600):
+        """Entfernt Buckets, die lange nicht benutzt wurden (wieder voll wären)"""
+        cursor = self._connection().execute(
+            'DELETE FROM bucket WHERE updated < ?', (time.time() - max_idle_seconds,))
+        return cursor.rowcount
+
+
+login_limiter = TokenBucketLimiter()
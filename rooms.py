@@ -0,0 +1,157 @@
+"""Räume: getrennte Spielgruppen in einer Instanz
+
+Jeder Benutzer gehört zu genau einem Raum. Ein Raum hat eigene Einstellungen
+(also eigene notify_time/dinner_time), eigene Runden, Cooldowns, Vorschläge
+und eine eigene Rangliste. Bestehende Daten gehören zum Standardraum
+(DEFAULT_ROOM_ID).
+
+Phasenwechsel aller Räume laufen über einen einzigen Job. Er hält einen
+Min-Heap (nächster Wechsel, Raum) und wird nur geweckt, wenn der früheste
+Wechsel fällig ist. Neu aufgebaut wird der Heap nur, wenn sich irgendwo
+Einstellungen geändert haben (Stempel `settings`).
+"""
+from datetime import timedelta
+import heapq
+import logging
+import re
+import threading
+
+from cache import get_stamp
+from clock import clock
+from models import db, DEFAULT_ROOM_ID, Room, Setting
+from push import send_round_notifications
+from round_cache import close_round
+from settings_service import settings_cache, parse_settings, DEFAULT_SETTINGS
+
+logger = logging.getLogger(__name__)
+
+SLUG_PATTERN = re.compile(r'^[a-z0-9][a-z0-9-]{0,49}$')
+# Einstellungen, die den Zeitplan bestimmen
+TIME_KEYS = ('notify_time', 'dinner_time')
+
+
+def ensure_room_settings(room_id):
+    """Legt fehlende Standardeinstellungen eines Raums an (ohne Commit)"""
+    existing_keys = {key for (key,) in db.session.query(Setting.key).filter(
+        Setting.room_id == room_id, Setting.key.in_(list(DEFAULT_SETTINGS)))}
+    for key, value in DEFAULT_SETTINGS.items():
+        if key not in existing_keys:
+            db.session.add(Setting(room_id=room_id, key=key, value=value))
+
+
+def ensure_default_room():
+    """Legt den Standardraum an, falls er fehlt (ohne Commit)"""
+    if db.session.get(Room, DEFAULT_ROOM_ID) is None:
+        db.session.add(Room(id=DEFAULT_ROOM_ID, slug='default', name='Standard'))
+        db.session.flush()
+        logger.info("Standardraum erstellt")
+
+
+def create_room(slug, name, settings=None):
+    """Legt einen Raum mit Standardeinstellungen an (plus `settings`) und committet
+
+    Wirft ValueError bei ungültigem oder bereits vergebenem Kürzel.
+    """
+    slug = slug.strip().lower()
+    if not SLUG_PATTERN.match(slug):
+        raise ValueError(f"Ungültiges Raumkürzel: {slug!r} (erlaubt: a-z, 0-9, -)")
+    if Room.query.filter_by(slug=slug).first() is not None:
+        raise ValueError(f"Raum '{slug}' existiert bereits")
+
+    room = Room(slug=slug, name=name.strip() or slug)
+    db.session.add(room)
+    db.session.flush()
+    for key, value in {**DEFAULT_SETTINGS, **(settings or {})}.items():
+        db.session.add(Setting(room_id=room.id, key=key, value=value))
+    db.session.commit()
+    settings_cache.invalidate(room.id)
+    logger.info("Raum erstellt: %s (#%s)", slug, room.id)
+    return room
+
+
+def find_room(slug):
+    """Raum zu einem Kürzel oder None"""
+    return Room.query.filter_by(slug=slug.strip().lower()).first()
+
+
+class RoomSchedule:
+    """Min-Heap der nächsten Phasenwechsel aller Räume
+
+    `next_due()` dient dem Scheduler als Trigger, `pop_due()` liefert im Job
+    die Räume, deren Wechsel erreicht ist, und plant deren nächsten ein.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._heap = []       # (nächster Phasenwechsel, room_id)
+        self._version = None  # Stempel `settings` beim letzten Aufbau
+        self._cursor = None   # bis hierhin sind alle Wechsel behandelt
+
+    def _sync(self, after):
+        version = get_stamp(settings_cache.STAMP_NAME).read()
+        if version == self._version:
+            return
+        if self._cursor is None:
+            self._cursor = after
+        # Zeiten aller Räume mit einer Abfrage statt einer pro Raum
+        raw = {}
+        for room_id, key, value in db.session.query(Setting.room_id, Setting.key, Setting.value).filter(
+                Setting.key.in_(TIME_KEYS)):
+            raw.setdefault(room_id, {})[key] = value
+        heap = []
+        for (room_id,) in db.session.query(Room.id):
+            game_settings = parse_settings(raw.get(room_id, {}))
+            heap.append((clock.next_transition(self._cursor, game_settings), room_id))
+        heapq.heapify(heap)
+        self._heap, self._version = heap, version
+
+    def next_due(self, after):
+        """Trigger: frühester Phasenwechsel irgendeines Raums nach `after`"""
+        with self._lock:
+            self._sync(after)
+            if not self._heap:
+                return after + timedelta(days=1)
+            return self._heap[0][0]
+
+    def pop_due(self, now):
+        """Räume mit erreichtem Phasenwechsel; ihr nächster Wechsel kommt zurück in den Heap"""
+        with self._lock:
+            self._sync(now)
+            due = set()
+            while self._heap and self._heap[0][0] <= now:
+                due.add(heapq.heappop(self._heap)[1])
+            for room_id in due:
+                heapq.heappush(self._heap,
+                               (clock.next_transition(now, settings_cache.get(room_id)), room_id))
+            self._cursor = now
+        return sorted(due)
+
+
+room_schedule = RoomSchedule()
+
+
+def run_room_transitions():
+    """Job zu jedem Phasenwechsel eines Raums: Runde schließen und Push verschicken
+
+    Erst werden alle fälligen Runden geschlossen, danach die Pushes
+    verschickt: Ein langsamer Push-Dienst verzögert so keinen anderen Raum.
+    """
+    rooms = room_schedule.pop_due(clock.now())
+    phases = {}
+    for room_id in rooms:
+        try:
+            state = clock.state(room_id)
+            if state.phase == 'voting':
+                close_round(room_id, state.day)
+            phases[room_id] = state.phase
+        except Exception as e:
+            # Ein fehlerhafter Raum hält die anderen nicht auf
+            db.session.rollback()
+            logger.error("Fehler beim Phasenwechsel in Raum %s: %s", room_id, e)
+    for room_id, phase in phases.items():
+        try:
+            send_round_notifications(room_id, phase)
+        except Exception as e:
+            db.session.rollback()
+            logger.error("Fehler beim Push-Versand in Raum %s: %s", room_id, e)
+    return rooms
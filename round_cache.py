@@ -0,0 +1,163 @@
+"""Gecachter Tages-Snapshot einer Runde (alle Wörter eines Raums und Tages)
+
+Zu dinner_time wird die Runde geschlossen: ein einziges UPDATE sperrt alle
+Wörter des Raums und Tages, danach wird der Stand als ClosedRound
+eingefroren. In der Abstimmungsphase kommen alle Lesezugriffe aus diesem
+unveränderlichen Stand.
+"""
+from collections import namedtuple
+from datetime import date, timedelta
+import json
+import logging
+import re
+import threading
+
+from sqlalchemy.exc import IntegrityError
+
+from cache import get_stamp, list_stamps, remove_stamps
+from clock import clock
+from models import db, User, WordLog, ClosedRound
+
+logger = logging.getLogger(__name__)
+
+ROUND_STAMP_PATTERN = re.compile(r'^round-\d+-(\d{4}-\d{2}-\d{2})$')
+
+RoundEntry = namedtuple('RoundEntry', ['user_id', 'username', 'word', 'changes_count'])
+
+
+class RoundSnapshot:
+    """Unveränderliche Sicht auf die Wörter eines Tages"""
+
+    def __init__(self, room_id, day, entries, closed=False):
+        self.room_id = room_id
+        self.day = day
+        self.entries = tuple(entries)
+        self.closed = closed
+        self._by_user = {e.user_id: e for e in self.entries}
+
+    def __iter__(self):
+        return iter(self.entries)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get(self, user_id):
+        """Liefert den Eintrag eines Benutzers oder None"""
+        return self._by_user.get(user_id)
+
+    def visible_to(self, user_id, phase):
+        """Blinde Einreichung: fremde Wörter erst nach eigener Einreichung oder beim Abstimmen"""
+        return user_id in self._by_user or phase == 'voting'
+
+
+def round_stamp(room_id, day):
+    """Versionsstempel der Runde eines Raums an einem Tag"""
+    return get_stamp(f'round-{room_id}-{day.isoformat()}')
+
+
+def prune_round_stamps(today=None):
+    """Löscht Rundenstempel von Tagen, die kein Cache mehr hält; gibt die Anzahl zurück"""
+    cutoff = (today or clock.today()) - timedelta(days=RoundCache.MAX_DAYS)
+    old = []
+    for name in list_stamps():
+        match = ROUND_STAMP_PATTERN.match(name)
+        if match and date.fromisoformat(match.group(1)) < cutoff:
+            old.append(name)
+    removed = remove_stamps(old)
+    if removed:
+        logger.info("%s alte Rundenstempel gelöscht", removed)
+    return removed
+
+
+def _load_live_entries(room_id, day):
+    rows = db.session.query(
+        WordLog.user_id, User.username, WordLog.word, WordLog.changes_count
+    ).join(User, User.id == WordLog.user_id).filter(
+        WordLog.room_id == room_id, WordLog.date == day
+    ).order_by(WordLog.id).all()
+    return [RoundEntry(*row) for row in rows]
+
+
+def load_round_snapshot(room_id, day):
+    """Baut den Snapshot: aus dem eingefrorenen Stand oder mit einer JOIN-Abfrage"""
+    closed = ClosedRound.query.filter_by(room_id=room_id, date=day).first()
+    if closed is not None:
+        return RoundSnapshot(room_id, day, (RoundEntry(*e) for e in json.loads(closed.entries)),
+                             closed=True)
+    return RoundSnapshot(room_id, day, _load_live_entries(room_id, day))
+
+
+class RoundCache:
+    """Hält Snapshots pro Raum und Datum und baut sie nur nach Änderungen neu"""
+
+    MAX_DAYS = 3
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = {}  # (room_id, Datum) -> (Version, RoundSnapshot)
+
+    def get(self, room_id, day):
+        """Liefert den Snapshot eines Raums für `day`"""
+        key = (room_id, day)
+        version = round_stamp(room_id, day).read()
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] == version:
+            return entry[1]
+
+        snapshot = load_round_snapshot(room_id, day)
+        with self._lock:
+            self._entries[key] = (version, snapshot)
+            # Alte Tage verwerfen, damit der Cache nicht wächst
+            days = sorted({cached_day for _, cached_day in self._entries})
+            for old_key in [k for k in self._entries if k[1] in days[:-self.MAX_DAYS]]:
+                del self._entries[old_key]
+        return snapshot
+
+    def voting_snapshot(self, room_id, day):
+        """Snapshot für die Abstimmungsphase; schließt die Runde, falls der Job sie verpasst hat
+
+        Kann committen oder zurückrollen (close_round), daher vor eigenen
+        Änderungen in der Session aufrufen.
+        """
+        snapshot = self.get(room_id, day)
+        if not snapshot.closed:
+            close_round(room_id, day)
+            snapshot = self.get(room_id, day)
+        return snapshot
+
+    def invalidate(self, room_id, day):
+        """Nach Änderungen an den WordLog-Zeilen eines Raums von `day` aufrufen (nach dem Commit)"""
+        round_stamp(room_id, day).bump()
+        with self._lock:
+            self._entries.pop((room_id, day), None)
+
+
+round_cache = RoundCache()
+
+
+def close_round(room_id, day):
+    """Sperrt alle Wörter eines Raums von `day` und friert den Stand ein (idempotent)
+
+    Liefert die Anzahl gesperrter Wörter oder None, wenn die Runde bereits
+    geschlossen war. Committet selbst; offene Änderungen des Aufrufers
+    würden mit committet oder beim verlorenen Wettlauf verworfen.
+    """
+    if db.session.query(ClosedRound.id).filter_by(room_id=room_id, date=day).first() is not None:
+        return None
+
+    locked = WordLog.query.filter(
+        WordLog.room_id == room_id, WordLog.date == day, WordLog.is_locked.isnot(True)
+    ).update({'is_locked': True}, synchronize_session=False)
+    entries = _load_live_entries(room_id, day)
+    db.session.add(ClosedRound(room_id=room_id, date=day,
+                               entries=json.dumps([list(e) for e in entries])))
+    try:
+        db.session.commit()
+    except IntegrityError:
+        # Ein anderer Worker war schneller
+        db.session.rollback()
+        return None
+
+    round_cache.invalidate(room_id, day)
+    logger.info("Runde %s in Raum %s geschlossen: %s Wörter gesperrt", day, room_id, locked)
+    return locked
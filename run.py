@@ -1,22 +1,22 @@
 from app import create_app
+from metrics import metrics
+from scheduler import scheduler
 import logging
 
-# Logging konfigurieren
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
+# Logging richtet create_app() ein (LOG_FORMAT=text für lesbare Ausgabe)
 logger = logging.getLogger(__name__)
 
 if __name__ == '__main__':
     try:
         app = create_app()
+        metrics.reset()
         logger.info("=" * 50)
         logger.info("Wort Bingo Server gestartet!")
         logger.info("Admin-Login: admin / admin123")
         logger.info("=" * 50)
+        scheduler.start()
         app.run(debug=True, host='0.0.0.0', port=5000)
     except Exception as e:
-        logger.error(f"Fehler beim Starten der Anwendung: {e}")
+        logger.error("Fehler beim Starten der Anwendung: %s", e)
         raise
 
@@ -0,0 +1,136 @@
+"""Kleiner Hintergrund-Scheduler für wiederkehrende Wartungsjobs
+
+Bei mehreren Gunicorn-Workern führt nur der Worker Jobs aus, der die
+Dateisperre `scheduler.lock` im Instance-Ordner hält. Stirbt er, übernimmt
+ein anderer Worker beim nächsten Versuch.
+"""
+from datetime import datetime, timedelta
+import logging
+import os
+import threading
+
+try:
+    import fcntl
+except ImportError:  # Windows: nur ein Prozess in der Entwicklung
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+
+def every(seconds):
+    """Trigger: alle `seconds` Sekunden"""
+    def trigger(now):
+        return now + timedelta(seconds=seconds)
+    return trigger
+
+
+def daily(*times):
+    """Trigger: täglich zu den angegebenen Uhrzeiten
+
+    Ein Eintrag darf auch eine Funktion sein, die zur Laufzeit eine Uhrzeit
+    liefert (z.B. aus den gecachten Einstellungen).
+    """
+    def trigger(now):
+        candidates = []
+        for at in times:
+            at = at() if callable(at) else at
+            run_at = datetime.combine(now.date(), at)
+            if run_at <= now:
+                run_at += timedelta(days=1)
+            candidates.append(run_at)
+        return min(candidates)
+    return trigger
+
+
+class Job:
+    def __init__(self, name, func, trigger):
+        self.name = name
+        self.func = func
+        self.trigger = trigger
+        self.last_run = None
+
+
+class Scheduler:
+    """Führt registrierte Jobs in einem Daemon-Thread im App-Kontext aus"""
+
+    TICK_SECONDS = 30
+
+    def __init__(self):
+        self.jobs = {}
+        self.app = None
+        self._thread = None
+        self._stop = threading.Event()
+        self._lock_file = None
+
+    def init_app(self, app):
+        self.app = app
+        app.extensions['scheduler'] = self
+
+    def add_job(self, name, func, trigger):
+        """Registriert `func` unter `name` mit einem Trigger (siehe every/daily)"""
+        self.jobs[name] = Job(name, func, trigger)
+
+    def run_job(self, name):
+        """Führt einen Job sofort aus (z.B. von der Kommandozeile)"""
+        job = self.jobs[name]
+        with self.app.app_context():
+            try:
+                return job.func()
+            except Exception as e:
+                logger.error("Fehler im Job %s: %s", name, e)
+                raise
+
+    def start(self):
+        """Startet den Scheduler-Thread (idempotent)"""
+        if self._thread is not None:
+            return
+        if os.environ.get('SCHEDULER_ENABLED', '1') != '1':
+            logger.info("Scheduler deaktiviert (SCHEDULER_ENABLED)")
+            return
+        self._thread = threading.Thread(target=self._run, name='bingo-scheduler', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _acquire_leadership(self):
+        if fcntl is None:
+            return True
+        if self._lock_file is not None:
+            return True
+        lock_path = os.path.join(self.app.instance_path, 'scheduler.lock')
+        lock_file = open(lock_path, 'a')
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.close()
+            return False
+        self._lock_file = lock_file
+        logger.info("Scheduler aktiv in Prozess %s", os.getpid())
+        return True
+
+    def _run(self):
+        while not self._stop.is_set():
+            if self._acquire_leadership():
+                # Trigger dürfen auf den App-Kontext zugreifen (z.B. Einstellungen)
+                with self.app.app_context():
+                    self._run_pending()
+            self._stop.wait(self.TICK_SECONDS)
+
+    def _run_pending(self):
+        now = datetime.now()
+        for job in list(self.jobs.values()):
+            if job.last_run is None:
+                job.last_run = now
+                continue
+            # Der nächste Lauf wird bei jedem Tick neu berechnet, damit
+            # geänderte Uhrzeiten aus den Einstellungen sofort gelten
+            if job.trigger(job.last_run) <= now:
+                job.last_run = now
+                try:
+                    self.run_job(job.name)
+                except Exception:
+                    pass  # bereits geloggt
+
+
+scheduler = Scheduler()
@@ -0,0 +1,112 @@
+"""Typisierter In-Process-Cache für die Setting-Tabelle, getrennt pro Raum"""
+from dataclasses import dataclass, field
+from datetime import datetime, time
+import logging
+import threading
+
+from cache import get_stamp
+from models import Setting
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SETTINGS = {
+    'notify_time': '12:00',
+    'dinner_time': '18:00',
+    'cooldown_days': '14',
+    'max_changes': '3'
+}
+
+
+@dataclass(frozen=True)
+class GameSettings:
+    """Geparste Spieleinstellungen (einmal pro Cache-Ladevorgang erzeugt)"""
+    notify_time: time
+    dinner_time: time
+    cooldown_days: int
+    max_changes: int
+    raw: dict = field(default_factory=dict)
+
+    def phase_at(self, now_time):
+        """Phase der Runde zur Uhrzeit `now_time`: 'waiting', 'open' oder 'voting'"""
+        if now_time >= self.dinner_time:
+            return 'voting'
+        if now_time >= self.notify_time:
+            return 'open'
+        return 'waiting'
+
+
+def _parse_time(key, value):
+    try:
+        return datetime.strptime(value, '%H:%M').time()
+    except (TypeError, ValueError):
+        logger.warning("Ungültiger Zeitwert für %s: %r, nutze Standardwert", key, value)
+        return datetime.strptime(DEFAULT_SETTINGS[key], '%H:%M').time()
+
+
+def _parse_int(key, value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        logger.warning("Ungültiger Zahlenwert für %s: %r, nutze Standardwert", key, value)
+        return int(DEFAULT_SETTINGS[key])
+
+
+def parse_settings(raw):
+    """Wandelt die rohen Setting-Werte in ein GameSettings-Objekt um"""
+    values = {**DEFAULT_SETTINGS, **raw}
+    return GameSettings(
+        notify_time=_parse_time('notify_time', values['notify_time']),
+        dinner_time=_parse_time('dinner_time', values['dinner_time']),
+        cooldown_days=_parse_int('cooldown_days', values['cooldown_days']),
+        max_changes=_parse_int('max_changes', values['max_changes']),
+        raw=values
+    )
+
+
+class SettingsCache:
+    """Lädt die Setting-Zeilen eines Raums einmal und liefert sie aus dem Speicher
+
+    Schreibzugriffe rufen `invalidate(room_id)` auf. Dadurch ändert sich der
+    Stempel `settings-<room_id>` und alle Worker laden diesen Raum beim
+    nächsten Zugriff neu. Der Stempel `settings` ändert sich bei jeder
+    Änderung in irgendeinem Raum (für den Zeitplan aller Räume, rooms.py).
+    """
+
+    STAMP_NAME = 'settings'
+
+    def __init__(self, app=None):
+        self._lock = threading.Lock()
+        self._entries = {}  # room_id -> (Version, GameSettings)
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.extensions['settings_cache'] = self
+
+    @staticmethod
+    def room_stamp(room_id):
+        return get_stamp(f'settings-{room_id}')
+
+    def get(self, room_id):
+        """Liefert die aktuellen Einstellungen eines Raums als GameSettings"""
+        version = self.room_stamp(room_id).read()
+        entry = self._entries.get(room_id)
+        if entry is not None and entry[0] == version:
+            return entry[1]
+
+        with self._lock:
+            entry = self._entries.get(room_id)
+            if entry is None or entry[0] != version:
+                raw = {s.key: s.value for s in Setting.query.filter_by(room_id=room_id)}
+                entry = self._entries[room_id] = (version, parse_settings(raw))
+            return entry[1]
+
+    def invalidate(self, room_id):
+        """Nach Änderungen an den Einstellungen eines Raums aufrufen (nach dem Commit)"""
+        self.room_stamp(room_id).bump()
+        get_stamp(self.STAMP_NAME).bump()
+        with self._lock:
+            self._entries.pop(room_id, None)
+
+
+settings_cache = SettingsCache()
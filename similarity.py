@@ -0,0 +1,226 @@
+"""Unscharfer Abgleich neuer Wörter mit Cooldown und heutigen Wörtern
+
+"pizza" und "pizzas" oder "spaghetti" und "spagetti" sollen als dasselbe Wort
+gelten. Jedes Wort wird dazu auf einen Schlüssel abgebildet (Kleinschreibung,
+Umlaute und Akzente ausgeschrieben, optional einfache Endungen entfernt). Zwei
+Wörter sind ähnlich, wenn ihre Schlüssel höchstens SIMILARITY_MAX_DISTANCE
+Levenshtein-Schritte auseinanderliegen. Kurze Schlüssel (unter
+SIMILARITY_MIN_LENGTH) müssen exakt übereinstimmen.
+
+Der Index enthält alle bisher eingereichten Wörter aller Räume: beim Start
+aus WordLog, danach aus dem Tages-Snapshot und den aktiven Cooldowns eines
+Raums, sobald sich deren Stempel ändern. So kommen auch Wörter an, die ein
+anderer Worker eingetragen oder geändert hat. Ob ein ähnliches Wort einen
+Konflikt auslöst, wird pro Raum entschieden.
+
+Gesucht wird über Löschvarianten: Für jeden Schlüssel werden alle Varianten
+mit bis zu d gelöschten Zeichen als Postings abgelegt. Zwei Schlüssel mit
+Abstand <= d teilen sich mindestens eine Variante, eine Suche braucht also
+nur Dictionary-Zugriffe und prüft wenige Kandidaten exakt nach.
+"""
+import logging
+import threading
+import time
+import unicodedata
+
+from cache import DATABASE_STAMP, get_stamp
+from cooldown_index import cooldown_index
+from models import db, WordLog, CooldownLog
+from round_cache import round_cache, round_stamp
+
+logger = logging.getLogger(__name__)
+
+UMLAUTS = str.maketrans({'ä': 'ae', 'ö': 'oe', 'ü': 'ue', 'ß': 'ss'})
+# Längste Endung zuerst; es bleiben immer mindestens MIN_STEM Zeichen übrig
+SUFFIXES = ('innen', 'chen', 'lein', 'ern', 'en', 'er', 'es', 'em', 'e', 'n', 's')
+MIN_STEM = 3
+
+
+def normalize(word):
+    """Kleinschreibung, Umlaute ausgeschrieben, Akzente entfernt, einfache Leerzeichen"""
+    word = word.lower().translate(UMLAUTS)
+    word = ''.join(c for c in unicodedata.normalize('NFKD', word) if not unicodedata.combining(c))
+    return ' '.join(word.split())
+
+
+def stem(word):
+    """Entfernt pro Teilwort eine typische Endung (Plural, Verkleinerung)"""
+    tokens = []
+    for token in word.split(' '):
+        for suffix in SUFFIXES:
+            if token.endswith(suffix) and len(token) - len(suffix) >= MIN_STEM:
+                token = token[:-len(suffix)]
+                break
+        tokens.append(token)
+    return ' '.join(tokens)
+
+
+def levenshtein(a, b, max_distance=None):
+    """Editierabstand; bricht ab, sobald er sicher über `max_distance` liegt"""
+    if a == b:
+        return 0
+    if len(a) < len(b):
+        a, b = b, a
+    if max_distance is not None and len(a) - len(b) > max_distance:
+        return max_distance + 1
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, start=1):
+        current = [i]
+        for j, char_b in enumerate(b, start=1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1,
+                               previous[j - 1] + (char_a != char_b)))
+        if max_distance is not None and min(current) > max_distance:
+            return max_distance + 1
+        previous = current
+    return previous[-1]
+
+
+def _deletes(key, distance):
+    """Der Schlüssel und alle Varianten mit bis zu `distance` gelöschten Zeichen"""
+    variants = {key}
+    frontier = {key}
+    for _ in range(distance):
+        frontier = {v[:i] + v[i + 1:] for v in frontier for i in range(len(v))}
+        variants |= frontier
+    return variants
+
+
+class SimilarityIndex:
+    """Alle bisherigen Wörter, abfragbar nach ähnlichen Schlüsseln"""
+
+    def __init__(self):
+        self.enabled = True
+        self.max_distance = 1
+        self.min_length = 5
+        self.stemming = True
+        self._lock = threading.Lock()
+        self._words = {}     # Schlüssel -> Menge der Originalwörter
+        self._postings = {}  # Löschvariante -> Menge der Schlüssel
+        self._known = set()  # alle Originalwörter
+        self._versions = {}  # Raum -> (Rundenstempel, Cooldown-Stempel) beim letzten Abgleich
+        self._database = None  # DATABASE_STAMP beim letzten Laden
+
+    def init_app(self, app):
+        self.enabled = app.config['SIMILARITY_ENABLED']
+        self.max_distance = min(max(app.config['SIMILARITY_MAX_DISTANCE'], 0), 2)
+        self.min_length = app.config['SIMILARITY_MIN_LENGTH']
+        self.stemming = app.config['SIMILARITY_STEMMING']
+        app.extensions['similarity'] = self
+
+    def key(self, word):
+        key = normalize(word)
+        return stem(key) if self.stemming else key
+
+    def _distance_for(self, key):
+        return self.max_distance if len(key) >= self.min_length else 0
+
+    def _add(self, word):
+        if word in self._known:
+            return
+        self._known.add(word)
+        key = self.key(word)
+        words = self._words.get(key)
+        if words is not None:
+            words.add(word)
+            return
+        self._words[key] = {word}
+        for variant in _deletes(key, self._distance_for(key)):
+            self._postings.setdefault(variant, set()).add(key)
+
+    def load(self, batch_size=5000):
+        """Baut den Index aus allen bisherigen Wörtern (beim Start)"""
+        if not self.enabled:
+            return
+        started = time.perf_counter()
+        database = get_stamp(DATABASE_STAMP).read()
+        with self._lock:
+            self._words, self._postings, self._known = {}, {}, set()
+            rows = db.session.query(WordLog.word).distinct()
+            for (word,) in rows.execution_options(yield_per=batch_size):
+                self._add(word)
+            # Cooldowns überleben die Archivierung ihrer WordLog-Zeilen
+            for (word,) in db.session.query(CooldownLog.word):
+                self._add(word)
+            self._versions, self._database = {}, database
+        logger.info("Ähnlichkeitsindex geladen: %s Schlüssel, %s Postings in %.2fs",
+                    len(self._words), len(self._postings), time.perf_counter() - started)
+
+    @staticmethod
+    def _stamps(room_id, day):
+        return (round_stamp(room_id, day).read(), cooldown_index.room_stamp(room_id).read())
+
+    def add(self, word, room_id=None, day=None):
+        """Nach dem Commit eines neuen Wortes aufrufen
+
+        Mit `room_id` und `day` (nach `round_cache.invalidate(room_id, day)`)
+        gilt der eigene neue Rundenstempel als bekannt, die nächste Prüfung
+        spart sich den Abgleich.
+        """
+        if not self.enabled:
+            return
+        with self._lock:
+            self._add(word)
+            version = self._versions.get(room_id)
+            if day is not None and version is not None:
+                self._versions[room_id] = (round_stamp(room_id, day).read(), version[1])
+
+    def _sync(self, room_id, today):
+        """Übernimmt neue Wörter aus Tages-Snapshot und Cooldowns (auch anderer Worker)"""
+        if get_stamp(DATABASE_STAMP).read() != self._database:
+            # Wiederherstellung: spätere Wörter gibt es nicht mehr
+            self.load()
+        version = self._stamps(room_id, today)
+        if version == self._versions.get(room_id):
+            return
+        words = ([entry.word for entry in round_cache.get(room_id, today)]
+                 + cooldown_index.words(room_id, today))
+        with self._lock:
+            for word in words:
+                self._add(word)
+            self._versions[room_id] = version
+
+    def similar(self, word):
+        """Alle bekannten Wörter (außer `word` selbst), die als gleich gelten"""
+        key = self.key(word)
+        distance = self._distance_for(key)
+        with self._lock:
+            candidates = set()
+            for variant in _deletes(key, distance):
+                candidates |= self._postings.get(variant, set())
+            matches = set()
+            for candidate in candidates:
+                # Kurze Schlüssel sind ohne Varianten indexiert, gilt also beidseitig
+                allowed = min(distance, self._distance_for(candidate))
+                if levenshtein(key, candidate, allowed) <= allowed:
+                    matches |= self._words[candidate]
+        matches.discard(word)
+        return matches
+
+    def find_conflict(self, room_id, word, today, user_id):
+        """Prüft `word` gegen ähnliche Cooldown- und heutige Wörter des Raums
+
+        Liefert None oder (Grund, ähnliches Wort, Ablaufdatum) mit Grund
+        'cooldown' oder 'today'. Das eigene heutige Wort zählt nicht. Eine
+        Abfrage fällt nur an, wenn es überhaupt ähnliche Wörter gibt.
+        """
+        if not self.enabled:
+            return None
+        self._sync(room_id, today)
+        matches = self.similar(word)
+        if not matches:
+            return None
+
+        owners = dict(db.session.query(WordLog.word, WordLog.user_id).filter(
+            WordLog.room_id == room_id, WordLog.date == today, WordLog.word.in_(matches)))
+        for match in sorted(matches):
+            if owners.get(match) == user_id:
+                continue
+            expiry = cooldown_index.lookup(room_id, match, today)
+            if expiry:
+                return 'cooldown', match, expiry
+            if match in owners:
+                return 'today', match, None
+        return None
+
+
+similarity_index = SimilarityIndex()
@@ -0,0 +1,63 @@
+// Live-Updates über Server-Sent Events (/events) statt kompletter Seiten-Reloads
+(function () {
+  if (!window.EventSource) return;
+
+  const me = Number(document.currentScript.dataset.userId);
+  const source = new EventSource('/events');
+
+  function updateParticipant(ev) {
+    const list = document.getElementById('participants');
+    if (!list) {
+      // Liste wird erst ab zwei Teilnehmern gerendert
+      if (ev.word) window.location.reload();
+      return;
+    }
+    const row = list.querySelector(`[data-user-id="${ev.user_id}"]`);
+    if (ev.kind === 'word_withdrawn') {
+      if (row) row.remove();
+      return;
+    }
+    if (!ev.word) return;
+    if (row) {
+      row.querySelector('.participant-word').textContent = `"${ev.word}"`;
+      return;
+    }
+    const template = list.querySelector('[data-user-id]');
+    if (!template) {
+      window.location.reload();
+      return;
+    }
+    const clone = template.cloneNode(true);
+    clone.dataset.userId = ev.user_id;
+    clone.querySelector('.participant-name').textContent = ev.username;
+    clone.querySelector('.participant-word').textContent = `"${ev.word}"`;
+    list.appendChild(clone);
+  }
+
+  function updatePoints(ev) {
+    const el = document.querySelector(`[data-points-user-id="${ev.user_id}"]`);
+    if (el) el.textContent = Number(el.textContent) + 1;
+  }
+
+  source.onmessage = (msg) => {
+    const ev = JSON.parse(msg.data);
+    switch (ev.kind) {
+      case 'phase':
+        window.location.reload();
+        break;
+      case 'word_submitted':
+      case 'word_withdrawn':
+        // Eigene Aktionen laden die Seite ohnehin über das Formular neu
+        if (ev.user_id !== me) updateParticipant(ev);
+        break;
+      case 'points_awarded':
+        updatePoints(ev);
+        break;
+    }
+  };
+
+  // Bei 503 (zu viele Streams) nicht endlos neu verbinden
+  source.onerror = () => {
+    if (source.readyState === EventSource.CLOSED) source.close();
+  };
+})();
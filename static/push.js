@@ -0,0 +1,58 @@
+// Push-Benachrichtigungen an-/abmelden (Profilseite)
+(function () {
+  const button = document.getElementById('push-toggle');
+  if (!button) return;
+  if (!('serviceWorker' in navigator) || !('PushManager' in window)) {
+    button.disabled = true;
+    button.querySelector('.push-label').textContent = 'Nicht unterstützt';
+    return;
+  }
+
+  function urlBase64ToUint8Array(base64String) {
+    const padding = '='.repeat((4 - base64String.length % 4) % 4);
+    const base64 = (base64String + padding).replace(/-/g, '+').replace(/_/g, '/');
+    return Uint8Array.from(atob(base64), c => c.charCodeAt(0));
+  }
+
+  function postJSON(url, body) {
+    return fetch(url, {
+      method: 'POST',
+      headers: { 'Content-Type': 'application/json' },
+      body: JSON.stringify(body)
+    });
+  }
+
+  function render(subscribed) {
+    button.dataset.subscribed = subscribed ? '1' : '';
+    button.querySelector('.push-label').textContent =
+      subscribed ? 'Benachrichtigungen deaktivieren' : 'Benachrichtigungen aktivieren';
+  }
+
+  const ready = navigator.serviceWorker.register('/sw.js')
+    .then(() => navigator.serviceWorker.ready);
+
+  ready.then(reg => reg.pushManager.getSubscription()).then(sub => render(!!sub));
+
+  button.addEventListener('click', async () => {
+    const reg = await ready;
+    const existing = await reg.pushManager.getSubscription();
+    if (existing) {
+      await postJSON('/api/push/unsubscribe', { endpoint: existing.endpoint });
+      await existing.unsubscribe();
+      render(false);
+      return;
+    }
+    const response = await fetch('/api/push/public_key');
+    if (!response.ok) {
+      button.querySelector('.push-label').textContent = 'Nicht verfügbar';
+      return;
+    }
+    const { public_key } = await response.json();
+    const sub = await reg.pushManager.subscribe({
+      userVisibleOnly: true,
+      applicationServerKey: urlBase64ToUint8Array(public_key)
+    });
+    await postJSON('/api/push/subscribe', sub.toJSON());
+    render(true);
+  });
+})();
@@ -0,0 +1,74 @@
+// Wortvorschläge beim Tippen (/api/v1/suggest), vergebene Wörter vor dem Absenden erkennen
+(function () {
+  const input = document.getElementById('bingo-word');
+  const list = document.getElementById('word-suggestions');
+  if (!input || !list || !window.fetch) return;
+
+  const DELAY_MS = 200;
+  const MIN_PREFIX = 2;
+  const LABELS = {
+    taken: 'heute vergeben',
+    mine: 'dein Wort',
+  };
+  let timer = null;
+  let controller = null;
+
+  function hide() {
+    list.hidden = true;
+    list.replaceChildren();
+  }
+
+  function render(suggestions) {
+    list.replaceChildren();
+    for (const s of suggestions) {
+      const button = document.createElement('button');
+      button.type = 'button';
+      button.className = 'md-suggestion';
+      button.textContent = s.word;
+      if (s.status === 'cooldown') {
+        button.disabled = true;
+        button.title = `Cooldown bis zum ${s.cooldown_until}`;
+      } else if (s.status === 'taken') {
+        button.disabled = true;
+        button.title = LABELS.taken;
+      } else if (s.status === 'mine') {
+        button.title = LABELS.mine;
+      }
+      button.addEventListener('click', () => {
+        input.value = s.word;
+        hide();
+        input.focus();
+      });
+      list.appendChild(button);
+    }
+    list.hidden = suggestions.length === 0;
+  }
+
+  function load(prefix) {
+    if (controller) controller.abort();
+    controller = new AbortController();
+    fetch(`/api/v1/suggest?prefix=${encodeURIComponent(prefix)}`, {
+      credentials: 'same-origin',
+      signal: controller.signal,
+    })
+      .then(response => (response.ok ? response.json() : null))
+      .then(data => {
+        // Veraltete Antworten (Eingabe inzwischen anders) ignorieren
+        if (data && input.value.trim().toLowerCase() === data.prefix.trim().toLowerCase()) {
+          render(data.suggestions);
+        }
+      })
+      .catch(() => {});  // abgebrochen oder offline: Formular funktioniert auch ohne
+  }
+
+  input.addEventListener('input', () => {
+    clearTimeout(timer);
+    const prefix = input.value.trim();
+    if (prefix.length < MIN_PREFIX) {
+      if (controller) controller.abort();
+      hide();
+      return;
+    }
+    timer = setTimeout(() => load(prefix), DELAY_MS);
+  });
+})();
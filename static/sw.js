@@ -1,21 +1,10 @@
-const CACHE_NAME = 'bingo-cache-v1';
-const urlsToCache = [
-  '/',
-  '/login',
-  '/static/manifest.json',
-  '/static/icons/icon-512.png'
-];
+// Veralteter Service Worker (Scope /static/): räumt seinen Cache auf und
+// meldet sich ab. Der aktuelle Service Worker liegt unter /sw.js.
+self.addEventListener('install', () => self.skipWaiting());
 
-self.addEventListener('install', event => {
+self.addEventListener('activate', event => {
   event.waitUntil(
-    caches.open(CACHE_NAME)
-      .then(cache => cache.addAll(urlsToCache))
-  );
-});
-
-self.addEventListener('fetch', event => {
-  event.respondWith(
-    caches.match(event.request)
-      .then(response => response || fetch(event.request))
+    caches.delete('bingo-cache-v1')
+      .then(() => self.registration.unregister())
   );
 });
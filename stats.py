@@ -0,0 +1,235 @@
+"""Statistik-Rollups für Spieler und Wörter
+
+WordLog wächst um eine Zeile pro Spieler und Tag. Statistiken werden deshalb
+nicht aus WordLog berechnet, sondern aus zwei kleinen Rollup-Tabellen
+(UserStats, WordStats) gelesen. Fortgeschrieben werden sie einmal pro Runde,
+sobald deren Abstimmung vorbei ist (ab dem Folgetag). Wie weit die Rollups
+reichen, steht in der Einstellung `_stats_rollup_date` des Standardraums; sie
+gilt für alle Räume, da überall um Mitternacht abgestimmt ist. WordStats
+zählt pro Raum, UserStats pro Benutzer (der zu genau einem Raum gehört).
+
+Laufen die Rollups auseinander, berechnet `flask stats rebuild` sie in
+Batches neu aus dem Archiv (archive.py) und WordLog.
+"""
+from collections import Counter
+from datetime import date
+import heapq
+import itertools
+import json
+import logging
+
+from cache import get_stamp
+from clock import clock
+from models import (db, DEFAULT_ROOM_ID, User, WordLog, Vote, ClosedRound, Setting,
+                    UserStats, WordStats)
+import archive
+
+logger = logging.getLogger(__name__)
+
+CURSOR_KEY = '_stats_rollup_date'
+STAMP_NAME = 'stats'
+
+
+def rolled_up_through():
+    """Letzter Tag, der in den Rollups enthalten ist (oder None)"""
+    setting = Setting.query.filter_by(room_id=DEFAULT_ROOM_ID, key=CURSOR_KEY).first()
+    return date.fromisoformat(setting.value) if setting else None
+
+
+def _set_cursor(day):
+    setting = Setting.query.filter_by(room_id=DEFAULT_ROOM_ID, key=CURSOR_KEY).first()
+    if setting:
+        setting.value = day.isoformat()
+    else:
+        db.session.add(Setting(room_id=DEFAULT_ROOM_ID, key=CURSOR_KEY, value=day.isoformat()))
+
+
+def _round_entries(room_id, day):
+    """(user_id, word) aller Teilnehmer; bevorzugt aus dem eingefrorenen Stand"""
+    closed = ClosedRound.query.filter_by(room_id=room_id, date=day).first()
+    if closed is not None:
+        return [(entry[0], entry[2]) for entry in json.loads(closed.entries)]
+    return db.session.query(WordLog.user_id, WordLog.word).filter(
+        WordLog.room_id == room_id, WordLog.date == day).all()
+
+
+def _votes_by_target(room_id, day):
+    return dict(db.session.query(Vote.target_id, db.func.count(Vote.id)).filter(
+        Vote.room_id == room_id, Vote.date == day).group_by(Vote.target_id).all())
+
+
+def apply_round(room_id, day, entries, votes):
+    """Schreibt eine Runde in die Rollups (ohne Commit)
+
+    `entries` sind (user_id, word)-Paare, `votes` bildet user_id auf die
+    Anzahl erhaltener Stimmen ab. Runden müssen in Datumsreihenfolge kommen,
+    sonst stimmen die Serien nicht.
+    """
+    entries = list(entries)
+    if not entries:
+        return
+    user_ids = [user_id for user_id, _ in entries]
+    words = list({word for _, word in entries})
+    users = {s.user_id: s for s in UserStats.query.filter(UserStats.user_id.in_(user_ids))}
+    word_stats = {s.word: s for s in WordStats.query.filter(
+        WordStats.room_id == room_id, WordStats.word.in_(words))}
+
+    for user_id, word in entries:
+        received = votes.get(user_id, 0)
+        won = received > 0
+
+        user = users.get(user_id)
+        if user is None:
+            user = users[user_id] = UserStats(user_id=user_id, rounds_played=0, wins=0,
+                                              votes_received=0, current_streak=0, best_streak=0)
+            db.session.add(user)
+        user.rounds_played += 1
+        user.votes_received += received
+        user.last_played = day
+        if won:
+            user.wins += 1
+            # Serie: aufeinanderfolgende gespielte Runden mit Stimme
+            user.current_streak += 1
+            user.best_streak = max(user.best_streak, user.current_streak)
+        else:
+            user.current_streak = 0
+
+        stats = word_stats.get(word)
+        if stats is None:
+            stats = word_stats[word] = WordStats(room_id=room_id, word=word, times_used=0,
+                                                 times_won=0, votes=0, first_used=day)
+            db.session.add(stats)
+        stats.times_used += 1
+        stats.votes += received
+        stats.last_used = day
+        if won:
+            stats.times_won += 1
+
+
+def rollup_pending(today=None):
+    """Job: schreibt alle abgeschlossenen, noch fehlenden Runden fort
+
+    Eine Runde gilt ab dem Folgetag als abgeschlossen (bis Mitternacht wird
+    abgestimmt). Liefert die Anzahl verarbeiteter Tage.
+    """
+    today = today or clock.today()
+    cursor = rolled_up_through()
+    query = db.session.query(WordLog.date, WordLog.room_id).filter(WordLog.date < today)
+    if cursor is not None:
+        query = query.filter(WordLog.date > cursor)
+    rounds = query.distinct().order_by(WordLog.date, WordLog.room_id).all()
+
+    days = []
+    for day, group in itertools.groupby(rounds, key=lambda row: row[0]):
+        for _, room_id in group:
+            apply_round(room_id, day, _round_entries(room_id, day), _votes_by_target(room_id, day))
+        _set_cursor(day)
+        db.session.commit()
+        days.append(day)
+
+    if days:
+        get_stamp(STAMP_NAME).bump()
+        logger.info("Statistik fortgeschrieben: %s Runde(n) bis %s", len(days), days[-1])
+    return len(days)
+
+
+def _archived_votes(month):
+    """Stimmen einer Archiv-Partition: (Datum, Raum) -> {vote_id: target_id}"""
+    votes = {}
+    for record in archive.iter_rows('vote', month):
+        # Archive von vor den Räumen haben kein room_id
+        key = record['date'], record.get('room_id', DEFAULT_ROOM_ID)
+        votes.setdefault(key, {})[record['id']] = record['target_id']
+    return votes
+
+
+def _history_rows(today, batch_size):
+    """(date, room_id, id, user_id, word) aus Archiv und WordLog, nach Datum sortiert"""
+    def archived():
+        for record in archive.iter_rows('word_log'):
+            yield (record['date'], record.get('room_id', DEFAULT_ROOM_ID), record['id'],
+                   record['user_id'], record['word'])
+
+    live = db.session.query(WordLog.date, WordLog.room_id, WordLog.id, WordLog.user_id,
+                            WordLog.word).filter(WordLog.date < today).order_by(
+        WordLog.date, WordLog.id).execution_options(yield_per=batch_size)
+    return heapq.merge(archived(), (tuple(row) for row in live))
+
+
+def rebuild_stats(batch_size=1000, today=None):
+    """Verwirft die Rollups und berechnet sie gestreamt aus Archiv und WordLog neu"""
+    today = today or clock.today()
+    UserStats.query.delete()
+    WordStats.query.delete()
+    Setting.query.filter_by(room_id=DEFAULT_ROOM_ID, key=CURSOR_KEY).delete()
+
+    # yield_per hält einen Cursor offen, ein Commit zwischendurch würde ihn
+    # schließen. Zwischenstände werden daher nur geflusht, committet wird am Ende.
+    days = 0
+    last_day = None
+    pending = 0
+    archived_votes = {}
+    for day, group in itertools.groupby(_history_rows(today, batch_size), key=lambda row: row[0]):
+        rooms = {}
+        for _, room_id, row_id, user_id, word in group:
+            # Duplikate aus einem Archiv-Absturz fallen weg
+            rooms.setdefault(room_id, {})[row_id] = (user_id, word)
+
+        month = day.strftime('%Y-%m')
+        if month not in archived_votes:
+            archived_votes = {month: _archived_votes(month)}
+        for room_id in sorted(rooms):
+            entries = rooms[room_id]
+            # Über die id zusammenführen, damit ein halb archivierter Tag nicht doppelt zählt
+            vote_targets = dict(archived_votes[month].get((day, room_id), {}))
+            vote_targets.update(db.session.query(Vote.id, Vote.target_id).filter(
+                Vote.room_id == room_id, Vote.date == day).all())
+            apply_round(room_id, day, entries.values(), Counter(vote_targets.values()))
+            pending += len(entries)
+        days += 1
+        last_day = day
+        if pending >= batch_size:
+            db.session.flush()
+            pending = 0
+
+    if last_day is not None:
+        _set_cursor(last_day)
+    db.session.commit()
+    get_stamp(STAMP_NAME).bump()
+    logger.info("Statistik neu berechnet: %s Runde(n)", days)
+    return days
+
+
+def stats_overview(room_id, user_id, limit=10):
+    """Alles für Statistikseite und API eines Raums, nur aus den Rollups gelesen"""
+    players = db.session.query(UserStats, User.username).join(User, User.id == UserStats.user_id)
+    mine = players.filter(UserStats.user_id == user_id).first()
+    top_players = players.filter(User.room_id == room_id).order_by(
+        UserStats.wins.desc(), UserStats.rounds_played.desc()).limit(limit).all()
+    top_words = WordStats.query.filter(WordStats.room_id == room_id).order_by(
+        WordStats.times_used.desc(), WordStats.word).limit(limit).all()
+
+    def player(stats, username):
+        return {
+            'user_id': stats.user_id,
+            'username': username,
+            'rounds_played': stats.rounds_played,
+            'wins': stats.wins,
+            'win_rate': round(stats.win_rate, 3),
+            'votes_received': stats.votes_received,
+            'current_streak': stats.current_streak,
+            'best_streak': stats.best_streak,
+            'last_played': stats.last_played.isoformat() if stats.last_played else None,
+        }
+
+    return {
+        'me': player(*mine) if mine else None,
+        'top_players': [player(stats, username) for stats, username in top_players],
+        'top_words': [{
+            'word': w.word,
+            'times_used': w.times_used,
+            'times_won': w.times_won,
+            'votes': w.votes,
+            'last_used': w.last_used.isoformat() if w.last_used else None,
+        } for w in top_words],
+    }
@@ -0,0 +1,278 @@
+"""Wortvorschläge für das Eingabefeld (/api/v1/suggest)
+
+Alle bisher gespielten Wörter liegen mit ihrer Häufigkeit in einem
+Präfixbaum. Jeder Knoten kennt die häufigsten Wörter darunter, eine Anfrage
+ist also ein Abstieg über die Buchstaben des Präfixes. Damit der Baum klein
+bleibt, ist er ein Burst-Trie: Ein Blatt hält bis zu BUCKET_SIZE Wörter direkt
+und wird erst bei mehr Wörtern nach dem nächsten Buchstaben aufgeteilt.
+
+Jeder Raum hat seinen eigenen Baum. Geladen wird beim Start für alle Räume
+(ein Raum, den der Worker noch nicht kennt, beim ersten Zugriff), aus den
+Rollups (WordStats) und den noch nicht fortgeschriebenen WordLog-Zeilen vor
+heute. Die heutigen Wörter stehen nicht im Baum, sondern getrennt daneben
+(aus dem Tages-Snapshot, neu gelesen bei jeder Änderung des Rundenstempels).
+Wegen der blinden Einreichung werden sie nur mit `show_today` eingemischt,
+also für Spieler, die die Wörter der Runde auch im Dashboard sehen. Beim
+Tageswechsel wandert der letzte Stand von gestern in den Baum.
+"""
+from collections import Counter
+import heapq
+import logging
+import threading
+import time
+
+from cache import DATABASE_STAMP, get_stamp
+from cooldown_index import cooldown_index
+from models import db, WordLog, WordStats
+from round_cache import round_cache, round_stamp
+import stats
+
+logger = logging.getLogger(__name__)
+
+BUCKET_SIZE = 32
+
+
+def _rank(item):
+    word, count = item
+    return -count, word
+
+
+class _Node:
+    __slots__ = ('children', 'words', 'best')
+
+    def __init__(self):
+        self.children = None  # None: Blatt, sonst Buchstabe -> _Node
+        self.words = {}       # Blatt: alle Wörter darunter, sonst nur das Wort dieses Präfixes
+        self.best = []        # häufigste (Wort, Anzahl) darunter
+
+
+class WordTrie:
+    """Präfixbaum Wort -> Häufigkeit mit den `top` häufigsten Wörtern je Knoten"""
+
+    def __init__(self, top=8):
+        self.top = top
+        self.root = _Node()
+        self.size = 0
+
+    def _refresh(self, node):
+        candidates = list(node.words.items())
+        if node.children:
+            for child in node.children.values():
+                candidates.extend(child.best)
+        node.best = heapq.nsmallest(self.top, candidates, key=_rank)
+
+    def _promote(self, node, word, count):
+        """Nach einer Erhöhung: nur `word` kann neu in die Bestenliste kommen"""
+        best = [item for item in node.best if item[0] != word]
+        if len(best) < self.top or _rank((word, count)) < _rank(best[-1]):
+            best.append((word, count))
+            best.sort(key=_rank)
+            del best[self.top:]
+        node.best = best
+
+    def _split(self, node, depth):
+        """Teilt ein übervolles Blatt nach dem Buchstaben an Position `depth`"""
+        words, node.words, node.children = node.words, {}, {}
+        for word, count in words.items():
+            if len(word) == depth:
+                node.words[word] = count
+            else:
+                node.children.setdefault(word[depth], _Node()).words[word] = count
+        for child in node.children.values():
+            if len(child.words) > BUCKET_SIZE:
+                self._split(child, depth + 1)
+            else:
+                self._refresh(child)
+        self._refresh(node)
+
+    def update(self, word, delta):
+        """Ändert die Häufigkeit von `word`; bei 0 fällt das Wort heraus"""
+        node, depth, path = self.root, 0, [self.root]
+        while node.children is not None and depth < len(word):
+            node = node.children.setdefault(word[depth], _Node())
+            depth += 1
+            path.append(node)
+
+        count = node.words.get(word, 0) + delta
+        if count > 0:
+            self.size += word not in node.words
+            node.words[word] = count
+        elif word in node.words:
+            self.size -= 1
+            del node.words[word]
+
+        if node.children is None and len(node.words) > BUCKET_SIZE:
+            self._split(node, depth)
+            path.pop()
+        for node in reversed(path):
+            if delta > 0:
+                self._promote(node, word, count)
+            else:
+                self._refresh(node)
+
+    def build(self, counts):
+        """Baut den Baum auf einmal aus {Wort: Anzahl}"""
+        self.root = _Node()
+        self.root.words = {word: count for word, count in counts.items() if count > 0}
+        self.size = len(self.root.words)
+        if self.size > BUCKET_SIZE:
+            self._split(self.root, 0)
+        else:
+            self._refresh(self.root)
+
+    def complete(self, prefix, limit=None):
+        """Die häufigsten Wörter mit `prefix` als [(Wort, Anzahl)]"""
+        limit = min(limit or self.top, self.top)
+        node, depth = self.root, 0
+        while node.children is not None and depth < len(prefix):
+            node = node.children.get(prefix[depth])
+            if node is None:
+                return []
+            depth += 1
+        if depth < len(prefix):
+            # Blatt oberhalb des Präfixes: seine Wörter direkt filtern
+            matches = [item for item in node.words.items() if item[0].startswith(prefix)]
+            return heapq.nsmallest(limit, matches, key=_rank)
+        return node.best[:limit]
+
+    def count(self, word):
+        """Häufigkeit von `word` (0, wenn es nicht im Baum steht)"""
+        node, depth = self.root, 0
+        while node.children is not None and depth < len(word):
+            node = node.children.get(word[depth])
+            if node is None:
+                return 0
+            depth += 1
+        return node.words.get(word, 0)
+
+
+class _RoomSuggestions:
+    def __init__(self, trie, day):
+        self.trie = trie
+        self.day = day
+        self.today = Counter()  # heutige Wörter (nicht im Baum)
+        self.version = None     # Rundenstempel beim letzten Abgleich
+
+
+class SuggestIndex:
+    """Wortvorschläge aus dem Präfixbaum eines Raums, mit Status für heute"""
+
+    def __init__(self):
+        self.limit = 8
+        self.min_prefix = 2
+        self._lock = threading.Lock()
+        self._rooms = {}  # room_id -> _RoomSuggestions
+        self._database = None  # DATABASE_STAMP beim Laden aller Räume
+
+    def init_app(self, app):
+        self.limit = max(app.config['SUGGEST_LIMIT'], 1)
+        self.min_prefix = max(app.config['SUGGEST_MIN_PREFIX'], 1)
+        self._rooms = {}
+        app.extensions['suggest'] = self
+
+    @staticmethod
+    def _history(today, room_id, batch_size):
+        """(Raum, Wort, Anzahl) aus Rollups und WordLog vor `today`"""
+        rollups = db.session.query(WordStats.room_id, WordStats.word, WordStats.times_used)
+        # Runden, die noch nicht in den Rollups stehen
+        pending = db.session.query(WordLog.room_id, WordLog.word).filter(WordLog.date < today)
+        cursor = stats.rolled_up_through()
+        if cursor is not None:
+            pending = pending.filter(WordLog.date > cursor)
+        if room_id is not None:
+            rollups = rollups.filter(WordStats.room_id == room_id)
+            pending = pending.filter(WordLog.room_id == room_id)
+        yield from rollups
+        for row_room_id, word in pending.execution_options(yield_per=batch_size):
+            yield row_room_id, word, 1
+
+    def load(self, today, room_id=None, batch_size=5000):
+        """Baut die Bäume aller Räume (beim Start) oder eines Raums aus allen Runden vor `today`"""
+        started = time.perf_counter()
+        database = get_stamp(DATABASE_STAMP).read()
+        counts = {}
+        if room_id is not None:
+            counts[room_id] = Counter()
+        for row_room_id, word, count in self._history(today, room_id, batch_size):
+            counts.setdefault(row_room_id, Counter())[word] += count
+
+        rooms = {}
+        for row_room_id, room_counts in counts.items():
+            trie = WordTrie(self.limit)
+            trie.build(room_counts)
+            rooms[row_room_id] = _RoomSuggestions(trie, today)
+        with self._lock:
+            if room_id is None:
+                self._rooms, self._database = rooms, database
+            else:
+                self._rooms.update(rooms)
+        logger.info("Vorschlagsindex geladen: %s Wörter in %s Raum/Räumen in %.2fs",
+                    sum(r.trie.size for r in rooms.values()), len(rooms),
+                    time.perf_counter() - started)
+
+    def refresh(self, room_id, today):
+        """Gleicht die heutigen Wörter eines Raums ab; liefert eine Version für das ETag"""
+        database = get_stamp(DATABASE_STAMP).read()
+        if database != self._database:
+            # Wiederherstellung: alle Räume beim nächsten Zugriff neu laden
+            with self._lock:
+                self._rooms, self._database = {}, database
+        if room_id not in self._rooms:
+            self.load(today, room_id)
+        with self._lock:
+            room = self._rooms[room_id]
+            if today != room.day:
+                # Tageswechsel: der letzte Stand von gestern kommt in den Baum
+                for word, count in Counter(entry.word for entry in round_cache.get(room_id, room.day)).items():
+                    room.trie.update(word, count)
+                room.day, room.today, room.version = today, Counter(), None
+            version = round_stamp(room_id, today).read()
+            if version != room.version:
+                room.today = Counter(entry.word for entry in round_cache.get(room_id, today))
+                room.version = version
+            return f'{today}:{version}:{room.trie.size}'
+
+    def suggest(self, room_id, prefix, today, user_id, limit=None, show_today=False):
+        """Vorschläge für `prefix` mit Status: frei, cooldown, vergeben oder eigenes Wort
+
+        Ohne `show_today` bleiben die heutigen Wörter außen vor: weder als
+        Vorschlag noch als Status 'taken'/'mine'.
+        """
+        prefix = ' '.join(prefix.lower().split())
+        if len(prefix) < self.min_prefix:
+            return []
+        limit = min(limit or self.limit, self.limit)
+        self.refresh(room_id, today)
+        with self._lock:
+            room = self._rooms[room_id]
+            matches = room.trie.complete(prefix, limit)
+            if show_today:
+                # Wörter außerhalb der Top-Liste des Baums können nur durch heute aufsteigen
+                merged = dict(matches)
+                for word, count in room.today.items():
+                    if word.startswith(prefix):
+                        merged[word] = room.trie.count(word) + count
+                matches = heapq.nsmallest(limit, merged.items(), key=_rank)
+
+        owners = {}
+        if show_today:
+            owners = {entry.word: entry.user_id for entry in round_cache.get(room_id, today)}
+        suggestions = []
+        for word, count in matches:
+            expiry = cooldown_index.lookup(room_id, word, today)
+            if word in owners:
+                status = 'mine' if owners[word] == user_id else 'taken'
+            elif expiry:
+                status = 'cooldown'
+            else:
+                status = 'free'
+            suggestions.append({
+                'word': word,
+                'count': count,
+                'status': status,
+                'cooldown_until': expiry.isoformat() if expiry else None,
+            })
+        return suggestions
+
+
+suggest_index = SuggestIndex()
@@ -0,0 +1,99 @@
+// Wird von /sw.js gerendert (siehe assets.py) - nicht direkt ausliefern
+const VERSION = {{ version|tojson }};
+const PRECACHE = 'bingo-precache-' + VERSION;
+const PAGES = 'bingo-pages';
+const API = 'bingo-api';
+const PRECACHE_URLS = {{ precache|tojson }};
+
+self.addEventListener('install', event => {
+  event.waitUntil(
+    caches.open(PRECACHE)
+      .then(cache => cache.addAll(PRECACHE_URLS))
+      .then(() => self.skipWaiting())
+  );
+});
+
+self.addEventListener('activate', event => {
+  // Alte Precaches (und den Cache des alten /static/sw.js) aufräumen
+  const keep = [PRECACHE, PAGES, API];
+  event.waitUntil(
+    caches.keys()
+      .then(names => Promise.all(
+        names.filter(name => !keep.includes(name)).map(name => caches.delete(name))
+      ))
+      .then(() => self.clients.claim())
+  );
+});
+
+// Gehashte Assets ändern sich nie: Cache zuerst
+function cacheFirst(request) {
+  return caches.match(request).then(cached => cached || fetch(request).then(response => {
+    if (response.ok) {
+      const copy = response.clone();
+      caches.open(PRECACHE).then(cache => cache.put(request, copy));
+    }
+    return response;
+  }));
+}
+
+// HTML: immer frisch vom Server, Cache nur als Offline-Fallback
+function networkFirst(request) {
+  return fetch(request).then(response => {
+    if (response.ok && !response.redirected) {
+      const copy = response.clone();
+      caches.open(PAGES).then(cache => cache.put(request, copy));
+    }
+    return response;
+  }).catch(() => caches.match(request, { cacheName: PAGES })
+    .then(cached => cached || Response.error()));
+}
+
+// API-Daten: sofort aus dem Cache, im Hintergrund per ETag aktualisieren
+function staleWhileRevalidate(event) {
+  const request = event.request;
+  const update = caches.open(API).then(cache => fetch(request).then(response => {
+    if (response.ok) cache.put(request, response.clone());
+    return response;
+  }));
+  event.waitUntil(update.catch(() => undefined));
+  return caches.match(request, { cacheName: API })
+    .then(cached => cached || update);
+}
+
+self.addEventListener('fetch', event => {
+  const request = event.request;
+  const url = new URL(request.url);
+  if (request.method !== 'GET' || url.origin !== self.location.origin) return;
+
+  if (url.pathname === '/logout') {
+    // Persönliche Seiten und Daten nicht für den nächsten Benutzer liegen lassen
+    event.waitUntil(Promise.all([caches.delete(PAGES), caches.delete(API)]));
+    return;
+  }
+  if (url.pathname.startsWith('/assets/')) {
+    event.respondWith(cacheFirst(request));
+  } else if (url.pathname === '/api/v1/suggest') {
+    // Vorschläge tragen den Status von jetzt, nicht aus dem Cache liefern
+    return;
+  } else if (url.pathname.startsWith('/api/v1/')) {
+    event.respondWith(staleWhileRevalidate(event));
+  } else if (request.mode === 'navigate') {
+    event.respondWith(networkFirst(request));
+  }
+  // Alles andere (z.B. /events) geht unverändert ans Netz
+});
+
+self.addEventListener('push', event => {
+  const data = event.data ? event.data.json() : {};
+  event.waitUntil(
+    self.registration.showNotification(data.title || 'Wort Bingo', {
+      body: data.body || '',
+      icon: {{ icon|tojson }}
+    })
+  );
+});
+
+self.addEventListener('notificationclick', event => {
+  event.notification.close();
+  event.waitUntil(clients.openWindow('/dashboard'));
+});
@@ -0,0 +1,73 @@
+"""Gemeinsame Fixtures: frische App mit eigener SQLite-Datei pro Test
+
+Die Module liegen flach im Projektordner, daher kommt dieser auf den Pfad.
+"""
+from datetime import datetime
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+PASSWORD = 'geheim123'
+
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    for key, value in {
+        'DATABASE_URL': f"sqlite:///{tmp_path / 'test.db'}",
+        'CACHE_STAMP_DIR': str(tmp_path / 'stamps'),
+        'RATELIMIT_DB': str(tmp_path / 'ratelimit.db'),
+        'METRICS_DB': str(tmp_path / 'metrics.db'),
+        'ASSET_BUILD_DIR': str(tmp_path / 'assets'),
+        'BACKUP_DIR': str(tmp_path / 'backups'),
+        'SCHEDULER_ENABLED': '0',
+        'RATELIMIT_ENABLED': '0',
+        'PASSWORD_HASH_METHOD': 'pbkdf2:sha256:1',
+        'USERS': '',
+    }.items():
+        monkeypatch.setenv(key, value)
+
+    from app import create_app
+    # Ohne dauerhaften App-Kontext: sonst teilen sich alle Test-Clients `g`
+    # und damit den eingeloggten Benutzer
+    return create_app()
+
+
+@pytest.fixture
+def now(app):
+    """Steuerbare Uhr: `now.set(datetime)` stellt die Zeit der Spiellogik"""
+    from clock import clock
+
+    class FakeNow:
+        value = datetime(2026, 3, 2, 11, 0)
+
+        def set(self, value):
+            self.value = value
+            clock.set_source(lambda: self.value)
+
+    fake = FakeNow()
+    fake.set(fake.value)
+    yield fake
+    clock.set_source(None)
+
+
+@pytest.fixture
+def player(app):
+    """Legt Spieler an und liefert einen eingeloggten Test-Client"""
+    from models import db, User
+    from passwords import hash_password
+
+    def make(username, role='player'):
+        with app.app_context():
+            user = User(username=username, password_hash=hash_password(PASSWORD), role=role)
+            db.session.add(user)
+            db.session.commit()
+            user_id = user.id
+        client = app.test_client()
+        client.post('/login', data={'username': username, 'password': PASSWORD})
+        client.user_id = user_id
+        return client
+
+    return make
@@ -0,0 +1,51 @@
+"""Wiederherstellung: auch die In-Memory-Indizes und der Live-Feed folgen dem Snapshot"""
+from datetime import datetime, timedelta
+
+
+def suggested(client, prefix):
+    return [s['word'] for s in client.get(f'/api/v1/suggest?prefix={prefix}').get_json()['suggestions']]
+
+
+def test_restore_resets_indexes_and_event_cursor(app, now, player, monkeypatch):
+    import backup
+    from clock import clock
+    from events import event_hub
+    from similarity import similarity_index
+
+    anna, bert = player('anna'), player('bert')
+    day1 = clock.today()
+    now.set(datetime.combine(day1, datetime.min.time()).replace(hour=12, minute=30))
+    anna.post('/submit_word', data={'word': 'spaghetti'})
+    with app.app_context():
+        snapshot_path = backup.create_backup()
+    bert.post('/submit_word', data={'word': 'spargel'})
+
+    # Am nächsten Tag steht 'spargel' im Vorschlagsbaum und im Ähnlichkeitsindex
+    now.set(now.value + timedelta(days=1))
+    assert 'spargel' in suggested(anna, 'sp')
+    with app.app_context():
+        similarity_index.find_conflict(1, 'spargels', clock.today(), anna.user_id)
+    assert 'spargel' in similarity_index.similar('spargels')
+
+    # Live-Feed: Cursor steht hinter allen bisherigen Events
+    monkeypatch.setattr(event_hub, '_thread', object())
+    with app.app_context():
+        subscriber = event_hub.subscribe(anna.user_id, 1, True)
+        event_hub._poll_once()
+    assert subscriber.queue.empty()
+
+    with app.app_context():
+        backup.restore_backup(snapshot_path)
+
+    assert suggested(anna, 'sp') == ['spaghetti']
+    with app.app_context():
+        similarity_index.find_conflict(1, 'spargels', clock.today(), anna.user_id)
+    assert 'spargel' not in similarity_index.similar('spargels')
+
+    # Neue Events nach der Wiederherstellung kommen an, obwohl ihre IDs kleiner sind
+    bert.post('/submit_word', data={'word': 'spinat'})
+    with app.app_context():
+        event_hub._poll_once()
+        event_hub._poll_once()
+    assert 'word_submitted' in subscriber.queue.get_nowait()
+    event_hub.unsubscribe(subscriber)
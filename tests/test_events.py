@@ -0,0 +1,33 @@
+"""Live-Feed (/events): eigene Threads pro Stream und Obergrenze pro Worker"""
+import os
+import runpy
+
+
+def test_stream_threads_come_on_top_of_request_threads(monkeypatch):
+    monkeypatch.setenv('GUNICORN_THREADS', '8')
+    monkeypatch.delenv('SSE_MAX_CLIENTS', raising=False)
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    config = runpy.run_path(os.path.join(root, 'gunicorn.conf.py'))
+    assert config['threads'] == 8 + 50
+
+
+def test_streams_capped_without_holding_db_connections(app, player, monkeypatch):
+    from events import event_hub
+    from models import db
+
+    monkeypatch.setattr(event_hub, '_thread', object())  # kein Poll-Thread im Test
+    assert app.config['SSE_MAX_CLIENTS'] == 50
+    app.config['SSE_MAX_CLIENTS'] = 2
+    anna = player('anna')
+
+    with app.app_context():
+        checked_out = db.engine.pool.checkedout()
+    streams = [anna.get('/events', buffered=False) for _ in range(2)]
+    assert [r.status_code for r in streams] == [200, 200]
+    with app.app_context():
+        assert db.engine.pool.checkedout() == checked_out
+
+    assert anna.get('/events').status_code == 503
+    for response in streams:
+        response.close()
+    assert event_hub.client_count == 0
@@ -0,0 +1,32 @@
+"""Zugriffsschutz von /metrics und Zurücksetzen beim Serverstart"""
+
+
+def test_metrics_hidden_without_token_or_admin(app, player):
+    assert app.test_client().get('/metrics').status_code == 404
+    assert player('anna').get('/metrics').status_code == 404
+
+    response = player('chef', role='admin').get('/metrics')
+    assert response.status_code == 200
+    assert b'bingo_http_requests_total' in response.data
+
+
+def test_metrics_token(app, monkeypatch):
+    from metrics import metrics
+
+    monkeypatch.setattr(metrics, 'token', 'geheim')
+    client = app.test_client()
+    assert client.get('/metrics').status_code == 403
+    assert client.get('/metrics', headers={'Authorization': 'Bearer falsch'}).status_code == 403
+    assert client.get('/metrics', headers={'Authorization': 'Bearer geheim'}).status_code == 200
+
+
+def test_reset_leaves_no_connection_for_forked_workers(app, player):
+    import sqlite3
+    from metrics import metrics
+
+    player('anna').get('/dashboard')
+    metrics.flush()
+    metrics.reset()
+
+    assert metrics._local.conn is None
+    assert sqlite3.connect(metrics.path).execute('SELECT COUNT(*) FROM sample').fetchone()[0] == 0
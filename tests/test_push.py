@@ -0,0 +1,187 @@
+"""Push-Versand gegen einen lokalen Push-Endpunkt (http.server)
+
+Die Subscriptions zeigen auf einen Server auf 127.0.0.1. So laufen
+Verschlüsselung, VAPID-Signatur und HTTP von pywebpush wirklich durch. Der
+Server antwortet pro Pfad mit vorgegebenen Status-Codes.
+"""
+import base64
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+import os
+import threading
+
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec
+from py_vapid import Vapid
+import pytest
+
+import push
+from push import PushDispatcher
+
+
+def _b64(raw):
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+class StubPushService:
+    """Lokaler Push-Dienst: `statuses[pfad]` wird der Reihe nach beantwortet
+
+    Der letzte Status einer Liste gilt für alle weiteren Versuche.
+    """
+
+    def __init__(self, statuses):
+        self.statuses = statuses
+        self.requests = []
+        self._lock = threading.Lock()
+        service = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+                with service._lock:
+                    attempt = sum(1 for r in service.requests if r['path'] == self.path)
+                    headers = {name.lower(): value for name, value in self.headers.items()}
+                    service.requests.append({'path': self.path, 'headers': headers, 'body': body})
+                script = service.statuses[self.path]
+                self.send_response(script[min(attempt, len(script) - 1)])
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    def url(self, path):
+        return f'http://127.0.0.1:{self.server.server_port}{path}'
+
+    def calls(self, path):
+        return [r for r in self.requests if r['path'] == path]
+
+
+@pytest.fixture
+def service(monkeypatch):
+    monkeypatch.setenv('NO_PROXY', '127.0.0.1')
+    services = []
+
+    def start(statuses):
+        stub = StubPushService(statuses)
+        stub.thread.start()
+        services.append(stub)
+        return stub
+
+    yield start
+    for stub in services:
+        stub.server.shutdown()
+        stub.server.server_close()
+
+
+@pytest.fixture
+def vapid():
+    key = Vapid()
+    key.generate_keys()
+    return {'vapid_private_key': key, 'vapid_claims': {'sub': 'mailto:admin@example.com'}}
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    """Zeichnet die Backoff-Pausen auf, statt wirklich zu schlafen"""
+    delays = []
+    monkeypatch.setattr(push.time, 'sleep', delays.append)
+    return delays
+
+
+def subscribe(app, *endpoints):
+    """Legt echte Subscriptions (Browser-Schlüssel P-256 + auth) für `endpoints` an"""
+    from models import db, Subscription, User
+
+    with app.app_context():
+        user = User(username='spieler', password_hash='x')
+        db.session.add(user)
+        db.session.flush()
+        for endpoint in endpoints:
+            browser_key = ec.generate_private_key(ec.SECP256R1()).public_key().public_bytes(
+                serialization.Encoding.X962, serialization.PublicFormat.UncompressedPoint)
+            db.session.add(Subscription(user_id=user.id, subscription_info=json.dumps({
+                'endpoint': endpoint,
+                'keys': {'p256dh': _b64(browser_key), 'auth': _b64(os.urandom(16))},
+            })))
+        db.session.commit()
+
+
+def remaining_endpoints(app):
+    from models import Subscription
+
+    with app.app_context():
+        return sorted(json.loads(s.subscription_info)['endpoint'] for s in Subscription.query.all())
+
+
+def send(app, vapid, **kwargs):
+    with app.app_context():
+        return PushDispatcher(**kwargs).send_to_all({'title': 'Wort Bingo', 'body': 'x'}, vapid)
+
+
+def test_delivers_encrypted_and_signed(app, service, vapid, sleeps):
+    stub = service({'/ok': [201]})
+    subscribe(app, stub.url('/ok'))
+
+    report = send(app, vapid)
+
+    assert (report['sent'], report['failed'], report['pruned']) == (1, 0, 0)
+    [request] = stub.calls('/ok')
+    assert request['headers']['content-encoding'] == 'aes128gcm'
+    assert request['headers']['authorization'].startswith('vapid t=')
+    assert request['headers']['ttl'] == '3600'
+    assert b'Wort Bingo' not in request['body']
+
+
+def test_retries_with_backoff_on_5xx_and_429(app, service, vapid, sleeps):
+    stub = service({'/flaky': [503, 429, 201]})
+    subscribe(app, stub.url('/flaky'))
+
+    report = send(app, vapid, max_retries=3, backoff=0.5)
+
+    assert len(stub.calls('/flaky')) == 3
+    assert sleeps == [0.5, 1.0]
+    assert (report['sent'], report['failed'], report['pruned']) == (1, 0, 0)
+
+
+def test_gives_up_after_max_retries(app, service, vapid, sleeps):
+    stub = service({'/down': [500]})
+    subscribe(app, stub.url('/down'))
+
+    report = send(app, vapid, max_retries=2, backoff=0.5)
+
+    assert len(stub.calls('/down')) == 3
+    assert sleeps == [0.5, 1.0]
+    assert (report['sent'], report['failed'], report['pruned']) == (0, 1, 0)
+    assert remaining_endpoints(app) == [stub.url('/down')]
+
+
+@pytest.mark.parametrize('status', [404, 410])
+def test_prunes_gone_subscriptions(app, service, vapid, sleeps, status):
+    stub = service({'/gone': [status], '/ok': [201]})
+    subscribe(app, stub.url('/gone'), stub.url('/ok'))
+
+    report = send(app, vapid)
+
+    assert len(stub.calls('/gone')) == 1
+    assert sleeps == []
+    assert (report['sent'], report['failed'], report['pruned']) == (1, 0, 1)
+    assert remaining_endpoints(app) == [stub.url('/ok')]
+
+
+def test_report_counts_across_pages(app, service, vapid, sleeps):
+    statuses = {'/ok1': [201], '/ok2': [201], '/gone': [410], '/bad': [400], '/flaky': [502, 201]}
+    stub = service(statuses)
+    subscribe(app, *(stub.url(path) for path in statuses))
+
+    report = send(app, vapid, page_size=2, backoff=0)
+
+    assert (report['sent'], report['failed'], report['pruned']) == (3, 1, 1)
+    assert len(stub.calls('/bad')) == 1
+    assert remaining_endpoints(app) == sorted(stub.url(p) for p in statuses if p != '/gone')
+    for key in ('duration_s', 'throughput_per_s', 'latency_p50_ms', 'latency_p95_ms',
+                'latency_max_ms'):
+        assert report[key] >= 0
@@ -0,0 +1,24 @@
+"""Phasenwechsel mehrerer Räume über den gemeinsamen Job"""
+from datetime import datetime
+
+
+def test_all_rounds_closed_before_any_push(app, now, monkeypatch):
+    import rooms
+    from clock import clock
+    from models import ClosedRound
+
+    day = clock.today()
+    with app.app_context():
+        second = rooms.create_room('zweiter', 'Zweiter').id
+        rooms.room_schedule.next_due(now.value)
+
+    closed_at_push = []
+
+    def slow_push(room_id, phase):
+        closed_at_push.append(ClosedRound.query.filter_by(date=day).count())
+
+    monkeypatch.setattr(rooms, 'send_round_notifications', slow_push)
+    now.set(datetime.combine(day, datetime.min.time()).replace(hour=18, minute=0, second=5))
+    with app.app_context():
+        assert rooms.run_room_transitions() == [1, second]
+    assert closed_at_push == [2, 2]
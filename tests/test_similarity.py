@@ -0,0 +1,16 @@
+"""Ablehnung ähnlicher Wörter beim Einreichen"""
+from datetime import datetime
+from html import unescape
+
+
+def test_today_conflict_does_not_reveal_other_word(app, now, player):
+    from clock import clock
+
+    anna, bert = player('anna'), player('bert')
+    now.set(datetime.combine(clock.today(), datetime.min.time()).replace(hour=12, minute=30))
+    anna.post('/submit_word', data={'word': 'spaghetti'})
+
+    page = unescape(bert.post('/submit_word', data={'word': 'spagetti'},
+                              follow_redirects=True).get_data(as_text=True))
+    assert 'zu ähnlich zu einem heute bereits gewählten Wort' in page
+    assert 'spaghetti' not in page
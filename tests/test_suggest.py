@@ -0,0 +1,42 @@
+"""Wortvorschläge (/api/v1/suggest) und die blinde Einreichung"""
+from datetime import datetime, timedelta
+
+
+def suggestions(client, prefix):
+    response = client.get(f'/api/v1/suggest?prefix={prefix}')
+    assert response.status_code == 200
+    return {s['word']: s['status'] for s in response.get_json()['suggestions']}
+
+
+def test_todays_words_hidden_until_own_submission(app, now, player):
+    from clock import clock
+    from models import db, WordLog
+    from suggest import suggest_index
+
+    anna, bert = player('anna'), player('bert')
+    with app.app_context():
+        yesterday = clock.today() - timedelta(days=1)
+        db.session.add(WordLog(user_id=anna.user_id, word='spaghetti', date=yesterday))
+        db.session.commit()
+        suggest_index.load(clock.today())
+
+    now.set(datetime.combine(clock.today(), datetime.min.time()).replace(hour=12, minute=30))
+    anna.post('/submit_word', data={'word': 'spargel'})
+
+    # Bert hat noch nichts eingereicht: keine heutigen Wörter, kein 'taken'
+    assert suggestions(bert, 'sp') == {'spaghetti': 'free'}
+
+    bert.post('/submit_word', data={'word': 'spinat'})
+    assert suggestions(bert, 'sp') == {'spaghetti': 'free', 'spargel': 'taken', 'spinat': 'mine'}
+
+
+def test_voting_phase_shows_todays_words(app, now, player):
+    from clock import clock
+
+    anna, bert = player('anna'), player('bert')
+    now.set(datetime.combine(clock.today(), datetime.min.time()).replace(hour=12, minute=30))
+    anna.post('/submit_word', data={'word': 'spargel'})
+    assert suggestions(bert, 'sp') == {}
+
+    now.set(now.value.replace(hour=18, minute=30))
+    assert suggestions(bert, 'sp') == {'spargel': 'taken'}
@@ -0,0 +1,38 @@
+"""Abstimmen, während ein anderer Worker die Runde schließt"""
+from datetime import datetime
+
+
+def test_vote_survives_lost_close_race(app, now, player, monkeypatch):
+    import round_cache
+    from clock import clock
+    from models import db, ClosedRound, User, Vote
+
+    anna, bert = player('anna'), player('bert')
+    day = clock.today()
+    now.set(datetime.combine(day, datetime.min.time()).replace(hour=12, minute=30))
+    anna.post('/submit_word', data={'word': 'spaghetti'})
+
+    # Der Job hat die Runde verpasst; während /vote sie schließt, kommt ein
+    # anderer Worker mit seinem ClosedRound zuvor (IntegrityError beim Commit)
+    load_entries, close_round = round_cache._load_live_entries, round_cache.close_round
+
+    def other_worker_closes(room_id, load_day):
+        db.session.add(ClosedRound(room_id=room_id, date=load_day, entries='[]'))
+        return load_entries(room_id, load_day)
+
+    def racing_close_round(room_id, close_day):
+        monkeypatch.setattr(round_cache, '_load_live_entries', other_worker_closes)
+        try:
+            assert close_round(room_id, close_day) is None
+        finally:
+            monkeypatch.setattr(round_cache, '_load_live_entries', load_entries)
+
+    monkeypatch.setattr(round_cache, 'close_round', racing_close_round)
+    now.set(now.value.replace(hour=18, minute=30))
+    page = bert.post('/vote', data={'voted_user_id': str(anna.user_id)},
+                     follow_redirects=True).get_data(as_text=True)
+
+    assert 'Punkt vergeben an anna' in page
+    with app.app_context():
+        assert Vote.query.filter_by(voter_id=bert.user_id, target_id=anna.user_id).count() == 1
+        assert db.session.get(User, anna.user_id).points == 1
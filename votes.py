@@ -0,0 +1,42 @@
+"""Atomare Stimmabgabe und Cooldown-Upsert"""
+from sqlalchemy.dialects import postgresql, sqlite
+
+from models import db, User, Vote, CooldownLog
+
+_UPSERT_DIALECTS = {
+    'sqlite': sqlite.insert,
+    'postgresql': postgresql.insert,
+}
+
+
+def record_vote(room_id, voter_id, target_id, day):
+    """Trägt eine Stimme ins Ledger ein und erhöht die Punkte atomar
+
+    Wirft `sqlalchemy.exc.IntegrityError`, wenn der Wähler an diesem Tag
+    bereits für das Ziel gestimmt hat. Der Commit bleibt dem Aufrufer überlassen.
+    """
+    db.session.add(Vote(room_id=room_id, voter_id=voter_id, target_id=target_id, date=day))
+    db.session.flush()
+    # UPDATE user SET points = points + 1 statt Lesen-Ändern-Schreiben im ORM
+    User.query.filter_by(id=target_id).update(
+        {User.points: User.points + 1}, synchronize_session=False)
+
+
+def upsert_cooldown(room_id, word, expiry_date):
+    """Setzt den Cooldown für `word` in einem Raum mit einer einzigen Anweisung"""
+    insert = _UPSERT_DIALECTS.get(db.engine.dialect.name)
+    if insert is None:
+        # Fallback für Datenbanken ohne ON CONFLICT
+        cooldown = CooldownLog.query.filter_by(room_id=room_id, word=word).first()
+        if cooldown:
+            cooldown.expiry_date = expiry_date
+        else:
+            db.session.add(CooldownLog(room_id=room_id, word=word, expiry_date=expiry_date))
+        return
+
+    stmt = insert(CooldownLog.__table__).values(room_id=room_id, word=word, expiry_date=expiry_date)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[CooldownLog.room_id, CooldownLog.word],
+        set_={'expiry_date': stmt.excluded.expiry_date}
+    )
+    db.session.execute(stmt)
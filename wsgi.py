@@ -0,0 +1,8 @@
+"""WSGI-Einstiegspunkt für Gunicorn und die Flask-CLI
+
+Die App wird erst beim Import dieses Moduls gebaut. `import app` allein
+startet weder Datenbankinitialisierung noch Benutzer-Provisionierung.
+"""
+from app import create_app
+
+app = create_app()